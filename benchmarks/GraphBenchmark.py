@@ -0,0 +1,141 @@
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+import numpy as np
+
+from benchmarks.StandInNeo4jDriver import StandInNeo4jDriver
+from benchmarks.stats import peak_rss_mb, reset_peak_rss, summarize
+from database.KuzuDatabase import KuzuDatabase
+from database.Neo4jDatabase import Neo4jDatabase
+from graph_data.GraphStorage import GraphStorage
+
+# Backends a benchmark can run against. "neo4j" is the server configured by DB_URI, e.g. the docker-compose one.
+BACKENDS = ("kuzu", "neo4j-stand-in", "neo4j")
+
+
+@contextmanager
+def open_backend(backend: str):
+    """
+    Yield a GraphStorage on a fresh database of `backend` and a function telling a stand-in what to export.
+    The working directory is switched to a temporary one holding the Kuzu database and the exported files.
+    """
+    previous_dir = os.getcwd()
+    previous_provider = os.environ.get("DATABASE_PROVIDER")
+    with tempfile.TemporaryDirectory(prefix="ho-gdb-benchmark-") as work_dir:
+        os.chdir(work_dir)
+        try:
+            serve = lambda node_names, edges: None
+            if backend == "kuzu":
+                os.environ["DATABASE_PROVIDER"] = "KUZU"
+                db = KuzuDatabase()
+            elif backend == "neo4j-stand-in":
+                os.environ["DATABASE_PROVIDER"] = "NEO4J"
+                driver = StandInNeo4jDriver()
+                db = Neo4jDatabase(driver=driver)
+                serve = driver.serve
+            elif backend == "neo4j":
+                os.environ["DATABASE_PROVIDER"] = "NEO4J"
+                db = Neo4jDatabase()
+            else:
+                raise ValueError(f"Unknown backend {backend!r}, expected one of {', '.join(BACKENDS)}")
+
+            try:
+                yield GraphStorage(db), serve
+            finally:
+                db.end_session()
+        finally:
+            os.chdir(previous_dir)
+            if previous_provider is None:
+                os.environ.pop("DATABASE_PROVIDER", None)
+            else:
+                os.environ["DATABASE_PROVIDER"] = previous_provider
+
+
+class GraphBenchmark:
+    """
+    Time GraphStorage operations on graphs of several sizes.
+    Each round builds a graph of `size` nodes and about `edge_factor * size` random edges with the bulk methods,
+    times `samples` single-item adds and deletes on it, then exports, clears and re-imports it.
+    """
+
+    def __init__(self, backend: str, sizes: Iterable[int], samples: int = 200, repeat: int = 3,
+                 edge_factor: int = 2, seed: int = 0, format: str = "csv"):
+        self.backend = backend
+        self.sizes = list(sizes)
+        self.samples = samples
+        self.repeat = repeat
+        self.edge_factor = edge_factor
+        self.seed = seed
+        self.format = format
+        self._measurements: Dict[str, Dict] = {}
+
+    def run(self) -> List[Dict]:
+        """Run every size and return one result per operation and size."""
+        results = []
+        with open_backend(self.backend) as (storage, serve):
+            for size in self.sizes:
+                self._measurements = {}
+                node_names, edges = self._generate(size)
+                serve(node_names, edges)
+                storage.clear_graph()
+                for _ in range(self.repeat):
+                    self._run_round(storage, node_names, edges)
+                    storage.clear_graph()
+
+                for operation, measurement in self._measurements.items():
+                    results.append({
+                        "backend": self.backend,
+                        "size": size,
+                        "operation": operation,
+                        **summarize(measurement["latencies"], measurement["rows"], measurement["peak_rss_mb"]),
+                    })
+        return results
+
+    def _generate(self, size: int) -> Tuple[List[str], List[Tuple[str, str, str]]]:
+        """Generate the node names and unique random edges of a graph with `size` nodes."""
+        rng = np.random.default_rng(self.seed)
+        node_names = [f"n{i}" for i in range(size)]
+        pairs = np.unique(rng.integers(0, size, size=(size * self.edge_factor, 2)), axis=0)
+        edges = [(node_names[start], node_names[end], "Connects") for start, end in pairs.tolist()]
+        return node_names, edges
+
+    def _run_round(self, storage: GraphStorage, node_names: List[str], edges: List[Tuple[str, str, str]]):
+        self._time("add_nodes", len(node_names), lambda: storage.add_nodes(node_names))
+        self._time("add_edges", len(edges), lambda: storage.add_edges(edges))
+
+        extra_names = [f"benchmark{i}" for i in range(self.samples)]
+        extra_edges = [(name, node_names[i % len(node_names)], "Connects") for i, name in enumerate(extra_names)]
+        self._time_each("add_node", [lambda name=name: storage.add_node(name) for name in extra_names])
+        self._time_each("add_edge", [lambda edge=edge: storage.add_edge(*edge) for edge in extra_edges])
+        self._time_each("delete_edge", [lambda edge=edge: storage.delete_edge(*edge) for edge in extra_edges])
+        self._time_each("delete_node", [lambda name=name: storage.delete_node(name) for name in extra_names])
+
+        rows = len(node_names) + len(edges)
+        self._time("export_graph", rows, lambda: storage.export_graph(format=self.format))
+        self._time("clear_graph", rows, storage.clear_graph)
+        self._time("import_graph", rows, lambda: storage.import_graph(format=self.format))
+
+    def _time(self, operation: str, rows: int, call: Callable):
+        """Time one call of a bulk operation touching `rows` rows."""
+        reset_peak_rss()
+        start = time.perf_counter()
+        call()
+        self._record(operation, [time.perf_counter() - start], rows)
+
+    def _time_each(self, operation: str, calls: List[Callable]):
+        """Time every call of a single-item operation separately."""
+        reset_peak_rss()
+        latencies = []
+        for call in calls:
+            start = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - start)
+        self._record(operation, latencies, len(calls))
+
+    def _record(self, operation: str, latencies: List[float], rows: int):
+        measurement = self._measurements.setdefault(operation, {"latencies": [], "rows": 0, "peak_rss_mb": 0.0})
+        measurement["latencies"].extend(latencies)
+        measurement["rows"] += rows
+        measurement["peak_rss_mb"] = max(measurement["peak_rss_mb"], peak_rss_mb())
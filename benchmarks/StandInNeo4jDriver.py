@@ -0,0 +1,78 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from neo4j import Record
+
+
+class StandInTransaction:
+    """Transaction of the stand-in driver: accepts every statement and answers the export queries."""
+
+    def __init__(self, driver: "StandInNeo4jDriver"):
+        self._driver = driver
+
+    def run(self, query: str, parameters: Optional[Dict] = None, **kwargs) -> Iterator[Record]:
+        self._driver.statements += 1
+        return self._driver.answer(query)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class StandInSession(StandInTransaction):
+    """Session of the stand-in driver, supporting explicit and managed transactions."""
+
+    def begin_transaction(self) -> StandInTransaction:
+        return StandInTransaction(self._driver)
+
+    def execute_write(self, work, *args, **kwargs):
+        with self.begin_transaction() as tx:
+            result = work(tx, *args, **kwargs)
+            tx.commit()
+            return result
+
+    execute_read = execute_write
+
+
+class StandInNeo4jDriver:
+    """
+    In-process replacement for a neo4j driver, so `Neo4jDatabase` can be benchmarked without a server.
+    Writes are accepted without being stored, and the export queries stream the graph given to `serve`.
+    Timings therefore cover the client side only: query building, batching, file reading and writing.
+    """
+
+    def __init__(self):
+        self.statements = 0
+        self._node_names: List[str] = []
+        self._edges: List[Tuple[str, str, str]] = []
+
+    def serve(self, node_names: List[str], edges: List[Tuple[str, str, str]]):
+        """Set the nodes and (start_node, end_node, relationship_name) edges returned by export queries."""
+        self._node_names = node_names
+        self._edges = edges
+
+    def answer(self, query: str) -> Iterator[Record]:
+        """Return the records a server holding the served graph would stream for `query`."""
+        if "labels(n) AS labels" in query:
+            return (Record([("labels", ["GNode"]), ("properties", {"name": name})]) for name in self._node_names)
+        if "type(r) AS type" in query:
+            return (Record([("start_name", start), ("end_name", end), ("type", relationship_type),
+                            ("properties", {})]) for start, end, relationship_type in self._edges)
+        if "valueType(n[key])" in query and self._node_names:
+            return iter([Record([("key", "name"), ("types", ["STRING NOT NULL"])])])
+        return iter([])
+
+    def session(self, **config) -> StandInSession:
+        return StandInSession(self)
+
+    def close(self):
+        pass
@@ -0,0 +1,82 @@
+import argparse
+import json
+import os
+import platform
+import sys
+from datetime import datetime, timezone
+
+from benchmarks.GraphBenchmark import BACKENDS, GraphBenchmark
+from benchmarks.stats import find_regressions, result_key
+from graph_data.GraphStorage import EXPORT_FORMATS
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark GraphStorage operations and compare them with a stored baseline.")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=["kuzu", "neo4j-stand-in"],
+                        help="backends to benchmark; 'neo4j' clears the server configured by DB_URI")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 5_000], help="graph sizes in nodes")
+    parser.add_argument("--samples", type=int, default=200, help="timed calls per single-item operation and round")
+    parser.add_argument("--repeat", type=int, default=3, help="rounds per graph size")
+    parser.add_argument("--edge-factor", type=int, default=2, help="random edges generated per node")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random edge generator")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv", help="export and import file format")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON report to compare the results with")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative slowdown or memory growth before a result counts as a regression")
+    return parser.parse_args()
+
+
+def main() -> int:
+    arguments = parse_arguments()
+    # Without a baseline nothing can count as a regression, so fail before spending time on the run.
+    if not arguments.save_baseline and not os.path.exists(arguments.baseline):
+        print(f"No baseline at {arguments.baseline}; store one with --save-baseline first.", file=sys.stderr)
+        return 2
+
+    results = []
+    for backend in arguments.backends:
+        benchmark = GraphBenchmark(backend, arguments.sizes, samples=arguments.samples, repeat=arguments.repeat,
+                                   edge_factor=arguments.edge_factor, seed=arguments.seed, format=arguments.format)
+        results.extend(benchmark.run())
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {key: value for key, value in vars(arguments).items()
+                       if key not in ("output", "baseline", "save_baseline")},
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            file.write(text)
+    else:
+        print(text)
+
+    if arguments.save_baseline:
+        with open(arguments.baseline, "w") as file:
+            file.write(text)
+        return 0
+
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)
+    compared = {result_key(result) for result in baseline["results"]}
+    unmatched = [result for result in results if result_key(result) not in compared]
+    if unmatched:
+        print(f"Warning: {len(unmatched)} of {len(results)} results have no baseline counterpart and were not "
+              f"compared; store a baseline with the same backends and sizes.", file=sys.stderr)
+    regressions = find_regressions(results, baseline["results"], arguments.tolerance)
+    for regression in regressions:
+        print(f"Regression: {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
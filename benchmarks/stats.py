@@ -0,0 +1,70 @@
+import resource
+import sys
+from typing import Dict, List, Tuple
+import numpy as np
+
+# Result fields that must not drop below the baseline, and those that must not rise above it.
+HIGHER_IS_BETTER = ("ops_per_sec",)
+LOWER_IS_BETTER = ("peak_rss_mb",)
+
+
+def reset_peak_rss() -> bool:
+    """Reset the peak resident set size of this process, which Linux allows through /proc. Return whether it did."""
+    try:
+        with open("/proc/self/clear_refs", "w") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in megabytes."""
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss never resets; it is reported in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies: List[float], rows: int, peak_rss: float) -> Dict[str, float]:
+    """Summarize the latencies in seconds of one operation into throughput and percentile figures."""
+    total = sum(latencies)
+    return {
+        "count": len(latencies),
+        "ops_per_sec": len(latencies) / total if total else 0.0,
+        "rows_per_sec": rows / total if total else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+        "peak_rss_mb": peak_rss,
+    }
+
+
+def result_key(result: Dict) -> Tuple[str, int, str]:
+    return result["backend"], result["size"], result["operation"]
+
+
+def find_regressions(results: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """
+    Compare results with the baseline results of the same backend, size and operation.
+    Return a description of every figure that is worse than the baseline by more than `tolerance`.
+    """
+    baseline_results = {result_key(result): result for result in baseline}
+    regressions = []
+    for result in results:
+        expected = baseline_results.get(result_key(result))
+        if expected is None:
+            continue
+        name = "{}/{}/{}".format(*result_key(result))
+        for field in HIGHER_IS_BETTER:
+            if result[field] < expected[field] * (1 - tolerance):
+                regressions.append(f"{name}: {field} {result[field]:.1f} < baseline {expected[field]:.1f}")
+        for field in LOWER_IS_BETTER:
+            if result[field] > expected[field] * (1 + tolerance):
+                regressions.append(f"{name}: {field} {result[field]:.1f} > baseline {expected[field]:.1f}")
+    return regressions
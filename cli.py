@@ -0,0 +1,158 @@
+import argparse
+import gzip
+import io
+import sys
+import time
+from contextlib import nullcontext
+
+from main import create_graph_storage, close_graph_storage, print_statistics
+from graph_data.GraphStorage import GraphStorage, EXPORT_FORMATS
+from utils import chunked, stream_nodes, stream_edges, stream_hyper_edges, ThroughputMeter, DEFAULT_BATCH_SIZE
+
+# Minimum seconds between two progress lines of a load.
+PROGRESS_INTERVAL = 1.0
+
+# Parsers of the kinds of items `load` reads, one item per line or several separated by semi-colons.
+PARSERS = {
+    "nodes": stream_nodes,
+    "edges": stream_edges,
+    "hyperedges": stream_hyper_edges,
+}
+
+# Queries counting the stored items of each kind `load` writes; edges are counted from their GNode start,
+# which leaves out the Member edges of hyper edges.
+COUNT_QUERIES = {
+    "nodes": "MATCH (n:GNode) RETURN count(n) AS count",
+    "edges": "MATCH (:GNode)-[r]->() RETURN count(r) AS count",
+    "hyperedges": "MATCH (h:HyperEdge) RETURN count(h) AS count",
+}
+
+
+def open_input(path: str):
+    """Open a text file, gzip-compressed if it ends in .gz, or standard input for '-', for reading line by line."""
+    if path == "-":
+        return nullcontext(io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8"))
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def progress_printer(kind: str, interval: float = PROGRESS_INTERVAL):
+    """Return a progress callback printing the rows loaded so far and their rate to stderr, at most every `interval`."""
+    last = 0.0
+
+    def report(rows: int, rate: float):
+        nonlocal last
+        now = time.perf_counter()
+        if now - last >= interval:
+            last = now
+            print(f"{kind}: {rows:,} rows, {rate:,.0f} rows/s", file=sys.stderr,
+                  end="\r" if sys.stderr.isatty() else "\n", flush=True)
+
+    return report
+
+
+def count_stored(storage: GraphStorage, kind: str) -> int:
+    """Return the number of items of a kind stored in the database."""
+    batch = next(storage.query(COUNT_QUERIES[kind]))
+    return batch.column(0)[0].as_py()
+
+
+def load(storage: GraphStorage, args):
+    """
+    Stream items from a file or stdin into the database, one bulk write per batch, sharing one session.
+    Report how many items were read and how many the database gained, since items already stored are not added twice.
+    """
+    before = count_stored(storage, args.kind)
+    meter = ThroughputMeter(None if args.quiet else progress_printer(args.kind))
+    add = getattr(storage, "add_hyper_edges" if args.kind == "hyperedges" else f"add_{args.kind}")
+    options = {"relationship_type": args.type} if args.kind == "hyperedges" else {}
+
+    with open_input(args.file) as lines, storage.session():
+        # Only one batch of the input is held at a time.
+        for chunk in chunked(PARSERS[args.kind](lines), args.batch_size):
+            add(chunk, batch_size=args.batch_size, **options)
+            meter.update(len(chunk))
+    storage.flush()
+    if not args.quiet and sys.stderr.isatty():
+        print(file=sys.stderr)
+    elapsed, rate = meter.elapsed, meter.rate
+    written = count_stored(storage, args.kind) - before
+    print(f"Read {meter.rows:,} {args.kind} in {elapsed:.3f}s ({rate:,.0f} rows/s); "
+          f"the database now holds {written:,} more.")
+
+
+def export_graph(storage: GraphStorage, args):
+    storage.export_graph(format=args.format)
+    print("Graph exported successfully.")
+    for phase, seconds in storage.export_timings.items():
+        print(f"  {phase}: {seconds:.3f}s")
+
+
+def import_graph(storage: GraphStorage, args):
+    storage.import_graph(format=args.format)
+    print("Graph imported successfully.")
+    for phase, seconds in storage.import_timings.items():
+        print(f"  {phase}: {seconds:.3f}s")
+
+
+def clear_graph(storage: GraphStorage, args):
+    storage.clear_graph()
+    print("Graph cleared successfully.")
+
+
+def show_statistics(storage: GraphStorage, args):
+    print_statistics(storage)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Run one graph command without the interactive menu, with the database and options "
+                    "configured in .env as for main.py.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    load_parser = commands.add_parser(
+        "load", help="stream nodes, edges or hyper edges from a file or stdin into the database",
+        description="Each line holds one or more semi-colon-separated items: node names, "
+                    "(relationship_name,start_node,end_node) or (start_node,end_node) edges of type Connects, "
+                    "or (node_1,...,node_n) hyper edges. Blank lines and lines starting with # are skipped. "
+                    "Every batch is committed as it is written, so a failing line leaves the batches before it.")
+    load_parser.add_argument("kind", choices=PARSERS)
+    load_parser.add_argument("file", help="input file, gzip-compressed if it ends in .gz, or - for stdin")
+    load_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                             help="items per bulk write (default: %(default)s)")
+    load_parser.add_argument("--type", default="CONNECTED",
+                             help="relationship type of hyper edges (default: %(default)s)")
+    load_parser.add_argument("--quiet", action="store_true", help="do not print progress to stderr")
+    load_parser.set_defaults(run=load)
+
+    for name, run, help in (("export", export_graph, "export the graph to the exported directory"),
+                            ("import", import_graph, "import the graph from the exported directory")):
+        format_parser = commands.add_parser(name, help=help)
+        format_parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        format_parser.set_defaults(run=run)
+
+    commands.add_parser("clear", help="remove the whole graph").set_defaults(run=clear_graph)
+    commands.add_parser("stats", help="print the recorded statistics and gauges").set_defaults(run=show_statistics)
+    return parser
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "batch_size", 1) < 1:
+        parser.error("--batch-size must be a positive number")
+
+    storage = create_graph_storage()
+    try:
+        args.run(storage, args)
+    except ValueError as error:
+        print(f"{parser.prog}: error: {error}", file=sys.stderr)
+        return 1
+    finally:
+        close_graph_storage(storage)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from database.Database import *
+from database.KuzuDatabase import KuzuDatabase
+
+
+class AsyncKuzuDatabase:
+    """
+    Run KuzuDatabase operations in a thread pool, each call on a connection checked out of the database pool.
+    KuzuDatabase lets writes take turns, as Kuzu allows one write transaction at a time, while reads run in parallel.
+    """
+
+    def __init__(self, db: KuzuDatabase, max_workers: Optional[int] = None):
+        """Use `max_workers` threads, one per pooled connection by default."""
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or db.pool_size, thread_name_prefix="kuzu")
+
+    async def _run(self, call):
+        def with_session():
+            session = self.db.start_session()
+            try:
+                return call(session)
+            finally:
+                self.db.end_session(session)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, with_session)
+
+    async def write(self, operation):
+        """Run `operation(session)` on a pooled connection."""
+        await self._run(operation)
+
+    async def read(self, query: str, parameters: Optional[Dict] = None) -> List[Dict]:
+        """Run a read query on a pooled connection and return its records as dictionaries."""
+        return await self._run(lambda session: self.db._execute_query(session, query, parameters))
+
+    async def close(self):
+        self._executor.shutdown(wait=True)
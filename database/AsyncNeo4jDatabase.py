@@ -0,0 +1,59 @@
+import os
+from neo4j import AsyncGraphDatabase
+
+from database.Database import *
+from database.Neo4jDatabase import Neo4jDatabase
+from utils.environment import load_environment
+
+
+class StatementRecorder:
+    """Session stand-in collecting the statements a Neo4jDatabase method runs, so they can be replayed elsewhere."""
+
+    def __init__(self):
+        self.statements: List[Tuple[str, Dict]] = []
+
+    def run(self, query: str, parameters: Optional[Dict] = None, **kwargs) -> list:
+        self.statements.append((query, parameters or {}))
+        return []
+
+
+class AsyncNeo4jDatabase:
+    """
+    Run Neo4jDatabase operations on the asynchronous driver.
+    Write operations are built by the synchronous Neo4jDatabase methods against a StatementRecorder and their
+    statements are replayed in one managed write transaction, which the driver retries on transient errors.
+    """
+
+    def __init__(self, db: Neo4jDatabase, driver=None):
+        self.db = db
+        if driver is None:
+            load_environment()
+            driver = AsyncGraphDatabase.driver(os.getenv("DB_URI"),
+                                               auth=(os.getenv("DB_USERNAME"), os.getenv("DB_PASSWORD")))
+        self._driver = driver
+
+    async def write(self, operation):
+        """Run the statements `operation(session)` issues in one asynchronous write transaction."""
+        recorder = StatementRecorder()
+        operation(recorder)
+
+        async def work(tx):
+            for query, parameters in recorder.statements:
+                result = await tx.run(query, parameters)
+                await result.consume()
+
+        async with self._driver.session() as session:
+            await session.execute_write(work)
+
+    async def read(self, query: str, parameters: Optional[Dict] = None) -> List[Dict]:
+        """Run a read query and return its records as dictionaries."""
+
+        async def work(tx):
+            result = await tx.run(query, parameters or {})
+            return await result.data()
+
+        async with self._driver.session() as session:
+            return await session.execute_read(work)
+
+    async def close(self):
+        await self._driver.close()
@@ -1,18 +1,28 @@
 import ast
-import os
 from abc import abstractmethod
-from typing import List, Dict, Optional
-from dotenv import load_dotenv
-import pandas as pd
+from typing import TYPE_CHECKING, Iterator, List, Dict, Optional, Tuple
+from utils.metrics import Metrics
+
+# pandas and pyarrow are imported by the methods using them, so that only imports and exports pay for them.
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Matches exported property maps that hold nothing but a plain quoted name.
+PLAIN_NAME_PROPERTIES = r"^\{'name': '([^'\\]*)'\}$"
 
 
 class Database:
+    # Statistics of the queries run, once `GraphStorage.enable_metrics` attaches them; None skips measuring.
+    metrics: Optional[Metrics] = None
+
     @staticmethod
-    def format_properties(properties: Optional[Dict[str, str]]) -> str:
-        """Convert a dictionary of properties to a Cypher-compatible string."""
+    def format_parameters(properties: Optional[Dict[str, str]], prefix: str = "") -> Tuple[str, Dict[str, str]]:
+        """Convert a dictionary of properties to a Cypher map of parameter placeholders and its parameter map."""
         if not properties:
-            return ""
-        return "{" + ", ".join(f"{k}: '{v}'" for k, v in properties.items()) + "}"
+            return "", {}
+        placeholders = "{" + ", ".join(f"{k}: ${prefix}{k}" for k in properties) + "}"
+        return placeholders, {f"{prefix}{k}": v for k, v in properties.items()}
 
     @staticmethod
     def format_labels(labels: Optional[List[str]]) -> str:
@@ -21,6 +31,133 @@ class Database:
             return ""
         return ":" + ":".join(labels)
 
+    @staticmethod
+    def group_by_type(rows: List[Dict[str, str]]) -> Dict[str, List[Dict[str, str]]]:
+        """Group edge rows by relationship type, since Cypher cannot parameterize relationship types."""
+        groups: Dict[str, List[Dict[str, str]]] = {}
+        for row in rows:
+            groups.setdefault(row["type"], []).append(row)
+        return groups
+
+    @staticmethod
+    def format_hyper_edge_query(node_name: Optional[str] = None,
+                                relationship_type: Optional[str] = None) -> Tuple[str, Dict[str, str]]:
+        """
+        Build the query returning hyper edges as `id`, `type` and `members` rows.
+        Filters start from the indexed GNode name or HyperEdge type instead of scanning every hyper edge.
+        """
+        parameters = {}
+        type_filter = ""
+        if relationship_type is not None:
+            type_filter = " {relationship_type: $relationship_type}"
+            parameters["relationship_type"] = relationship_type
+
+        if node_name is not None:
+            match = f"MATCH (:GNode {{name: $name}})<-[:Member]-(h:HyperEdge{type_filter})"
+            parameters["name"] = node_name
+        else:
+            match = f"MATCH (h:HyperEdge{type_filter})"
+
+        query = f"""
+        {match}
+        MATCH (h)-[:Member]->(m:GNode)
+        RETURN h.id AS id, h.relationship_type AS type, collect(m.name) AS members
+        """
+        return query, parameters
+
+    @staticmethod
+    def format_node_scan_query(after: Optional[str], limit: int) -> Tuple[str, Dict[str, str]]:
+        """Build the query returning the names of the next `limit` GNodes in name order after `after`."""
+        if after is None:
+            return f"MATCH (n:GNode) RETURN n.name AS name ORDER BY name LIMIT {int(limit)}", {}
+        query = f"MATCH (n:GNode) WHERE n.name > $after RETURN n.name AS name ORDER BY name LIMIT {int(limit)}"
+        return query, {"after": after}
+
+    @staticmethod
+    def format_edge_scan_query(first: str, last: str, type_function: str = "type") -> Tuple[str, Dict[str, str]]:
+        """
+        Build the query returning the edges leaving the GNodes named `first` to `last` as `start_name`,
+        `end_name` and `type` rows, with `type_function` giving the relationship type of a relationship.
+        """
+        query = f"""
+        MATCH (a:GNode)
+        WHERE a.name >= $first AND a.name <= $last
+        WITH a
+        MATCH (a)-[r]->(b:GNode)
+        RETURN a.name AS start_name, b.name AS end_name, {type_function}(r) AS type
+        """
+        return query, {"first": first, "last": last}
+
+    @staticmethod
+    def format_node_edges_query(names: List[str], type_function: str = "type") -> Tuple[str, Dict[str, List[str]]]:
+        """Build the query returning the edges leaving or entering the named GNodes, looked up by name."""
+        query = f"""
+        UNWIND $names AS name
+        MATCH (a:GNode {{name: name}})-[r]->(b:GNode)
+        RETURN a.name AS start_name, b.name AS end_name, {type_function}(r) AS type
+        UNION
+        UNWIND $names AS name
+        MATCH (a:GNode)-[r]->(b:GNode {{name: name}})
+        RETURN a.name AS start_name, b.name AS end_name, {type_function}(r) AS type
+        """
+        return query, {"names": names}
+
+    @staticmethod
+    def format_member_hyper_edge_query(names: List[str]) -> Tuple[str, Dict[str, List[str]]]:
+        """Build the query returning the hyper edges with any of the named GNodes as a member, like `find_hyper_edges`."""
+        query = """
+        UNWIND $names AS name
+        MATCH (:GNode {name: name})<-[:Member]-(h:HyperEdge)
+        WITH DISTINCT h
+        MATCH (h)-[:Member]->(m:GNode)
+        RETURN h.id AS id, h.relationship_type AS type, collect(m.name) AS members
+        """
+        return query, {"names": names}
+
+    @staticmethod
+    def format_hyper_edge_scan_query(after: Optional[str], limit: int) -> Tuple[str, Dict[str, str]]:
+        """Build the query returning the next `limit` hyper edges in id order after `after`, like `find_hyper_edges`."""
+        where = "WHERE h.id > $after" if after is not None else ""
+        query = f"""
+        MATCH (h:HyperEdge) {where}
+        WITH h ORDER BY h.id LIMIT {int(limit)}
+        MATCH (h)-[:Member]->(m:GNode)
+        RETURN h.id AS id, h.relationship_type AS type, collect(m.name) AS members
+        ORDER BY id
+        """
+        return query, {"after": after} if after is not None else {}
+
+    @staticmethod
+    def parse_properties(column: "pd.Series") -> "pd.Series":
+        """
+        Parse a column of exported property maps into dictionaries.
+        Plain `{'name': '...'}` maps are extracted with one vectorized regex; only the remaining rows
+        (other keys, escaped quotes) fall back to `ast.literal_eval`.
+        """
+        import pandas as pd
+
+        column = column.fillna("{}")
+        names = column.str.extract(PLAIN_NAME_PROPERTIES, expand=False)
+        parsed = pd.Series([{}] * len(column), index=column.index, dtype=object)
+
+        plain = names.notna()
+        parsed[plain] = [{"name": name} for name in names[plain]]
+        complex_rows = ~plain & (column != "{}")
+        if complex_rows.any():
+            parsed[complex_rows] = column[complex_rows].map(ast.literal_eval)
+        return parsed
+
+    @staticmethod
+    def parse_property_names(column: "pd.Series") -> "pd.Series":
+        """Extract the `name` of each exported property map, vectorized like `parse_properties`."""
+        column = column.fillna("{}")
+        names = column.str.extract(PLAIN_NAME_PROPERTIES, expand=False)
+
+        complex_rows = names.isna() & (column != "{}")
+        if complex_rows.any():
+            names[complex_rows] = column[complex_rows].map(lambda properties: ast.literal_eval(properties).get("name"))
+        return names
+
     @abstractmethod
     def export_nodes_to_csv(self, session, file_name: str):
         """Export nodes to a CSV file."""
@@ -41,6 +178,26 @@ class Database:
         """Import edges from a CSV file into Neo4j."""
         pass
 
+    @abstractmethod
+    def export_nodes_to_parquet(self, session, file_name: str):
+        """Export nodes to a Parquet file with typed columns."""
+        pass
+
+    @abstractmethod
+    def export_edges_to_parquet(self, session, file_name: str):
+        """Export edges to a Parquet file with typed columns."""
+        pass
+
+    @abstractmethod
+    def import_nodes_from_parquet(self, session, file_name: str):
+        """Import nodes from a Parquet file."""
+        pass
+
+    @abstractmethod
+    def import_edges_from_parquet(self, session, file_name: str):
+        """Import edges from a Parquet file."""
+        pass
+
     @abstractmethod
     def add_node(self, session, labels: Optional[List[str]] = None, properties: Optional[Dict[str, str]] = None):
         """Add a node to the database."""
@@ -48,7 +205,7 @@ class Database:
 
     @abstractmethod
     def delete_node(self, session, labels: List[str], properties: Dict[str, str]):
-        """Delete a node and all its connected edges."""
+        """Delete a node, all its connected edges and the hyper edges it is a member of."""
         pass
 
     @abstractmethod
@@ -63,12 +220,130 @@ class Database:
         """Delete a relationship (edge) between two nodes."""
         pass
 
+    @abstractmethod
+    def add_nodes(self, session, labels: List[str], rows: List[Dict[str, str]]):
+        """Add a batch of nodes, each given by its `name` property, to the database."""
+        pass
+
+    @abstractmethod
+    def delete_nodes(self, session, labels: List[str], rows: List[Dict[str, str]]):
+        """
+        Delete a batch of nodes, each given by its `name` property, all their connected edges and the hyper
+        edges they are members of.
+        """
+        pass
+
+    @abstractmethod
+    def add_edges(self, session, node_labels: List[str], rows: List[Dict[str, str]]):
+        """Add a batch of edges given as rows with `start_name`, `end_name` and `type` keys."""
+        pass
+
+    @abstractmethod
+    def delete_edges(self, session, node_labels: List[str], rows: List[Dict[str, str]]):
+        """Delete a batch of edges given as rows with `start_name`, `end_name` and `type` keys."""
+        pass
+
     @abstractmethod
     def clear_data(self, session):
         """Remove all data from the database."""
         pass
 
     @abstractmethod
-    def end_session(self):
-        """Close the database connection."""
+    def add_hyper_edges(self, session, rows: List[Dict]):
+        """Add a batch of hyper edges given as rows with `id`, `type` and `members` keys."""
+        pass
+
+    @abstractmethod
+    def delete_hyper_edges(self, session, rows: List[Dict]):
+        """Delete a batch of hyper edges given as rows with an `id` key."""
+        pass
+
+    @abstractmethod
+    def find_hyper_edges(self, session, node_name: Optional[str] = None,
+                         relationship_type: Optional[str] = None) -> List[Dict]:
+        """Return hyper edges, optionally only those containing a node and/or of a type."""
+        pass
+
+    @abstractmethod
+    def scan_nodes(self, session, after: Optional[str], limit: int) -> List[str]:
+        """Return the names of the next `limit` nodes in name order after `after`, or the first ones if it is None."""
+        pass
+
+    @abstractmethod
+    def scan_edges(self, session, first: str, last: str) -> "pd.DataFrame":
+        """Return the edges leaving the nodes named `first` to `last` as `start_name`, `end_name` and `type` columns."""
+        pass
+
+    @abstractmethod
+    def find_nodes(self, session, names: List[str]) -> List[str]:
+        """Return the given names that exist as nodes."""
+        pass
+
+    @abstractmethod
+    def find_node_edges(self, session, names: List[str]) -> List[Dict]:
+        """Return the edges leaving or entering the named nodes as rows with `start_name`, `end_name` and `type` keys."""
+        pass
+
+    @abstractmethod
+    def find_member_hyper_edges(self, session, names: List[str]) -> List[Dict]:
+        """Return the hyper edges with any of the named nodes as a member."""
+        pass
+
+    @abstractmethod
+    def scan_hyper_edges(self, session, after: Optional[str], limit: int) -> List[Dict]:
+        """Return the next `limit` hyper edges in id order after `after`, or the first ones if it is None."""
+        pass
+
+    @abstractmethod
+    def stream_query(self, session, query: str, parameters: Optional[Dict],
+                     batch_size: int) -> Iterator["pa.RecordBatch"]:
+        """
+        Run a read query and yield its result as Arrow record batches of at most `batch_size` rows,
+        or one empty batch with its columns if it has no rows.
+        """
+        pass
+
+    @abstractmethod
+    def export_hyper_edges_to_csv(self, session, file_name: str, members_file_name: str):
+        """Export hyper edges and their memberships to two CSV files."""
+        pass
+
+    @abstractmethod
+    def import_hyper_edges_from_csv(self, session, file_name: str, members_file_name: str):
+        """Import hyper edges and their memberships from two CSV files."""
+        pass
+
+    @abstractmethod
+    def export_hyper_edges_to_parquet(self, session, file_name: str, members_file_name: str):
+        """Export hyper edges and their memberships to two Parquet files."""
+        pass
+
+    @abstractmethod
+    def import_hyper_edges_from_parquet(self, session, file_name: str, members_file_name: str):
+        """Import hyper edges and their memberships from two Parquet files."""
+        pass
+
+    @abstractmethod
+    def start_session(self, fetch_size: Optional[int] = None):
+        """Start a database session; backends streaming results pull `fetch_size` records per round trip if given."""
+        pass
+
+    @abstractmethod
+    def begin_transaction(self, session):
+        """Open an explicit transaction on the session and return the handle to pass as `session`."""
+        pass
+
+    @abstractmethod
+    def commit_transaction(self, transaction):
+        """Commit a transaction opened with `begin_transaction`."""
+        pass
+
+    @abstractmethod
+    def rollback_transaction(self, transaction):
+        """Roll back a transaction opened with `begin_transaction`."""
+        pass
+
+    @abstractmethod
+    def end_session(self, session=None):
+        """Release a session obtained from `start_session`, or close the database connection if none is given."""
         pass
@@ -1,24 +1,200 @@
 from database.Database import *
+from typing import TYPE_CHECKING, Iterable
+import csv
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
 import kuzu
 
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Batches of at least this many new nodes for an empty node table are staged to a CSV file and loaded with COPY.
+COPY_THRESHOLD = 1000
+
+# Maximum number of prepared statements kept per database.
+PREPARED_STATEMENT_CACHE_SIZE = 256
+
+# Connections opened to the database and handed out by `start_session`.
+DEFAULT_POOL_SIZE = 4
+
+# Names looked up one by one through the primary key index before lookups switch to one join over all names.
+INDEX_LOOKUP_LIMIT = 64
+
+# Rows per record batch of query results fetched as Arrow tables.
+ARROW_CHUNK_SIZE = 100_000
+
+# Bytes of an edges CSV file parsed at a time when splitting it by relationship type.
+SPLIT_BLOCK_SIZE = 16 << 20
+
+# Columns of an exported edges file.
+EDGE_COLUMNS = ("start_name", "end_name", "type")
+
+# Tables of the schema itself, which relationship types cannot be named after; Kuzu ignores the case of table names.
+RESERVED_TABLES = ("gnode", "hyperedge", "member")
+
+
+def _writes(method):
+    """Run a KuzuDatabase method while holding the write lock, as Kuzu allows one write transaction at a time."""
+
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+
+    return locked
+
 
 class KuzuDatabase(Database):
-    def __init__(self):
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE):
+        """
+        Open the database with a pool of `pool_size` connections.
+        Read-only operations on different connections run in parallel, while writes and explicit
+        transactions take turns on a re-entrant lock instead of failing on a concurrent write transaction.
+        """
         self.db = kuzu.Database("./demo_db")
-        self.session = kuzu.Connection(self.db)
+        self.pool_size = pool_size
+        # Last in, first out, so the connections in use keep their prepared statements warm.
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(kuzu.Connection(self.db))
+        self._write_lock = threading.RLock()
+        self._prepared_statements = OrderedDict()
+        self._prepared_statements_lock = threading.Lock()
+        self._open_transactions = set()
+        # Lower-cased names of the rel tables holding edges, so writes do not look types up in the catalog.
+        self._rel_tables = set()
+        # Rel tables created by explicit transactions, by connection, cached once the transaction commits.
+        self._pending_rel_tables: Dict[kuzu.Connection, set] = {}
 
         self._create_schema()
 
+    @_writes
     def _create_schema(self):
+        session = self.start_session()
+        try:
+            self._create_tables(session)
+        finally:
+            self.end_session(session)
+
+    def _create_tables(self, session):
+        """Create the tables of the schema that do not exist yet and cache the names of the rel tables."""
         query = f"""CREATE NODE TABLE IF NOT EXISTS GNode(name STRING, PRIMARY KEY (name))"""
-        self._execute_query(self.session, query)
+        self._execute_query(session, query)
 
         query = f"""CREATE REL TABLE IF NOT EXISTS Connects(FROM GNode TO GNode)"""
-        self._execute_query(self.session, query)
+        self._execute_query(session, query)
+
+        query = f"""CREATE NODE TABLE IF NOT EXISTS HyperEdge(id STRING, relationship_type STRING, PRIMARY KEY (id))"""
+        self._execute_query(session, query)
+
+        query = f"""CREATE REL TABLE IF NOT EXISTS Member(FROM HyperEdge TO GNode)"""
+        self._execute_query(session, query)
+
+        query = """CALL show_tables() RETURN name, type"""
+        self._rel_tables = {record["name"].lower() for record in self._execute_query(session, query)
+                            if record["type"] == "REL" and record["name"].lower() not in RESERVED_TABLES}
+
+    def _has_rel_table(self, session, relationship_type: str) -> bool:
+        """Return whether the relationship type has a rel table, as seen by the connection."""
+        key = relationship_type.lower()
+        return key in self._rel_tables or key in self._pending_rel_tables.get(session, ())
+
+    def _create_rel_tables(self, session, relationship_types: Iterable[str]):
+        """
+        Create a rel table from GNode to GNode for every relationship type that has none yet, checking the cached
+        schema rather than the catalog. Tables created in an explicit transaction are cached once it commits,
+        as rolling it back drops them again. Types differing only in case share a table.
+        """
+        for relationship_type in relationship_types:
+            if self._has_rel_table(session, relationship_type):
+                continue
+            key = relationship_type.lower()
+            if key in RESERVED_TABLES:
+                raise ValueError(f"Relationship type {relationship_type!r} is reserved by the Kuzu schema!")
+            self._execute_query(session, f"CREATE REL TABLE IF NOT EXISTS {relationship_type}(FROM GNode TO GNode)")
+            if session in self._open_transactions:
+                self._pending_rel_tables.setdefault(session, set()).add(key)
+            else:
+                self._rel_tables.add(key)
+
+    def _execute(self, session, query: str, parameters: Optional[Dict] = None) -> kuzu.QueryResult:
+        """Execute a Cypher query and return the Kuzu query result, recording it in the metrics if enabled."""
+        metrics = self.metrics
+        if metrics is None:
+            return self._run(session, query, parameters)
+
+        start = time.perf_counter()
+        try:
+            result = self._run(session, query, parameters)
+        except RuntimeError:
+            metrics.record_query(query, time.perf_counter() - start, failed=True)
+            raise
+        metrics.record_query(query, time.perf_counter() - start, result.get_num_tuples())
+        return result
+
+    def _run(self, session, query: str, parameters: Optional[Dict] = None) -> kuzu.QueryResult:
+        try:
+            if parameters:
+                return session.execute(self._prepare(session, query), parameters)
+            return session.execute(query)
+        except RuntimeError:
+            # Kuzu rolls back an explicit transaction as soon as one of its statements fails.
+            self._open_transactions.discard(session)
+            self._pending_rel_tables.pop(session, None)
+            raise
 
     def _execute_query(self, session, query: str, parameters: Optional[Dict] = None) -> List[Dict]:
         """Execute a Cypher query and return the results."""
-        session.execute(query)
+        result = self._execute(session, query, parameters)
+        column_names = result.get_column_names()
+        records = []
+        while result.has_next():
+            records.append(dict(zip(column_names, result.get_next())))
+        return records
+
+    def _execute_arrow(self, session, query: str, parameters: Optional[Dict] = None) -> "pa.Table":
+        """Execute a Cypher query and return the results as one Arrow table, skipping row-by-row conversion."""
+        return self._execute(session, query, parameters).get_as_arrow(ARROW_CHUNK_SIZE)
+
+    def stream_query(self, session, query: str, parameters: Optional[Dict] = None,
+                     batch_size: int = ARROW_CHUNK_SIZE) -> Iterator["pa.RecordBatch"]:
+        """
+        Yield the result of a read query as Arrow record batches.
+        Kuzu materializes the whole result natively, so it is converted to Arrow columns in one call,
+        without a Python object per row, and the native result is released before the first batch.
+        """
+        result = self._execute(session, query, parameters)
+        try:
+            table = result.get_as_arrow(batch_size)
+        finally:
+            result.close()
+        batches = table.to_batches(max_chunksize=batch_size)
+        if not batches:
+            import pyarrow as pa
+            batches = [pa.RecordBatch.from_pylist([], schema=table.schema)]
+        yield from batches
+
+    def _prepare(self, session, query: str) -> kuzu.PreparedStatement:
+        """Return a prepared statement for the query, compiling it only on a cache miss."""
+        key = (session, query)
+        with self._prepared_statements_lock:
+            statement = self._prepared_statements.get(key)
+            if statement is not None:
+                self._prepared_statements.move_to_end(key)
+                return statement
+
+        statement = session.prepare(query)
+        with self._prepared_statements_lock:
+            self._prepared_statements[key] = statement
+            if len(self._prepared_statements) > PREPARED_STATEMENT_CACHE_SIZE:
+                self._prepared_statements.popitem(last=False)
+        return statement
 
     def _replace_slash(self, s: str) -> str:
         """
@@ -34,13 +210,14 @@ class KuzuDatabase(Database):
         self._execute_query(session, query)
 
     def export_edges_to_csv(self, session, file_name: str):
-        """Export edges to a CSV file."""
+        """Export the edges of every rel table to a CSV file, with their relationship type."""
         query = f"""
-        COPY (MATCH (a:GNode)-[f:Connects]->(b:GNode) RETURN a.name AS start_name, b.name AS end_name) 
+        COPY (MATCH (a:GNode)-[f]->(b:GNode) RETURN a.name AS start_name, b.name AS end_name, label(f) AS type)
         TO '{self._replace_slash(file_name)}' (HEADER=true, DELIM="|");
         """
         self._execute_query(session, query)
 
+    @_writes
     def import_nodes_from_csv(self, session, file_name: str):
         """Import nodes from a CSV file into Neo4j."""
 
@@ -49,74 +226,535 @@ class KuzuDatabase(Database):
         """
         self._execute_query(session, query)
 
+    def _copy_edges(self, session, file_name: str, format: str):
+        """
+        Bulk load an exported edges file with one COPY per relationship type. The file is streamed once and split by
+        its type column into Parquet files of a temporary directory, which Kuzu also loads faster than CSV.
+        Exports without a type column hold only Connects edges and are loaded as they are.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.csv as pa_csv
+        import pyarrow.parquet as pq
+
+        if format == "csv":
+            # Names are read as text even if they look like numbers.
+            batches = pa_csv.open_csv(
+                file_name, read_options=pa_csv.ReadOptions(block_size=SPLIT_BLOCK_SIZE),
+                parse_options=pa_csv.ParseOptions(delimiter="|"),
+                convert_options=pa_csv.ConvertOptions(column_types=dict.fromkeys(EDGE_COLUMNS, pa.string())))
+            schema = batches.schema
+        else:
+            parquet_file = pq.ParquetFile(file_name)
+            batches = parquet_file.iter_batches(batch_size=ARROW_CHUNK_SIZE)
+            schema = parquet_file.schema_arrow
+        if "type" not in schema.names:
+            options = ' (HEADER=true, DELIM="|")' if format == "csv" else ""
+            self._execute_query(session, f"COPY Connects FROM '{self._replace_slash(file_name)}'{options};")
+            return
+
+        split_schema = pa.schema([schema.field("start_name"), schema.field("end_name")])
+        with tempfile.TemporaryDirectory() as directory:
+            writers = {}
+            try:
+                for batch in batches:
+                    types = batch.column("type")
+                    for relationship_type in pc.unique(types).to_pylist():
+                        if relationship_type not in writers:
+                            path = os.path.join(directory, f"{len(writers)}.parquet")
+                            writers[relationship_type] = pq.ParquetWriter(path, split_schema)
+                        rows = batch.filter(pc.equal(types, relationship_type)).select(split_schema.names)
+                        writers[relationship_type].write_batch(rows)
+            finally:
+                for writer in writers.values():
+                    writer.close()
+
+            self._create_rel_tables(session, writers)
+            for relationship_type, writer in writers.items():
+                query = f"""
+                COPY {relationship_type} FROM '{self._replace_slash(writer.where)}';
+                """
+                self._execute_query(session, query)
+
+    @_writes
     def import_edges_from_csv(self, session, file_name: str):
-        """Import edges from a CSV file into Neo4j."""
+        """Import edges from a CSV file, into the rel table of their relationship type."""
+        self._copy_edges(session, file_name, "csv")
+
+    def export_nodes_to_parquet(self, session, file_name: str):
+        """Export nodes to a Parquet file."""
+        query = f"""
+        COPY (MATCH (u:GNode) RETURN u.name AS name) TO '{self._replace_slash(file_name)}';
+        """
+        self._execute_query(session, query)
+
+    def export_edges_to_parquet(self, session, file_name: str):
+        """Export the edges of every rel table to a Parquet file, with their relationship type."""
+        query = f"""
+        COPY (MATCH (a:GNode)-[f]->(b:GNode) RETURN a.name AS start_name, b.name AS end_name, label(f) AS type)
+        TO '{self._replace_slash(file_name)}';
+        """
+        self._execute_query(session, query)
 
+    @_writes
+    def import_nodes_from_parquet(self, session, file_name: str):
+        """Import nodes from a Parquet file."""
         query = f"""
-        COPY Connects FROM '{self._replace_slash(file_name)}' (HEADER=true, DELIM="|");
+        COPY GNode FROM '{self._replace_slash(file_name)}';
         """
         self._execute_query(session, query)
 
+    @_writes
+    def import_edges_from_parquet(self, session, file_name: str):
+        """Import edges from a Parquet file, into the rel table of their relationship type."""
+        self._copy_edges(session, file_name, "parquet")
+
+    @_writes
     def add_node(self, session, labels: Optional[List[str]] = None, properties: Optional[Dict[str, str]] = None):
         """Add a node to the database."""
 
         label_str = self.format_labels(labels)
-        properties_str = self.format_properties(properties)
+        properties_str, parameters = self.format_parameters(properties)
 
         query = f"""
                 CREATE (n{label_str} {properties_str})
                 RETURN n
                 """
-        self._execute_query(self.session, query)
+        self._execute_query(session, query, parameters)
 
+    @_writes
     def delete_node(self, session, labels: List[str], properties: Dict[str, str]):
-        """Delete a node"""
+        """Delete a node, all its connected edges and the hyper edges it is a member of."""
 
         label_str = self.format_labels(labels)
-        properties_str = self.format_properties(properties)
-        query = f""" MATCH(n{label_str} {properties_str}) DELETE n"""
-        self._execute_query(self.session, query)
+        properties_str, parameters = self.format_parameters(properties)
+        query = f""" MATCH(h:HyperEdge)-[:Member]->(n{label_str} {properties_str}) DETACH DELETE h"""
+        self._execute_query(session, query, parameters)
+        query = f""" MATCH(n{label_str} {properties_str}) DETACH DELETE n"""
+        self._execute_query(session, query, parameters)
 
+    @_writes
     def add_edge(self, session, start_node_labels: List[str], start_node_properties: Dict[str, str],
                  end_node_labels: List[str], end_node_properties: Dict[str, str], relationship_name: str = 'Connects'):
-        """Add a relationship (edge) between two nodes."""
+        """Add a relationship (edge) between two nodes unless it exists, creating the nodes that do not exist yet."""
 
         start_label_str = self.format_labels(start_node_labels)
         end_label_str = self.format_labels(end_node_labels)
 
-        start_properties_str = self.format_properties(start_node_properties)
-        end_properties_str = self.format_properties(end_node_properties)
+        start_properties_str, start_parameters = self.format_parameters(start_node_properties, "start_")
+        end_properties_str, end_parameters = self.format_parameters(end_node_properties, "end_")
 
-        query = f""" MATCH(a{start_label_str} {start_properties_str}), (b{end_label_str} {end_properties_str})
-        CREATE(a) - [r:{relationship_name}]->(b)"""
-        self._execute_query(self.session, query)
+        self._create_rel_tables(session, [relationship_name])
+        query = f""" MERGE(a{start_label_str} {start_properties_str}) MERGE(b{end_label_str} {end_properties_str})
+        MERGE(a) - [r:{relationship_name}]->(b)"""
+        self._execute_query(session, query, {**start_parameters, **end_parameters})
 
+    @_writes
     def delete_edge(self, session, start_node_labels: List[str], start_node_properties: Dict[str, str],
                     end_node_labels: List[str], end_node_properties: Dict[str, str], relationship_name: str):
         """Delete a relationship (edge) between two nodes."""
+        # A relationship type without a rel table has no edges to delete.
+        if not self._has_rel_table(session, relationship_name):
+            return
 
         start_label_str = self.format_labels(start_node_labels)
         end_label_str = self.format_labels(end_node_labels)
 
-        start_properties_str = self.format_properties(start_node_properties)
-        end_properties_str = self.format_properties(end_node_properties)
+        start_properties_str, start_parameters = self.format_parameters(start_node_properties, "start_")
+        end_properties_str, end_parameters = self.format_parameters(end_node_properties, "end_")
 
-        query = f""" MATCH(a{start_label_str} {start_properties_str})-[r:Connects]->(b{end_label_str} {end_properties_str}) 
+        query = f""" MATCH(a{start_label_str} {start_properties_str})-[r:{relationship_name}]->(b{end_label_str} {end_properties_str})
         DELETE r"""
-        self._execute_query(self.session, query)
+        self._execute_query(session, query, {**start_parameters, **end_parameters})
 
-    def clear_data(self, session):
-        """Remove all data from the database."""
+    def _existing_node_names(self, session, names: List[str]) -> set:
+        """Return the subset of the given names that already exist as GNode rows."""
         query = """
-        MATCH (n)
+        UNWIND $names AS name
+        MATCH (n:GNode {name: name})
+        RETURN n.name AS name
+        """
+        return {record["name"] for record in self._execute_query(session, query, {"names": names})}
+
+    def _copy_nodes(self, session, names: List[str]):
+        """Stage node names in a temporary CSV file and bulk load it with COPY."""
+        with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as file:
+            writer = csv.writer(file, delimiter="|")
+            writer.writerow(["name"])
+            writer.writerows([name] for name in names)
+        try:
+            query = f"""
+            COPY GNode FROM '{self._replace_slash(file.name)}' (HEADER=true, DELIM="|");
+            """
+            self._execute_query(session, query)
+        finally:
+            os.remove(file.name)
+
+    def _create_nodes(self, session, labels: List[str], names: Iterable[str]):
+        """Create the nodes of the given names that do not exist yet, through COPY for large batches."""
+        names = list(dict.fromkeys(names))
+        existing = self._existing_node_names(session, names)
+        new_names = [name for name in names if name not in existing]
+        if not new_names:
+            return
+
+        # COPY FROM only runs in auto-commit mode, so explicit transactions always take the UNWIND path.
+        # Kuzu 0.6 corrupts the primary key column when COPY appends to a node table that already
+        # has rows, so only the first load of an empty table is staged.
+        if (len(new_names) >= COPY_THRESHOLD and session not in self._open_transactions
+                and not any("\n" in name or "\r" in name for name in new_names)
+                and not self._execute_query(session, "MATCH (n:GNode) RETURN n.name LIMIT 1")):
+            self._copy_nodes(session, new_names)
+            return
+
+        label_str = self.format_labels(labels)
+        query = f"""
+        UNWIND $names AS name
+        CREATE (n{label_str} {{name: name}})
+        """
+        self._execute_query(session, query, {"names": new_names})
+
+    @_writes
+    def add_nodes(self, session, labels: List[str], rows: List[Dict[str, str]]):
+        """Add a batch of nodes, staging large batches through COPY and small ones through UNWIND."""
+        self._create_nodes(session, labels, (row["name"] for row in rows))
+
+    @_writes
+    def delete_nodes(self, session, labels: List[str], rows: List[Dict[str, str]]):
+        """
+        Delete a batch of nodes, all their connected edges and the hyper edges they are members of, with one
+        UNWIND statement for the hyper edges and one for the nodes. A hyper edge id is derived from its members,
+        so a hyper edge cannot outlive one of them.
+        """
+        label_str = self.format_labels(labels)
+        names = [row["name"] for row in rows]
+        query = f"""
+        UNWIND $names AS name
+        MATCH (h:HyperEdge)-[:Member]->(n{label_str} {{name: name}})
+        DETACH DELETE h
+        """
+        self._execute_query(session, query, {"names": names})
+        query = f"""
+        UNWIND $names AS name
+        MATCH (n{label_str} {{name: name}})
         DETACH DELETE n
         """
+        self._execute_query(session, query, {"names": names})
+
+    def _existing_edges(self, session, label_str: str, relationship_name: str, rows: List[Dict[str, str]]) -> set:
+        """Return the (start_name, end_name) pairs of the rows already linked by an edge of the relationship type."""
+        query = f"""
+        UNWIND $rows AS row
+        WITH row.start_name AS start_name, row.end_name AS end_name
+        MATCH (a{label_str} {{name: start_name}})-[r:{relationship_name}]->(b{label_str} {{name: end_name}})
+        RETURN DISTINCT a.name AS start_name, b.name AS end_name
+        """
+        return {(record["start_name"], record["end_name"])
+                for record in self._execute_query(session, query, {"rows": rows})}
+
+    @_writes
+    def add_edges(self, session, node_labels: List[str], rows: List[Dict[str, str]]):
+        """
+        Add a batch of edges with one UNWIND statement per relationship type, creating the missing endpoints
+        first as Neo4j's MERGE does. Kuzu 0.6 cannot MERGE a relationship between projected nodes, so edges
+        already stored are looked up first and only the missing ones are created, each once.
+        Row fields are projected with WITH before matching, which lets Kuzu look the endpoints up through
+        the primary key index instead of joining against a scan of the whole node table.
+        """
+        label_str = self.format_labels(node_labels)
+        self._create_nodes(session, node_labels, (row[key] for row in rows for key in ("start_name", "end_name")))
+        groups = self.group_by_type(rows)
+        self._create_rel_tables(session, groups)
+        for relationship_name, typed_rows in groups.items():
+            pairs = dict.fromkeys((row["start_name"], row["end_name"]) for row in typed_rows)
+            existing = self._existing_edges(session, label_str, relationship_name, typed_rows)
+            new_rows = [{"start_name": start_name, "end_name": end_name}
+                        for start_name, end_name in pairs if (start_name, end_name) not in existing]
+            if not new_rows:
+                continue
+            query = f"""
+            UNWIND $rows AS row
+            WITH row.start_name AS start_name, row.end_name AS end_name
+            MATCH (a{label_str} {{name: start_name}})
+            WITH a, end_name
+            MATCH (b{label_str} {{name: end_name}})
+            CREATE (a)-[r:{relationship_name}]->(b)
+            """
+            self._execute_query(session, query, {"rows": new_rows})
+
+    @_writes
+    def delete_edges(self, session, node_labels: List[str], rows: List[Dict[str, str]]):
+        """Delete a batch of edges with one UNWIND statement per relationship type that has a rel table."""
+        label_str = self.format_labels(node_labels)
+        for relationship_name, typed_rows in self.group_by_type(rows).items():
+            if not self._has_rel_table(session, relationship_name):
+                continue
+            query = f"""
+            UNWIND $rows AS row
+            WITH row.start_name AS start_name, row.end_name AS end_name
+            MATCH (a{label_str} {{name: start_name}})-[r:{relationship_name}]->(b{label_str} {{name: end_name}})
+            DELETE r
+            """
+            self._execute_query(session, query, {"rows": typed_rows})
+
+    @_writes
+    def clear_data(self, session):
+        """
+        Remove all data from the database. Kuzu has no TRUNCATE, and detach-deleting every node takes minutes
+        on graphs of tens of thousands of nodes, so outside explicit transactions the tables are dropped and
+        created again in milliseconds, dropping the rel tables of the relationship types in use too.
+        """
+        if session in self._open_transactions:
+            query = """
+            MATCH (n)
+            DETACH DELETE n
+            """
+            self._execute_query(session, query)
+            return
+
+        query = """CALL show_tables() RETURN name, type"""
+        tables = self._execute_query(session, query)
+        # Rel tables refer to the node tables, so they are dropped first.
+        for record in sorted(tables, key=lambda record: record["type"] != "REL"):
+            self._execute_query(session, f"DROP TABLE {record['name']}")
+        with self._prepared_statements_lock:
+            self._prepared_statements.clear()
+        self._create_tables(session)
+
+    @_writes
+    def add_hyper_edges(self, session, rows: List[Dict]):
+        """
+        Add a batch of hyper edges as HyperEdge nodes linked to their members through Member edges.
+        A hyper edge id is derived from its members, so hyper edges already stored are skipped as a whole.
+        """
+        query = """
+        UNWIND $ids AS id
+        MATCH (h:HyperEdge {id: id})
+        RETURN h.id AS id
+        """
+        ids = list(dict.fromkeys(row["id"] for row in rows))
+        existing = {record["id"] for record in self._execute_query(session, query, {"ids": ids})}
+        rows = [row for row in {row["id"]: row for row in rows}.values() if row["id"] not in existing]
+        if not rows:
+            return
+
+        query = """
+        UNWIND $rows AS row
+        WITH row.id AS id, row.type AS type
+        CREATE (h:HyperEdge {id: id, relationship_type: type})
+        """
+        self._execute_query(session, query, {"rows": [{"id": row["id"], "type": row["type"]} for row in rows]})
+
+        members = list(dict.fromkeys(name for row in rows for name in row["members"]))
+        self.add_nodes(session, ["GNode"], [{"name": name} for name in members])
+
+        query = """
+        UNWIND $rows AS row
+        WITH row.id AS id, row.name AS name
+        MATCH (h:HyperEdge {id: id})
+        WITH h, name
+        MATCH (n:GNode {name: name})
+        CREATE (h)-[:Member]->(n)
+        """
+        member_rows = [{"id": row["id"], "name": name} for row in rows for name in row["members"]]
+        self._execute_query(session, query, {"rows": member_rows})
+
+    @_writes
+    def delete_hyper_edges(self, session, rows: List[Dict]):
+        """Delete a batch of hyper edges together with their Member edges."""
+        query = """
+        UNWIND $ids AS id
+        MATCH (h:HyperEdge {id: id})
+        DETACH DELETE h
+        """
+        self._execute_query(session, query, {"ids": [row["id"] for row in rows]})
+
+    def find_hyper_edges(self, session, node_name: Optional[str] = None,
+                         relationship_type: Optional[str] = None) -> List[Dict]:
+        """Return hyper edges, optionally only those containing a node and/or of a type."""
+        query, parameters = self.format_hyper_edge_query(node_name, relationship_type)
+        return self._execute_query(session, query, parameters)
+
+    def scan_nodes(self, session, after: Optional[str], limit: int) -> List[str]:
+        """Return the names of the next `limit` nodes in name order after `after`, or the first ones if it is None."""
+        query, parameters = self.format_node_scan_query(after, limit)
+        return self._execute_arrow(session, query, parameters).column("name").to_pylist()
+
+    def scan_edges(self, session, first: str, last: str) -> "pd.DataFrame":
+        """Return the edges leaving the nodes named `first` to `last`, fetched as one Arrow table."""
+        query, parameters = self.format_edge_scan_query(first, last, type_function="label")
+        return self._execute_arrow(session, query, parameters).to_pandas()
+
+    def _lookup(self, session, parameter: str, values: List[str], value_queries: List[str],
+                values_query: Tuple[str, Dict]) -> List[Dict]:
+        """
+        Run `value_queries` once per value, bound to `$<parameter>`, while there are at most INDEX_LOOKUP_LIMIT
+        values, as Kuzu only uses the primary key index for a parameter matched directly, and otherwise run
+        `values_query` joining all values against one scan.
+        """
+        if len(values) > INDEX_LOOKUP_LIMIT:
+            return self._execute_query(session, *values_query)
+        return [record for value in values for query in value_queries
+                for record in self._execute_query(session, query, {parameter: value})]
+
+    def find_nodes(self, session, names: List[str]) -> List[str]:
+        """Return the given names that exist as nodes."""
+        query = """
+        UNWIND $names AS name
+        MATCH (n:GNode {name: name})
+        RETURN n.name AS name
+        """
+        records = self._lookup(session, "name", names, ["MATCH (n:GNode {name: $name}) RETURN n.name AS name"],
+                               (query, {"names": names}))
+        return [record["name"] for record in records]
+
+    def find_node_edges(self, session, names: List[str]) -> List[Dict]:
+        """Return the edges leaving or entering the named nodes."""
+        name_queries = [
+            "MATCH (a:GNode {name: $name})-[r]->(b:GNode) "
+            "RETURN a.name AS start_name, b.name AS end_name, label(r) AS type",
+            "MATCH (a:GNode)-[r]->(b:GNode {name: $name}) "
+            "RETURN a.name AS start_name, b.name AS end_name, label(r) AS type",
+        ]
+        return self._lookup(session, "name", names, name_queries,
+                            self.format_node_edges_query(names, type_function="label"))
+
+    def find_member_hyper_edges(self, session, names: List[str]) -> List[Dict]:
+        """
+        Return the hyper edges with any of the named nodes as a member.
+        Their ids are looked up first and their members by id, as one pattern spanning both Member hops
+        makes Kuzu scan every node.
+        """
+        query = """
+        UNWIND $names AS name
+        MATCH (:GNode {name: name})<-[:Member]-(h:HyperEdge)
+        RETURN DISTINCT h.id AS id
+        """
+        records = self._lookup(session, "name", names,
+                               ["MATCH (:GNode {name: $name})<-[:Member]-(h:HyperEdge) RETURN h.id AS id"],
+                               (query, {"names": names}))
+        ids = list(dict.fromkeys(record["id"] for record in records))
+        if not ids:
+            return []
+
+        query = """
+        UNWIND $ids AS id
+        MATCH (h:HyperEdge {id: id})-[:Member]->(m:GNode)
+        RETURN h.id AS id, h.relationship_type AS type, collect(m.name) AS members
+        """
+        id_query = """
+        MATCH (h:HyperEdge {id: $id})-[:Member]->(m:GNode)
+        RETURN h.id AS id, h.relationship_type AS type, collect(m.name) AS members
+        """
+        return self._lookup(session, "id", ids, [id_query], (query, {"ids": ids}))
+
+    def scan_hyper_edges(self, session, after: Optional[str], limit: int) -> List[Dict]:
+        """Return the next `limit` hyper edges in id order after `after`, or the first ones if it is None."""
+        query, parameters = self.format_hyper_edge_scan_query(after, limit)
+        return self._execute_query(session, query, parameters)
+
+    def export_hyper_edges_to_csv(self, session, file_name: str, members_file_name: str):
+        """Export hyper edges and their memberships to two CSV files."""
+        query = f"""
+        COPY (MATCH (h:HyperEdge) RETURN h.id AS id, h.relationship_type AS relationship_type)
+        TO '{self._replace_slash(file_name)}' (HEADER=true, DELIM="|");
+        """
+        self._execute_query(session, query)
+
+        query = f"""
+        COPY (MATCH (h:HyperEdge)-[:Member]->(n:GNode) RETURN h.id AS hyper_edge_id, n.name AS name)
+        TO '{self._replace_slash(members_file_name)}' (HEADER=true, DELIM="|");
+        """
+        self._execute_query(session, query)
+
+    @_writes
+    def import_hyper_edges_from_csv(self, session, file_name: str, members_file_name: str):
+        """Import hyper edges and their memberships from two CSV files."""
+        query = f"""
+        COPY HyperEdge FROM '{self._replace_slash(file_name)}' (HEADER=true, DELIM="|");
+        """
+        self._execute_query(session, query)
+
+        query = f"""
+        COPY Member FROM '{self._replace_slash(members_file_name)}' (HEADER=true, DELIM="|");
+        """
+        self._execute_query(session, query)
+
+    def export_hyper_edges_to_parquet(self, session, file_name: str, members_file_name: str):
+        """Export hyper edges and their memberships to two Parquet files."""
+        query = f"""
+        COPY (MATCH (h:HyperEdge) RETURN h.id AS id, h.relationship_type AS relationship_type)
+        TO '{self._replace_slash(file_name)}';
+        """
         self._execute_query(session, query)
 
-    def start_session(self):
-        """Open a new database connection."""
-        return self.session
+        query = f"""
+        COPY (MATCH (h:HyperEdge)-[:Member]->(n:GNode) RETURN h.id AS hyper_edge_id, n.name AS name)
+        TO '{self._replace_slash(members_file_name)}';
+        """
+        self._execute_query(session, query)
+
+    @_writes
+    def import_hyper_edges_from_parquet(self, session, file_name: str, members_file_name: str):
+        """Import hyper edges and their memberships from two Parquet files."""
+        query = f"""
+        COPY HyperEdge FROM '{self._replace_slash(file_name)}';
+        """
+        self._execute_query(session, query)
+
+        query = f"""
+        COPY Member FROM '{self._replace_slash(members_file_name)}';
+        """
+        self._execute_query(session, query)
+
+    def begin_transaction(self, session):
+        """
+        Switch the connection from auto-commit to one explicit transaction.
+        The calling thread holds the write lock until the transaction is committed or rolled back.
+        """
+        self._write_lock.acquire()
+        try:
+            self._execute_query(session, "BEGIN TRANSACTION")
+        except BaseException:
+            self._write_lock.release()
+            raise
+        self._open_transactions.add(session)
+        return session
+
+    def commit_transaction(self, transaction):
+        """Commit the explicit transaction on the connection; a failed commit still needs `rollback_transaction`."""
+        self._open_transactions.discard(transaction)
+        created = self._pending_rel_tables.pop(transaction, set())
+        self._execute_query(transaction, "COMMIT")
+        self._rel_tables.update(created)
+        self._write_lock.release()
+
+    def rollback_transaction(self, transaction):
+        """Roll back the explicit transaction on the connection, unless a failed statement already did."""
+        try:
+            self._pending_rel_tables.pop(transaction, None)
+            if transaction in self._open_transactions:
+                self._open_transactions.discard(transaction)
+                self._execute_query(transaction, "ROLLBACK")
+        finally:
+            self._write_lock.release()
+
+    def start_session(self, fetch_size: Optional[int] = None):
+        """
+        Check a connection out of the pool, waiting until one is returned if all are in use.
+        Kuzu materializes query results, so `fetch_size` has no effect.
+        """
+        return self._pool.get()
 
-    def end_session(self):
-        """Close the database connection."""
-        pass
+    def end_session(self, session=None):
+        """Return a connection to the pool, or close every pooled connection if none is given."""
+        if session is not None:
+            self._pool.put(session)
+            return
+        with self._prepared_statements_lock:
+            self._prepared_statements.clear()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
@@ -1,122 +1,431 @@
 from neo4j import GraphDatabase
 
 from database.Database import *
+from database.Neo4jSchema import Neo4jSchema, NODE_LABEL
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Iterable
+import csv
+import os
+import shutil
+import time
+from utils.batching import chunked, DEFAULT_BATCH_SIZE
+from utils.environment import load_environment
+from utils.progress import ProgressCallback, ThroughputMeter
 
-# Load environment variables from the .env file
-load_dotenv()
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Records pulled per round trip by the dedicated sessions of partitioned exports.
+EXPORT_FETCH_SIZE = 10_000
+
+# Arrow type factories, by their pyarrow name, of the Cypher property types kept as typed Parquet columns;
+# any other type is written as text.
+ARROW_PROPERTY_TYPES = {
+    "BOOLEAN": "bool_",
+    "INTEGER": "int64",
+    "FLOAT": "float64",
+    "STRING": "string",
+}
 
 
 class Neo4jDatabase(Database):
-    def __init__(self):
+    def __init__(self, driver=None):
+        """Connect with the DB_URI credentials from the environment, or use an already created `driver`."""
+        load_environment()
         self._db_uri = os.getenv("DB_URI")
         self._db_username = os.getenv("DB_USERNAME")
         self._db_password = os.getenv("DB_PASSWORD")
-        self._driver = GraphDatabase.driver(self._db_uri, auth=(self._db_username, self._db_password))
+        if driver is None:
+            driver = GraphDatabase.driver(self._db_uri, auth=(self._db_username, self._db_password))
+        self._driver = driver
+
+        self.schema = Neo4jSchema(self)
+        self.schema.ensure()
+
+    @staticmethod
+    def format_node_labels(labels: Optional[List[str]]) -> str:
+        """Format node labels always including GNode, so that matching by name seeks its constraint's index."""
+        labels = list(labels or ())
+        if NODE_LABEL not in labels:
+            labels.insert(0, NODE_LABEL)
+        return Database.format_labels(labels)
+
+    def index_health(self) -> Dict:
+        """Report the state of the indexes and which expected indexes and constraints are missing."""
+        return self.schema.health()
 
     def _execute_query(self, session, query: str, parameters: Optional[Dict] = None) -> List[Dict]:
-        """Execute a Cypher query and return the results."""
-        result = session.run(query, parameters or {})
-        return [record for record in result]
+        """Execute a Cypher query and return the results, recording it in the metrics if enabled."""
+        metrics = self.metrics
+        if metrics is None:
+            return [record for record in session.run(query, parameters or {})]
+
+        start = time.perf_counter()
+        try:
+            records = [record for record in session.run(query, parameters or {})]
+        except Exception:
+            metrics.record_query(query, time.perf_counter() - start, failed=True)
+            raise
+        metrics.record_query(query, time.perf_counter() - start, len(records))
+        return records
+
+    def _stream_to_csv(self, session, query: str, parameters: Dict, column_names: List[str], file_name: str,
+                       meter: ThroughputMeter, header: bool = True):
+        """Write a query result to a CSV file chunk by chunk while the driver streams it, keeping memory flat."""
+        with open(file_name, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file, delimiter="|")
+            if header:
+                writer.writerow(column_names)
+            for records in chunked(session.run(query, parameters), DEFAULT_BATCH_SIZE):
+                writer.writerows(record.values() for record in records)
+                meter.update(len(records))
+
+    def _export_to_csv(self, session, query: str, id_expression: str, column_names: List[str], file_name: str,
+                       fetch_size: Optional[int], partitions: int, progress_callback: Optional[ProgressCallback]):
+        """
+        Stream a query result into a CSV file.
+        The query must contain a `{range_filter}` placeholder inside its WHERE clause. With several partitions
+        the node-id space is split into ranges of `id_expression`, each streamed by its own session into a part file.
+        """
+        meter = ThroughputMeter(progress_callback)
+        if partitions <= 1:
+            if fetch_size is None:
+                self._stream_to_csv(session, query.format(range_filter="true"), {}, column_names, file_name, meter)
+            else:
+                with self._driver.session(fetch_size=fetch_size) as export_session:
+                    self._stream_to_csv(export_session, query.format(range_filter="true"), {}, column_names,
+                                        file_name, meter)
+            return meter
+
+        bounds = self._execute_query(session, "MATCH (n) RETURN min(id(n)) AS low, max(id(n)) AS high")[0]
+        low, high = bounds["low"], bounds["high"]
+        if low is None:
+            low, high = 0, -1
+        step = (high - low) // partitions + 1
+        ranged_query = query.format(range_filter=f"{id_expression} >= $low AND {id_expression} < $high")
+        part_file_names = [f"{file_name}.part{partition}" for partition in range(partitions)]
+
+        def export_partition(partition: int):
+            parameters = {"low": low + partition * step, "high": low + (partition + 1) * step}
+            with self._driver.session(fetch_size=fetch_size or EXPORT_FETCH_SIZE) as export_session:
+                self._stream_to_csv(export_session, ranged_query, parameters, column_names,
+                                    part_file_names[partition], meter, header=False)
+
+        try:
+            with ThreadPoolExecutor(max_workers=partitions) as executor:
+                list(executor.map(export_partition, range(partitions)))
 
-    def export_nodes_to_csv(self, session, file_name: str):
-        """Export nodes to a CSV file."""
+            with open(file_name, "w", newline="", encoding="utf-8") as file:
+                csv.writer(file, delimiter="|").writerow(column_names)
+                for part_file_name in part_file_names:
+                    with open(part_file_name, encoding="utf-8") as part_file:
+                        shutil.copyfileobj(part_file, file)
+        finally:
+            for part_file_name in part_file_names:
+                if os.path.exists(part_file_name):
+                    os.remove(part_file_name)
+        return meter
+
+    def export_nodes_to_csv(self, session, file_name: str, fetch_size: Optional[int] = None, partitions: int = 1,
+                            progress_callback: Optional[ProgressCallback] = None):
+        """Stream nodes to a CSV file, optionally scanning node-id ranges in parallel sessions."""
         query = """
         MATCH (n)
+        WHERE NOT n:HyperEdge AND {range_filter}
         RETURN labels(n) AS labels , properties(n) AS properties
         """
         column_names = ["labels", "properties"]
-        records = self._execute_query(session, query)
-        df = pd.DataFrame(records, columns=column_names)
-        df.to_csv(file_name, index=False)
+        return self._export_to_csv(session, query, "id(n)", column_names, file_name, fetch_size, partitions,
+                                   progress_callback)
 
-    def export_edges_to_csv(self, session, file_name: str):
-        """Export edges to a CSV file."""
+    def export_edges_to_csv(self, session, file_name: str, fetch_size: Optional[int] = None, partitions: int = 1,
+                            progress_callback: Optional[ProgressCallback] = None):
+        """Stream edges to a CSV file, optionally scanning start-node-id ranges in parallel sessions."""
         query = """
         MATCH (a)-[r]->(b)
+        WHERE NOT a:HyperEdge AND {range_filter}
         RETURN a.name AS start_name, b.name AS end_name, type(r) AS type, properties(r) AS properties
         """
         column_names = ["start_name", "end_name", "type", "properties"]
-        records = self._execute_query(session, query)
-        df = pd.DataFrame(records, columns=column_names)
-        df.to_csv(file_name, index=False)
-
-    def import_nodes_from_csv(self, session, file_name: str):
-        """Import nodes from a CSV file into Neo4j."""
-        df = pd.read_csv(file_name)
-        for _, row in df.iterrows():
-            labels = row['labels'].strip("[]").replace("'", "").split(", ")
-            properties = ast.literal_eval(row['properties'])
-            labels_str = self.format_labels(labels)
-            properties_str = self.format_properties(properties)
+        return self._export_to_csv(session, query, "id(a)", column_names, file_name, fetch_size, partitions,
+                                   progress_callback)
+
+    def _execute_write(self, session, work):
+        """Run `work` in one explicit write transaction, or directly if `session` already is a transaction."""
+        if hasattr(session, "execute_write"):
+            return session.execute_write(work)
+        return work(session)
+
+    def _merge_nodes(self, tx, groups: Dict[Tuple[str, ...], List[Dict]]):
+        """MERGE node property maps by name, one UNWIND statement per label combination."""
+        for labels, rows in groups.items():
+            labels_str = self.format_node_labels(list(labels))
             query = f"""
-            MERGE (n{labels_str} {properties_str})
+            UNWIND $rows AS properties
+            MERGE (n{labels_str} {{name: properties.name}})
+            SET n += properties
             """
-            self._execute_query(session, query)
-
-    def import_edges_from_csv(self, session, file_name: str):
-        """Import edges from a CSV file into Neo4j."""
-        df = pd.read_csv(file_name)
-        for _, row in df.iterrows():
-            start_name = row['start_name']
-            end_name = row['end_name']
-            relationship_type = row['type']
-            properties = row['properties'] if not pd.isna(row['properties']) else '{}'
-            properties_dict = ast.literal_eval(properties)
-            properties_str = self.format_properties(properties_dict)
+            self._execute_query(tx, query, {"rows": rows})
+
+    def _merge_edges(self, tx, rows: List[Dict]):
+        """MERGE edge rows with `start_name`, `end_name`, `type` and `properties`, one statement per type."""
+        for relationship_type, typed_rows in self.group_by_type(rows).items():
             query = f"""
-            MATCH (a {{name: '{start_name}'}}), (b {{name: '{end_name}'}})
-            MERGE (a)-[r:{relationship_type} {properties_str}]->(b)
+            UNWIND $rows AS row
+            MATCH (a:GNode {{name: row.start_name}}), (b:GNode {{name: row.end_name}})
+            MERGE (a)-[r:{relationship_type}]->(b)
+            SET r += row.properties
             """
-            self._execute_query(session, query)
+            self._execute_query(tx, query, {"rows": typed_rows})
+
+    def import_nodes_from_csv(self, session, file_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                              progress_callback: Optional[ProgressCallback] = None):
+        """Stream nodes from a CSV file into Neo4j, committing one UNWIND transaction per chunk."""
+        import pandas as pd
+        meter = ThroughputMeter(progress_callback)
+        for chunk in pd.read_csv(file_name, delimiter='|', dtype=str, chunksize=batch_size):
+            labels = chunk['labels'].fillna("").str.strip("[]").str.replace("'", "", regex=False)
+            properties = self.parse_properties(chunk['properties'])
+
+            groups = {tuple(label for label in label_list.split(", ") if label):
+                      properties[labels == label_list].tolist() for label_list in labels.unique()}
+            self._execute_write(session, lambda tx: self._merge_nodes(tx, groups))
+            self.schema.index_properties(key for rows in groups.values() for row in rows for key in row)
+            meter.update(len(chunk))
+
+    def import_edges_from_csv(self, session, file_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                              progress_callback: Optional[ProgressCallback] = None):
+        """Stream edges from a CSV file into Neo4j, committing one UNWIND transaction per chunk."""
+        import pandas as pd
+        meter = ThroughputMeter(progress_callback)
+        for chunk in pd.read_csv(file_name, delimiter='|', dtype=str, chunksize=batch_size):
+            rows = pd.DataFrame({
+                "start_name": chunk['start_name'],
+                "end_name": chunk['end_name'],
+                "type": chunk['type'],
+                "properties": self.parse_properties(chunk['properties']),
+            }).to_dict("records")
+            self._execute_write(session, lambda tx: self._merge_edges(tx, rows))
+            meter.update(len(chunk))
+
+    def _property_type(self, session, query: str) -> Optional["pa.StructType"]:
+        """
+        Build the Arrow struct type of the properties matched by `query`, which returns each property `key`
+        with the distinct `types` of its values. Keys whose values mix several types are stored as text.
+        Return None when there are no properties.
+        """
+        import pyarrow as pa
+        fields = []
+        for record in self._execute_query(session, query):
+            types = {value_type.replace(" NOT NULL", "") for value_type in record["types"]} - {"NULL"}
+            arrow_type = pa.string()
+            if len(types) == 1:
+                (value_type,) = types
+                if value_type.startswith("LIST<") and value_type[5:-1] in ARROW_PROPERTY_TYPES:
+                    arrow_type = pa.list_(getattr(pa, ARROW_PROPERTY_TYPES[value_type[5:-1]])())
+                else:
+                    arrow_type = getattr(pa, ARROW_PROPERTY_TYPES.get(value_type, "string"))()
+            fields.append(pa.field(record["key"], arrow_type))
+        if not fields:
+            return None
+        return pa.struct(sorted(fields, key=lambda field: field.name))
+
+    @staticmethod
+    def _to_arrow_properties(properties: Dict, property_type: "pa.StructType") -> Dict:
+        """Convert the values of properties stored as text to strings so they fit `property_type`."""
+        import pyarrow as pa
+        converted = {}
+        for key, value in properties.items():
+            if value is not None and not isinstance(value, str) and property_type.field(key).type == pa.string():
+                value = str(value)
+            converted[key] = value
+        return converted
+
+    def _stream_to_parquet(self, session, query: str, schema: "pa.Schema", file_name: str, meter: ThroughputMeter):
+        """Write a query result to a Parquet file one record batch per chunk while the driver streams it."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        property_type = schema.field("properties").type if "properties" in schema.names else None
+        with pq.ParquetWriter(file_name, schema) as writer:
+            for records in chunked(session.run(query), DEFAULT_BATCH_SIZE):
+                rows = [record.data() for record in records]
+                if property_type is not None:
+                    for row in rows:
+                        row["properties"] = self._to_arrow_properties(row["properties"], property_type)
+                writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=schema))
+                meter.update(len(records))
+
+    def export_nodes_to_parquet(self, session, file_name: str, progress_callback: Optional[ProgressCallback] = None):
+        """Stream nodes to a Parquet file, with labels as a list column and properties as a typed struct column."""
+        import pyarrow as pa
+        property_type = self._property_type(session, """
+        MATCH (n)
+        WHERE NOT n:HyperEdge
+        UNWIND keys(n) AS key
+        RETURN key, collect(DISTINCT valueType(n[key])) AS types
+        """)
+        fields = [pa.field("labels", pa.list_(pa.string()))]
+        if property_type is not None:
+            fields.append(pa.field("properties", property_type))
+
+        query = """
+        MATCH (n)
+        WHERE NOT n:HyperEdge
+        RETURN labels(n) AS labels, properties(n) AS properties
+        """
+        meter = ThroughputMeter(progress_callback)
+        self._stream_to_parquet(session, query, pa.schema(fields), file_name, meter)
+        return meter
+
+    def export_edges_to_parquet(self, session, file_name: str, progress_callback: Optional[ProgressCallback] = None):
+        """Stream edges to a Parquet file, with properties as a typed struct column."""
+        import pyarrow as pa
+        property_type = self._property_type(session, """
+        MATCH (a)-[r]->()
+        WHERE NOT a:HyperEdge
+        UNWIND keys(r) AS key
+        RETURN key, collect(DISTINCT valueType(r[key])) AS types
+        """)
+        fields = [pa.field("start_name", pa.string()), pa.field("end_name", pa.string()),
+                  pa.field("type", pa.string())]
+        if property_type is not None:
+            fields.append(pa.field("properties", property_type))
+
+        query = """
+        MATCH (a)-[r]->(b)
+        WHERE NOT a:HyperEdge
+        RETURN a.name AS start_name, b.name AS end_name, type(r) AS type, properties(r) AS properties
+        """
+        meter = ThroughputMeter(progress_callback)
+        self._stream_to_parquet(session, query, pa.schema(fields), file_name, meter)
+        return meter
+
+    @staticmethod
+    def _from_arrow_properties(row: Dict) -> Dict:
+        """Return the properties of a Parquet row without the keys the entity does not have."""
+        return {key: value for key, value in (row.get("properties") or {}).items() if value is not None}
+
+    def import_nodes_from_parquet(self, session, file_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                                  progress_callback: Optional[ProgressCallback] = None):
+        """Stream nodes from a Parquet file into Neo4j, committing one UNWIND transaction per record batch."""
+        import pyarrow.parquet as pq
+        meter = ThroughputMeter(progress_callback)
+        for batch in pq.ParquetFile(file_name).iter_batches(batch_size=batch_size):
+            groups = {}
+            for row in batch.to_pylist():
+                groups.setdefault(tuple(row["labels"] or ()), []).append(self._from_arrow_properties(row))
+            self._execute_write(session, lambda tx: self._merge_nodes(tx, groups))
+            self.schema.index_properties(key for rows in groups.values() for row in rows for key in row)
+            meter.update(batch.num_rows)
+
+    def import_edges_from_parquet(self, session, file_name: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                                  progress_callback: Optional[ProgressCallback] = None):
+        """Stream edges from a Parquet file into Neo4j, committing one UNWIND transaction per record batch."""
+        import pyarrow.parquet as pq
+        meter = ThroughputMeter(progress_callback)
+        for batch in pq.ParquetFile(file_name).iter_batches(batch_size=batch_size):
+            rows = [{"start_name": row["start_name"], "end_name": row["end_name"], "type": row["type"],
+                     "properties": self._from_arrow_properties(row)} for row in batch.to_pylist()]
+            self._execute_write(session, lambda tx: self._merge_edges(tx, rows))
+            meter.update(batch.num_rows)
 
     def add_node(self, session, labels: Optional[List[str]] = None, properties: Optional[Dict[str, str]] = None):
         """Add a node to the database."""
-        labels_str = self.format_labels(labels)
-        properties_str = self.format_properties(properties)
+        labels_str = self.format_node_labels(labels)
+        properties_str, parameters = self.format_parameters(properties)
         query = f"""
         MERGE (n{labels_str} {properties_str})
         """
-        self._execute_query(session, query)
+        self._execute_query(session, query, parameters)
 
     def delete_node(self, session, labels: List[str], properties: Dict[str, str]):
-        """Delete a node and all its connected edges."""
-        labels_str = self.format_labels(labels)
-        properties_str = self.format_properties(properties)
+        """Delete a node, all its connected edges and the hyper edges it is a member of."""
+        labels_str = self.format_node_labels(labels)
+        properties_str, parameters = self.format_parameters(properties)
         query = f"""
         MATCH (n{labels_str} {properties_str})
-        DETACH DELETE n
+        OPTIONAL MATCH (h:HyperEdge)-[:Member]->(n)
+        DETACH DELETE h, n
         """
-        self._execute_query(session, query)
+        self._execute_query(session, query, parameters)
 
     def add_edge(self, session, start_node_labels: List[str], start_node_properties: Dict[str, str],
                  end_node_labels: List[str], end_node_properties: Dict[str, str], relationship_name: str):
         """Add a relationship (edge) between two nodes."""
-        start_labels_str = self.format_labels(start_node_labels)
-        end_labels_str = self.format_labels(end_node_labels)
-        start_properties_str = self.format_properties(start_node_properties)
-        end_properties_str = self.format_properties(end_node_properties)
+        start_labels_str = self.format_node_labels(start_node_labels)
+        end_labels_str = self.format_node_labels(end_node_labels)
+        start_properties_str, start_parameters = self.format_parameters(start_node_properties, "start_")
+        end_properties_str, end_parameters = self.format_parameters(end_node_properties, "end_")
         query = f"""
         MERGE (start{start_labels_str} {start_properties_str})
         MERGE (end{end_labels_str} {end_properties_str})
         MERGE (start)-[r:{relationship_name}]->(end)
         RETURN start.id AS startId, end.id AS endId
         """
-        self._execute_query(session, query)
+        self._execute_query(session, query, {**start_parameters, **end_parameters})
 
     def delete_edge(self, session, start_node_labels: List[str], start_node_properties: Dict[str, str],
                     end_node_labels: List[str], end_node_properties: Dict[str, str], relationship_name: str):
         """Delete a relationship (edge) between two nodes."""
-        start_labels_str = self.format_labels(start_node_labels)
-        end_labels_str = self.format_labels(end_node_labels)
-        start_properties_str = self.format_properties(start_node_properties)
-        end_properties_str = self.format_properties(end_node_properties)
+        start_labels_str = self.format_node_labels(start_node_labels)
+        end_labels_str = self.format_node_labels(end_node_labels)
+        start_properties_str, start_parameters = self.format_parameters(start_node_properties, "start_")
+        end_properties_str, end_parameters = self.format_parameters(end_node_properties, "end_")
         query = f"""
         MATCH (start{start_labels_str} {start_properties_str})
         MATCH (end{end_labels_str} {end_properties_str})
         OPTIONAL MATCH (start)-[r:{relationship_name}]->(end)
         DELETE r
         """
-        self._execute_query(session, query)
+        self._execute_query(session, query, {**start_parameters, **end_parameters})
+
+    def add_nodes(self, session, labels: List[str], rows: List[Dict[str, str]]):
+        """Add a batch of nodes with a single UNWIND statement."""
+        labels_str = self.format_node_labels(labels)
+        query = f"""
+        UNWIND $rows AS row
+        MERGE (n{labels_str} {{name: row.name}})
+        """
+        self._execute_query(session, query, {"rows": rows})
+
+    def delete_nodes(self, session, labels: List[str], rows: List[Dict[str, str]]):
+        """
+        Delete a batch of nodes, all their connected edges and the hyper edges they are members of with
+        a single UNWIND statement. A hyper edge id is derived from its members, so a hyper edge cannot
+        outlive one of them.
+        """
+        labels_str = self.format_node_labels(labels)
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (n{labels_str} {{name: row.name}})
+        OPTIONAL MATCH (h:HyperEdge)-[:Member]->(n)
+        DETACH DELETE h, n
+        """
+        self._execute_query(session, query, {"rows": rows})
+
+    def add_edges(self, session, node_labels: List[str], rows: List[Dict[str, str]]):
+        """Add a batch of edges with one UNWIND statement per relationship type."""
+        labels_str = self.format_node_labels(node_labels)
+        for relationship_name, typed_rows in self.group_by_type(rows).items():
+            query = f"""
+            UNWIND $rows AS row
+            MERGE (start{labels_str} {{name: row.start_name}})
+            MERGE (end{labels_str} {{name: row.end_name}})
+            MERGE (start)-[r:{relationship_name}]->(end)
+            """
+            self._execute_query(session, query, {"rows": typed_rows})
+
+    def delete_edges(self, session, node_labels: List[str], rows: List[Dict[str, str]]):
+        """Delete a batch of edges with one UNWIND statement per relationship type."""
+        labels_str = self.format_node_labels(node_labels)
+        for relationship_name, typed_rows in self.group_by_type(rows).items():
+            query = f"""
+            UNWIND $rows AS row
+            MATCH (start{labels_str} {{name: row.start_name}})-[r:{relationship_name}]->(end{labels_str} {{name: row.end_name}})
+            DELETE r
+            """
+            self._execute_query(session, query, {"rows": typed_rows})
 
     def clear_data(self, session):
         """Remove all data from the database."""
@@ -126,10 +435,190 @@ class Neo4jDatabase(Database):
         """
         self._execute_query(session, query)
 
-    def start_session(self):
-        """Start a new database session."""
-        return self._driver.session()
+    def add_hyper_edges(self, session, rows: List[Dict]):
+        """Add a batch of hyper edges as HyperEdge nodes linked to their members through Member edges."""
+        query = """
+        UNWIND $rows AS row
+        MERGE (h:HyperEdge {id: row.id})
+        ON CREATE SET h.relationship_type = row.type
+        WITH h, row
+        UNWIND row.members AS name
+        MERGE (n:GNode {name: name})
+        MERGE (h)-[:Member]->(n)
+        """
+        self._execute_query(session, query, {"rows": rows})
+
+    def delete_hyper_edges(self, session, rows: List[Dict]):
+        """Delete a batch of hyper edges together with their Member edges."""
+        query = """
+        UNWIND $ids AS id
+        MATCH (h:HyperEdge {id: id})
+        DETACH DELETE h
+        """
+        self._execute_query(session, query, {"ids": [row["id"] for row in rows]})
+
+    def find_hyper_edges(self, session, node_name: Optional[str] = None,
+                         relationship_type: Optional[str] = None) -> List[Dict]:
+        """Return hyper edges, optionally only those containing a node and/or of a type."""
+        query, parameters = self.format_hyper_edge_query(node_name, relationship_type)
+        return [record.data() for record in self._execute_query(session, query, parameters)]
+
+    def stream_query(self, session, query: str, parameters: Optional[Dict] = None,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator["pa.RecordBatch"]:
+        """
+        Yield the result of a read query as Arrow record batches while the driver streams its records,
+        `fetch_size` of the session at a time, so memory stays bounded by one batch.
+        Nodes and relationships become maps of their properties, as in `Record.data`.
+        """
+        import pyarrow as pa
+        metrics = self.metrics
+        start = time.perf_counter()
+        rows = 0
+        try:
+            result = session.run(query, parameters or {})
+            keys = result.keys()
+            for records in chunked(result, batch_size):
+                rows += len(records)
+                yield pa.RecordBatch.from_pylist([record.data() for record in records])
+            if not rows:
+                yield pa.RecordBatch.from_pydict({key: [] for key in keys})
+        except Exception:
+            if metrics is not None:
+                metrics.record_query(query, time.perf_counter() - start, rows, failed=True)
+            raise
+        if metrics is not None:
+            metrics.record_query(query, time.perf_counter() - start, rows)
+
+    def scan_nodes(self, session, after: Optional[str], limit: int) -> List[str]:
+        """Return the names of the next `limit` nodes in name order after `after`, or the first ones if it is None."""
+        query, parameters = self.format_node_scan_query(after, limit)
+        return [record["name"] for record in self._execute_query(session, query, parameters)]
+
+    def scan_edges(self, session, first: str, last: str) -> "pd.DataFrame":
+        """Return the edges leaving the nodes named `first` to `last`."""
+        import pandas as pd
+        query, parameters = self.format_edge_scan_query(first, last)
+        records = self._execute_query(session, query, parameters)
+        return pd.DataFrame([record.values() for record in records], columns=["start_name", "end_name", "type"])
+
+    def find_nodes(self, session, names: List[str]) -> List[str]:
+        """Return the given names that exist as nodes."""
+        query = """
+        UNWIND $names AS name
+        MATCH (n:GNode {name: name})
+        RETURN n.name AS name
+        """
+        return [record["name"] for record in self._execute_query(session, query, {"names": names})]
+
+    def find_node_edges(self, session, names: List[str]) -> List[Dict]:
+        """Return the edges leaving or entering the named nodes."""
+        query, parameters = self.format_node_edges_query(names)
+        return [record.data() for record in self._execute_query(session, query, parameters)]
+
+    def find_member_hyper_edges(self, session, names: List[str]) -> List[Dict]:
+        """Return the hyper edges with any of the named nodes as a member."""
+        query, parameters = self.format_member_hyper_edge_query(names)
+        return [record.data() for record in self._execute_query(session, query, parameters)]
+
+    def scan_hyper_edges(self, session, after: Optional[str], limit: int) -> List[Dict]:
+        """Return the next `limit` hyper edges in id order after `after`, or the first ones if it is None."""
+        query, parameters = self.format_hyper_edge_scan_query(after, limit)
+        return [record.data() for record in self._execute_query(session, query, parameters)]
+
+    def export_hyper_edges_to_csv(self, session, file_name: str, members_file_name: str):
+        """Stream hyper edges and their memberships to two CSV files."""
+        query = """
+        MATCH (h:HyperEdge)
+        RETURN h.id AS id, h.relationship_type AS relationship_type
+        """
+        column_names = ["id", "relationship_type"]
+        self._stream_to_csv(session, query, {}, column_names, file_name, ThroughputMeter())
+
+        query = """
+        MATCH (h:HyperEdge)-[:Member]->(n:GNode)
+        RETURN h.id AS hyper_edge_id, n.name AS name
+        """
+        column_names = ["hyper_edge_id", "name"]
+        self._stream_to_csv(session, query, {}, column_names, members_file_name, ThroughputMeter())
+
+    def _merge_hyper_edges(self, session, row_chunks: Iterable[List[Dict]], member_row_chunks: Iterable[List[Dict]]):
+        """MERGE hyper edge rows and then membership rows, one UNWIND transaction per chunk."""
+        query = """
+        UNWIND $rows AS row
+        MERGE (h:HyperEdge {id: row.id})
+        SET h.relationship_type = row.relationship_type
+        """
+        for rows in row_chunks:
+            self._execute_write(session, lambda tx: self._execute_query(tx, query, {"rows": rows}))
+
+        query = """
+        UNWIND $rows AS row
+        MATCH (h:HyperEdge {id: row.hyper_edge_id}), (n:GNode {name: row.name})
+        MERGE (h)-[:Member]->(n)
+        """
+        for rows in member_row_chunks:
+            self._execute_write(session, lambda tx: self._execute_query(tx, query, {"rows": rows}))
+
+    def import_hyper_edges_from_csv(self, session, file_name: str, members_file_name: str,
+                                    batch_size: int = DEFAULT_BATCH_SIZE):
+        """Stream hyper edges and their memberships from two CSV files, one UNWIND transaction per chunk."""
+        import pandas as pd
+        self._merge_hyper_edges(
+            session,
+            (chunk.to_dict("records")
+             for chunk in pd.read_csv(file_name, delimiter='|', dtype=str, chunksize=batch_size)),
+            (chunk.to_dict("records")
+             for chunk in pd.read_csv(members_file_name, delimiter='|', dtype=str, chunksize=batch_size)))
+
+    def export_hyper_edges_to_parquet(self, session, file_name: str, members_file_name: str):
+        """Stream hyper edges and their memberships to two Parquet files."""
+        import pyarrow as pa
+        query = """
+        MATCH (h:HyperEdge)
+        RETURN h.id AS id, h.relationship_type AS relationship_type
+        """
+        schema = pa.schema([pa.field("id", pa.string()), pa.field("relationship_type", pa.string())])
+        self._stream_to_parquet(session, query, schema, file_name, ThroughputMeter())
+
+        query = """
+        MATCH (h:HyperEdge)-[:Member]->(n:GNode)
+        RETURN h.id AS hyper_edge_id, n.name AS name
+        """
+        schema = pa.schema([pa.field("hyper_edge_id", pa.string()), pa.field("name", pa.string())])
+        self._stream_to_parquet(session, query, schema, members_file_name, ThroughputMeter())
+
+    def import_hyper_edges_from_parquet(self, session, file_name: str, members_file_name: str,
+                                        batch_size: int = DEFAULT_BATCH_SIZE):
+        """Stream hyper edges and their memberships from two Parquet files, one UNWIND transaction per batch."""
+        import pyarrow.parquet as pq
+        self._merge_hyper_edges(
+            session,
+            (batch.to_pylist() for batch in pq.ParquetFile(file_name).iter_batches(batch_size=batch_size)),
+            (batch.to_pylist() for batch in pq.ParquetFile(members_file_name).iter_batches(batch_size=batch_size)))
+
+    def begin_transaction(self, session):
+        """Open an explicit transaction; its `run` method makes it usable wherever a session is expected."""
+        return session.begin_transaction()
+
+    def commit_transaction(self, transaction):
+        """Commit and close the transaction."""
+        transaction.commit()
+        transaction.close()
+
+    def rollback_transaction(self, transaction):
+        """Roll back and close the transaction."""
+        transaction.rollback()
+        transaction.close()
+
+    def start_session(self, fetch_size: Optional[int] = None):
+        """Start a new database session, pulling `fetch_size` records per round trip if given."""
+        if fetch_size is None:
+            return self._driver.session()
+        return self._driver.session(fetch_size=fetch_size)
 
-    def end_session(self):
-        """Close the database connection."""
+    def end_session(self, session=None):
+        """Close the session, or the database connection if no session is given."""
+        if session is not None:
+            session.close()
+            return
         self._driver.close()
@@ -0,0 +1,110 @@
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+from neo4j.exceptions import Neo4jError
+
+# Label of the graph nodes, which are identified by their name.
+NODE_LABEL = "GNode"
+
+# Uniqueness constraints as (name, label, property key); each one is backed by a range index.
+CONSTRAINTS = (
+    ("gnode_name", NODE_LABEL, "name"),
+    ("hyper_edge_id", "HyperEdge", "id"),
+)
+
+# Range indexes as (name, label, property key) of the lookups no constraint covers.
+INDEXES = (
+    ("hyper_edge_type", "HyperEdge", "relationship_type"),
+)
+
+# Prefix of the names of the range indexes on the other GNode property keys in use.
+PROPERTY_INDEX_PREFIX = "gnode_property_"
+
+
+def _quote(identifier: str) -> str:
+    """Quote a name or property key for Cypher, whatever characters it holds."""
+    return "`" + identifier.replace("`", "``") + "`"
+
+
+class Neo4jSchema:
+    def __init__(self, db):
+        """
+        Creates and checks the constraints and indexes behind the lookups of a Neo4jDatabase: unique GNode names and
+        HyperEdge ids, the HyperEdge type, and a range index on every other GNode property key in use, so that
+        matching a node by a property is an index seek rather than a label scan. Creating them is idempotent.
+        Schema commands cannot share a transaction with writes, so every method runs in a session of its own.
+        """
+        self._db = db
+        self._lock = threading.Lock()
+        # GNode property keys known to be indexed, so imports only create the indexes of new keys.
+        self._indexed_keys: Set[str] = set()
+
+    def ensure(self):
+        """Create the missing constraints and indexes, including those of the GNode property keys already in use."""
+        with self._db.start_session() as session:
+            for name, label, key in CONSTRAINTS:
+                query = (f"CREATE CONSTRAINT {_quote(name)} IF NOT EXISTS "
+                         f"FOR (n:{label}) REQUIRE n.{_quote(key)} IS UNIQUE")
+                try:
+                    self._db._execute_query(session, query)
+                except Neo4jError:
+                    # Duplicates already stored rule the constraint out, but an index still makes lookups seeks.
+                    self._create_index(session, f"{name}_index", label, key)
+            for name, label, key in INDEXES:
+                self._create_index(session, name, label, key)
+
+            query = """
+            CALL db.schema.nodeTypeProperties() YIELD nodeLabels, propertyName
+            WITH nodeLabels, propertyName
+            WHERE $label IN nodeLabels AND propertyName IS NOT NULL
+            RETURN DISTINCT propertyName AS key
+            """
+            keys = [record["key"] for record in self._db._execute_query(session, query, {"label": NODE_LABEL})]
+        self.index_properties(keys)
+
+    def _create_index(self, session, name: str, label: str, key: str):
+        query = f"CREATE INDEX {_quote(name)} IF NOT EXISTS FOR (n:{label}) ON (n.{_quote(key)})"
+        self._db._execute_query(session, query)
+
+    def index_properties(self, keys: Iterable[str]):
+        """Create a range index on each GNode property key not indexed yet; names are indexed by their constraint."""
+        with self._lock:
+            keys = [key for key in dict.fromkeys(keys) if key != "name" and key not in self._indexed_keys]
+            if not keys:
+                return
+            with self._db.start_session() as session:
+                for key in keys:
+                    self._create_index(session, PROPERTY_INDEX_PREFIX + key, NODE_LABEL, key)
+            self._indexed_keys.update(keys)
+
+    def _expected(self) -> List[Tuple[str, str]]:
+        return ([(label, key) for _, label, key in CONSTRAINTS + INDEXES]
+                + [(NODE_LABEL, key) for key in sorted(self._indexed_keys)])
+
+    def health(self) -> Dict:
+        """
+        Report the indexes of the database with their type, state and population percentage, together with
+        the expected `missing_indexes` and `missing_constraints`, as 'Label.key', and the `unhealthy` indexes,
+        which are still populating or have failed. `healthy` tells whether there is nothing to report.
+        """
+        query = """
+        SHOW INDEXES
+        YIELD name, type, labelsOrTypes, properties, state, populationPercent, owningConstraint
+        RETURN name, type, labelsOrTypes, properties, state, populationPercent, owningConstraint
+        """
+        with self._db.start_session() as session:
+            indexes = [record.data() for record in self._db._execute_query(session, query)]
+
+        # Lookup indexes cover every label or type and have neither.
+        single = {(index["labelsOrTypes"][0], index["properties"][0]): index for index in indexes
+                  if len(index["labelsOrTypes"] or ()) == 1 and len(index["properties"] or ()) == 1}
+        missing_indexes = [f"{label}.{key}" for label, key in self._expected() if (label, key) not in single]
+        missing_constraints = [f"{label}.{key}" for _, label, key in CONSTRAINTS
+                               if not single.get((label, key), {}).get("owningConstraint")]
+        unhealthy = [index["name"] for index in indexes if index["state"] != "ONLINE"]
+        return {
+            "healthy": not (missing_indexes or missing_constraints or unhealthy),
+            "indexes": indexes,
+            "missing_indexes": missing_indexes,
+            "missing_constraints": missing_constraints,
+            "unhealthy": unhealthy,
+        }
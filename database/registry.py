@@ -0,0 +1,65 @@
+import os
+import threading
+from importlib import import_module
+from typing import Dict, List, Optional, Union
+
+from utils.environment import load_environment
+
+# Entry point group under which other packages register Database subclasses, named by provider.
+ENTRY_POINT_GROUP = "hogdb.backends"
+
+# Backends by DATABASE_PROVIDER value: a Database subclass or its "module:class" path, imported on first use.
+BACKENDS: Dict[str, Union[str, type]] = {
+    "KUZU": "database.KuzuDatabase:KuzuDatabase",
+    "NEO4J": "database.Neo4jDatabase:Neo4jDatabase",
+}
+
+_lock = threading.Lock()
+
+
+def register_backend(provider: str, backend: Union[str, type]):
+    """Register a Database subclass, or its "module:class" path to import on first use, under a provider name."""
+    with _lock:
+        BACKENDS[provider.upper()] = backend
+
+
+def _entry_points() -> list:
+    from importlib.metadata import entry_points
+    return list(entry_points(group=ENTRY_POINT_GROUP))
+
+
+def available_backends() -> List[str]:
+    """Return the provider names of the registered backends and of those installed through entry points."""
+    names = dict.fromkeys(BACKENDS)
+    names.update((entry_point.name.upper(), None) for entry_point in _entry_points())
+    return list(names)
+
+
+def get_backend(provider: Optional[str] = None) -> type:
+    """
+    Return the Database subclass of a provider, DATABASE_PROVIDER by default, importing only its module
+    and so only its driver. Providers missing from BACKENDS are looked up among the entry points.
+    """
+    load_environment()
+    provider = (provider or os.getenv("DATABASE_PROVIDER") or "").upper()
+    with _lock:
+        backend = BACKENDS.get(provider)
+        if backend is None:
+            for entry_point in _entry_points():
+                if entry_point.name.upper() == provider:
+                    backend = entry_point.load()
+                    break
+        elif isinstance(backend, str):
+            module_name, _, class_name = backend.partition(":")
+            backend = getattr(import_module(module_name), class_name)
+        if backend is None:
+            raise ValueError(f"Unknown database provider {provider!r}, expected one of "
+                             f"{', '.join(available_backends())}!")
+        # Later lookups skip the import and the entry point scan.
+        BACKENDS[provider] = backend
+        return backend
+
+
+def create_database(provider: Optional[str] = None, **kwargs):
+    """Create the database of a provider, DATABASE_PROVIDER by default, passing `kwargs` to its constructor."""
+    return get_backend(provider)(**kwargs)
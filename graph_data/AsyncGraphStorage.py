@@ -0,0 +1,338 @@
+from graph_data.Node import Node
+from graph_data.Edge import Edge
+from graph_data.HyperEdge import HyperEdge
+from graph_data.GraphStorage import GraphStorage, QUERY_BATCH_SIZE
+from database.Database import Database
+from utils.batching import chunked, DEFAULT_BATCH_SIZE
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+from contextlib import asynccontextmanager
+import asyncio
+import os
+from utils.environment import load_environment
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Database operations allowed in flight at once.
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class AsyncGraphStorage:
+    """
+    Asynchronous counterpart of GraphStorage for services keeping many writes and reads in flight.
+    Neo4j is driven through the asynchronous driver and Kuzu through a thread pool of connections.
+    The in-memory nodes, edges and hyper edges are only changed on the event loop, once the database
+    has acknowledged a write. Export, import and clear wait for every operation in flight and run alone.
+    """
+
+    def __init__(self, db: Database, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, driver=None):
+        """Wrap a database connection; `driver` replaces the asynchronous Neo4j driver created from the environment."""
+        self.storage = GraphStorage(db)
+        self.mirror = self.storage.mirror
+        self.nodes = self.storage.nodes
+        self.edges = self.storage.edges
+        self.hyper_edges = self.storage.hyper_edges
+        self.db = db
+        self.max_concurrency = max_concurrency
+        self._gate = asyncio.Condition()
+        self._in_flight = 0
+        self._exclusive_waiting = 0
+        self._exclusive_running = False
+
+        # Only the asynchronous backend of the configured provider, and so only its driver, is imported.
+        load_environment()
+        if os.getenv("DATABASE_PROVIDER") == "NEO4J":
+            from database.AsyncNeo4jDatabase import AsyncNeo4jDatabase
+            self.backend = AsyncNeo4jDatabase(db, driver)
+        elif os.getenv("DATABASE_PROVIDER") == "KUZU":
+            from database.AsyncKuzuDatabase import AsyncKuzuDatabase
+            self.backend = AsyncKuzuDatabase(db)
+        else:
+            raise ValueError(f"Unknown database provider {os.getenv('DATABASE_PROVIDER')!r}, "
+                             f"expected NEO4J or KUZU!")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def close(self):
+        """Release the asynchronous driver or the worker threads; the wrapped database stays open."""
+        await self.backend.close()
+
+    @asynccontextmanager
+    async def _shared(self):
+        """
+        Hold one of the `max_concurrency` operation slots for the duration of the scope.
+        Operations queue behind a waiting export, import or clear, so those are not starved.
+        """
+        async with self._gate:
+            await self._gate.wait_for(lambda: not self._exclusive_running and not self._exclusive_waiting
+                                      and self._in_flight < self.max_concurrency)
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._gate:
+                self._in_flight -= 1
+                self._gate.notify_all()
+
+    @asynccontextmanager
+    async def _exclusive(self):
+        """Wait until no operation is in flight and keep new ones waiting for the duration of the scope."""
+        async with self._gate:
+            self._exclusive_waiting += 1
+            try:
+                await self._gate.wait_for(lambda: not self._exclusive_running and self._in_flight == 0)
+            finally:
+                self._exclusive_waiting -= 1
+            self._exclusive_running = True
+        try:
+            yield
+        finally:
+            async with self._gate:
+                self._exclusive_running = False
+                self._gate.notify_all()
+
+    async def _write(self, operation):
+        async with self._shared():
+            await self.backend.write(operation)
+
+    async def _run_chunks(self, chunks: Iterable[list], run_chunk):
+        """
+        Run `run_chunk` on every chunk with at most `max_concurrency` in flight, pulling the next chunk only
+        once a slot frees up, so a streamed input is never held in memory as a whole. After a failure no
+        further chunk starts; the chunks in flight finish, so the graph matches what they wrote, and the
+        first error is raised.
+        """
+        def first_error(tasks) -> Optional[BaseException]:
+            # Every exception is retrieved, so none is reported as never retrieved.
+            errors = [task.exception() for task in tasks]
+            return next((error for error in errors if error is not None), None)
+
+        in_flight = set()
+        error = None
+        for chunk in chunks:
+            if len(in_flight) >= self.max_concurrency:
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                error = first_error(done)
+                if error is not None:
+                    break
+            in_flight.add(asyncio.ensure_future(run_chunk(chunk)))
+        if in_flight:
+            done, _ = await asyncio.wait(in_flight)
+            last_error = first_error(done)
+            error = error or last_error
+        if error is not None:
+            raise error
+
+    def _add(self, collection, items: Iterable):
+        """Add items written to the database to the graph and the change log."""
+        items = list(items)
+        self.storage.changes.record(items, True)
+        collection.update(items)
+
+    def _discard(self, collection, items: Iterable):
+        """
+        Remove deleted items from the graph, remembering them so that loads from the database skip them,
+        and log the deletion. Nodes take their edges and hyper edges with them, as the database deletes them too.
+        """
+        items = list(items)
+        if collection is self.nodes:
+            for kind, detached in self.storage._detached(items).items():
+                self._discard(getattr(self, kind), detached)
+        self.storage.sync.record_deletions(items)
+        self.storage.changes.record(items, False)
+        collection.difference_update(items)
+
+    async def add_node(self, node_name: str):
+        """Add a node to the database and then to the graph."""
+        await self._write(lambda session: self.db.add_node(session, labels=["GNode"], properties={"name": node_name}))
+        self._add(self.nodes, [Node(node_name)])
+
+    async def delete_node(self, node_name: str):
+        """Delete a node from the database and then from the graph."""
+        await self._write(
+            lambda session: self.db.delete_node(session, labels=["GNode"], properties={"name": node_name}))
+        self._discard(self.nodes, [Node(node_name)])
+
+    async def add_edge(self, start_node_name: str, end_node_name: str, relationship_name: str = "Connects"):
+        """Add an edge to the database and then to the graph."""
+        await self._write(lambda session: self.db.add_edge(
+            session,
+            start_node_labels=["GNode"],
+            start_node_properties={"name": start_node_name},
+            end_node_labels=["GNode"],
+            end_node_properties={"name": end_node_name},
+            relationship_name=relationship_name
+        ))
+        self._add(self.edges, [Edge(start_node_name, end_node_name, relationship_name)])
+
+    async def delete_edge(self, start_node_name: str, end_node_name: str, relationship_name: str = "Connects"):
+        """Delete an edge from the database and then from the graph."""
+        await self._write(lambda session: self.db.delete_edge(
+            session,
+            start_node_labels=["GNode"],
+            start_node_properties={"name": start_node_name},
+            end_node_labels=["GNode"],
+            end_node_properties={"name": end_node_name},
+            relationship_name=relationship_name
+        ))
+        self._discard(self.edges, [Edge(start_node_name, end_node_name, relationship_name)])
+
+    async def add_nodes(self, node_names: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Add many nodes, with up to `max_concurrency` chunk writes in flight."""
+
+        async def add_chunk(chunk):
+            await self._write(lambda session: self.db.add_nodes(session, labels=["GNode"],
+                                                                rows=[{"name": name} for name in chunk]))
+            self._add(self.nodes, (Node(name) for name in chunk))
+
+        await self._run_chunks(chunked(node_names, batch_size), add_chunk)
+
+    async def delete_nodes(self, node_names: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Delete many nodes, with up to `max_concurrency` chunk writes in flight."""
+
+        async def delete_chunk(chunk):
+            await self._write(lambda session: self.db.delete_nodes(session, labels=["GNode"],
+                                                                   rows=[{"name": name} for name in chunk]))
+            self._discard(self.nodes, (Node(name) for name in chunk))
+
+        await self._run_chunks(chunked(node_names, batch_size), delete_chunk)
+
+    async def add_edges(self, edges: Iterable[Tuple[str, str, str]], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Add many (start_node, end_node, relationship_name) edges, up to `max_concurrency` chunk writes in flight."""
+
+        async def add_chunk(chunk):
+            await self._write(lambda session: self.db.add_edges(session, node_labels=["GNode"],
+                                                                rows=GraphStorage._edge_rows(chunk)))
+            self._add(self.edges, (Edge(*edge) for edge in chunk))
+
+        await self._run_chunks(chunked(edges, batch_size), add_chunk)
+
+    async def delete_edges(self, edges: Iterable[Tuple[str, str, str]], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Delete many (start_node, end_node, relationship_name) edges, up to `max_concurrency` chunks in flight."""
+
+        async def delete_chunk(chunk):
+            await self._write(lambda session: self.db.delete_edges(session, node_labels=["GNode"],
+                                                                   rows=GraphStorage._edge_rows(chunk)))
+            self._discard(self.edges, (Edge(*edge) for edge in chunk))
+
+        await self._run_chunks(chunked(edges, batch_size), delete_chunk)
+
+    async def add_hyper_edge(self, node_names: frozenset, relationship_type: str = "CONNECTED"):
+        """Add a hyper edge to the database and then to the graph."""
+        await self.add_hyper_edges([node_names], relationship_type)
+
+    async def delete_hyper_edge(self, node_names: frozenset, relationship_type: str = "CONNECTED"):
+        """Delete a hyper edge from the database and then from the graph."""
+        await self.delete_hyper_edges([node_names], relationship_type)
+
+    async def add_hyper_edges(self, node_name_sets: Iterable[frozenset], relationship_type: str = "CONNECTED",
+                              batch_size: int = DEFAULT_BATCH_SIZE):
+        """Add many hyper edges of one type, up to `max_concurrency` chunk writes in flight."""
+
+        async def add_chunk(chunk):
+            hyper_edges = [HyperEdge(node_names, relationship_type) for node_names in chunk]
+            await self._write(lambda session: self.db.add_hyper_edges(
+                session, rows=GraphStorage._hyper_edge_rows(hyper_edges)))
+            self._add(self.hyper_edges, hyper_edges)
+
+        await self._run_chunks(chunked(node_name_sets, batch_size), add_chunk)
+
+    async def delete_hyper_edges(self, node_name_sets: Iterable[frozenset], relationship_type: str = "CONNECTED",
+                                 batch_size: int = DEFAULT_BATCH_SIZE):
+        """Delete many hyper edges of one type, up to `max_concurrency` chunk writes in flight."""
+
+        async def delete_chunk(chunk):
+            hyper_edges = [HyperEdge(node_names, relationship_type) for node_names in chunk]
+            await self._write(lambda session: self.db.delete_hyper_edges(
+                session, rows=GraphStorage._hyper_edge_rows(hyper_edges)))
+            self._discard(self.hyper_edges, hyper_edges)
+
+        await self._run_chunks(chunked(node_name_sets, batch_size), delete_chunk)
+
+    async def find_hyper_edges(self, node_name: Optional[str] = None,
+                               relationship_type: Optional[str] = None) -> set:
+        """Query the database for hyper edges containing a node and/or of a given type."""
+        query, parameters = self.db.format_hyper_edge_query(node_name, relationship_type)
+        async with self._shared():
+            rows = await self.backend.read(query, parameters)
+        return {HyperEdge(frozenset(row["members"]), row["type"]) for row in rows}
+
+    async def query(self, cypher: str, parameters: Optional[Dict] = None, batch_size: int = QUERY_BATCH_SIZE,
+                    format: str = "arrow") -> AsyncIterator[Union["pa.RecordBatch", "pd.DataFrame"]]:
+        """
+        Run a read-only Cypher query like GraphStorage.query and iterate over its batches asynchronously.
+        Each batch is fetched in a worker thread once the previous one was consumed, so memory stays bounded
+        by one batch; an operation slot is held until the iteration ends.
+        """
+        batches = self.storage.query(cypher, parameters, batch_size, format)
+        async with self._shared():
+            try:
+                while True:
+                    batch = await asyncio.to_thread(next, batches, None)
+                    if batch is None:
+                        return
+                    yield batch
+            finally:
+                await asyncio.to_thread(batches.close)
+
+    async def neighbors(self, node_name: str, relationship_type: Optional[str] = None,
+                        direction: str = "out") -> tuple:
+        """Return the names of the nodes adjacent to a node like GraphStorage.neighbors, in a worker thread."""
+        async with self._shared():
+            return await asyncio.to_thread(self.storage.neighbors, node_name, relationship_type, direction)
+
+    async def degree(self, node_name: str, relationship_type: Optional[str] = None, direction: str = "out") -> int:
+        """Return the degree of a node like GraphStorage.degree, in a worker thread."""
+        async with self._shared():
+            return await asyncio.to_thread(self.storage.degree, node_name, relationship_type, direction)
+
+    async def load_hyper_edges(self):
+        """Replace the in-memory hyper edges with every hyper edge stored in the database."""
+        hyper_edges = await self.find_hyper_edges()
+        self.hyper_edges.clear()
+        self.hyper_edges.update(hyper_edges)
+
+    async def export_graph(self, format: str = "csv"):
+        """Export the graph like GraphStorage.export_graph, in a worker thread once no operation is in flight."""
+        async with self._exclusive():
+            await asyncio.to_thread(self.storage.export_graph, format=format)
+
+    async def import_graph(self, concurrent: bool = True, format: str = "csv"):
+        """Import the graph like GraphStorage.import_graph, in a worker thread once no operation is in flight."""
+        async with self._exclusive():
+            await asyncio.to_thread(self.storage.import_graph, concurrent=concurrent, format=format)
+
+    async def export_delta(self, directory: str = "exported", format: str = "csv"):
+        """Export the changes since the last checkpoint like GraphStorage.export_delta, once nothing is in flight."""
+        async with self._exclusive():
+            return await asyncio.to_thread(self.storage.export_delta, directory=directory, format=format)
+
+    async def apply_delta(self, directory: str = "exported", batch_size: int = DEFAULT_BATCH_SIZE):
+        """Replay delta files like GraphStorage.apply_delta, in a worker thread once no operation is in flight."""
+        async with self._exclusive():
+            return await asyncio.to_thread(self.storage.apply_delta, directory=directory, batch_size=batch_size)
+
+    async def clear_graph(self):
+        """Clear the graph storage once no operation is in flight."""
+        async with self._exclusive():
+            await asyncio.to_thread(self.storage.clear_graph)
+
+    def stats(self) -> dict:
+        """Return the operation and query statistics like GraphStorage.stats."""
+        return self.storage.stats()
+
+    @property
+    def import_timings(self) -> dict:
+        return self.storage.import_timings
+
+    @property
+    def export_timings(self) -> dict:
+        return self.storage.export_timings
+
+    def __str__(self):
+        return str(self.storage)
@@ -0,0 +1,180 @@
+from typing import TYPE_CHECKING, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+import json
+import os
+import threading
+
+from graph_data.Node import Node
+from graph_data.Edge import Edge
+from graph_data.HyperEdge import HyperEdge
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Collection of GraphStorage each kind of logged item belongs to.
+KINDS = {Node: "nodes", Edge: "edges", HyperEdge: "hyper_edges"}
+
+
+class Delta(NamedTuple):
+    """Net changes between two checkpoints: for every changed item of each collection, whether it ends up present."""
+    first_sequence: int
+    last_sequence: int
+    cleared: bool
+    changes: Dict[str, Dict[Hashable, bool]]
+
+    @property
+    def size(self) -> int:
+        """Number of changed items."""
+        return sum(len(items) for items in self.changes.values())
+
+
+class ChangeLog:
+    def __init__(self):
+        """
+        Append-only log of the additions and deletions written to the database since the last checkpoint.
+        Every write appends one entry holding its items, numbered by a sequence that keeps growing across
+        checkpoints. Clearing the graph drops the entries before it and is remembered instead, so a delta
+        taken across a clear empties the graph it is applied to first.
+        """
+        self.lock = threading.Lock()
+        self._entries: List[Tuple[list, bool]] = []
+        # Sequence number of the first entry held, i.e. of the last checkpoint.
+        self._first_sequence = 0
+        # Sequence number at which the graph was last cleared since the checkpoint, if it was.
+        self._cleared_at: Optional[int] = None
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._entries)
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number the next entry will get."""
+        with self.lock:
+            return self._first_sequence + len(self._entries)
+
+    def record(self, items: Iterable, present: bool):
+        """Append the addition (`present`) or deletion of nodes, edges or hyper edges written to the database."""
+        items = list(items)
+        if items:
+            with self.lock:
+                self._entries.append((items, present))
+
+    def extend(self, entries: Iterable[Tuple[list, bool]]):
+        """Append entries collected elsewhere, e.g. by a transaction that has committed."""
+        with self.lock:
+            self._entries.extend(entry for entry in entries if entry[0])
+
+    def record_clear(self):
+        """Drop the entries made moot by clearing the graph and remember the clear."""
+        with self.lock:
+            self._first_sequence += len(self._entries)
+            self._entries = []
+            self._cleared_at = self._first_sequence
+
+    def delta(self) -> Delta:
+        """Return the net change of every item logged since the last checkpoint; the last entry of an item wins."""
+        with self.lock:
+            entries = list(self._entries)
+            first_sequence = self._first_sequence
+            cleared = self._cleared_at is not None
+        changes = {kind: {} for kind in KINDS.values()}
+        for items, present in entries:
+            changed = changes[KINDS[type(items[0])]]
+            for item in items:
+                changed[item] = present
+        return Delta(first_sequence, first_sequence + len(entries), cleared, changes)
+
+    def checkpoint(self, sequence: Optional[int] = None):
+        """
+        Drop the entries before `sequence` (every entry by default), once the changes they record
+        were exported. Entries appended meanwhile are kept for the next delta.
+        """
+        with self.lock:
+            last_sequence = self._first_sequence + len(self._entries)
+            sequence = last_sequence if sequence is None else min(sequence, last_sequence)
+            # A clear made before the checkpoint was exported with it, even when no entries followed it.
+            if self._cleared_at is not None and self._cleared_at <= sequence:
+                self._cleared_at = None
+            if sequence <= self._first_sequence:
+                return
+            del self._entries[:sequence - self._first_sequence]
+            self._first_sequence = sequence
+
+
+def _write_table(frame: "pd.DataFrame", file_path: str, format: str):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    if format == "csv":
+        frame.to_csv(file_path, sep="|", index=False)
+    else:
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), file_path)
+
+
+def _read_table(file_path: str, format: str) -> "pd.DataFrame":
+    import pandas as pd
+    import pyarrow.parquet as pq
+    if format == "csv":
+        return pd.read_csv(file_path, delimiter="|", dtype=str, keep_default_na=False)
+    return pq.read_table(file_path).to_pandas()
+
+
+def _operations(items: Dict[Hashable, bool]) -> List[str]:
+    return ["add" if present else "delete" for present in items.values()]
+
+
+def write_delta(delta: Delta, directory: str = "exported", format: str = "csv"):
+    """
+    Write a delta as pipe-delimited CSV or Parquet files, one per collection with an `op` column of 'add' or
+    'delete', next to a `delta.json` manifest. Hyper edges use the layout of the exported hyper edge files.
+    """
+    import pandas as pd
+    os.makedirs(directory, exist_ok=True)
+    nodes, edges, hyper_edges = (delta.changes[kind] for kind in ("nodes", "edges", "hyper_edges"))
+
+    _write_table(pd.DataFrame({"name": [node.name for node in nodes], "op": _operations(nodes)}, dtype=str),
+                 os.path.join(directory, f"delta_nodes.{format}"), format)
+    _write_table(pd.DataFrame({"start_name": [edge.start_node_name for edge in edges],
+                               "end_name": [edge.end_node_name for edge in edges],
+                               "type": [edge.relationship_type for edge in edges],
+                               "op": _operations(edges)}, dtype=str),
+                 os.path.join(directory, f"delta_edges.{format}"), format)
+    _write_table(pd.DataFrame({"id": [hyper_edge.id for hyper_edge in hyper_edges],
+                               "relationship_type": [hyper_edge.relationship_type for hyper_edge in hyper_edges],
+                               "op": _operations(hyper_edges)}, dtype=str),
+                 os.path.join(directory, f"delta_hyper_edges.{format}"), format)
+    _write_table(pd.DataFrame({"hyper_edge_id": [hyper_edge.id for hyper_edge in hyper_edges
+                                                 for _ in hyper_edge.nodes],
+                               "name": [name for hyper_edge in hyper_edges for name in hyper_edge.node_names]},
+                              dtype=str),
+                 os.path.join(directory, f"delta_hyper_edge_members.{format}"), format)
+
+    with open(os.path.join(directory, "delta.json"), "w") as file:
+        json.dump({"format": format, "first_sequence": delta.first_sequence, "last_sequence": delta.last_sequence,
+                   "cleared": delta.cleared, "counts": {kind: len(items) for kind, items in delta.changes.items()}},
+                  file)
+
+
+def read_delta(directory: str = "exported") -> Delta:
+    """Read a delta written by `write_delta`, in the format its manifest names."""
+    with open(os.path.join(directory, "delta.json")) as file:
+        manifest = json.load(file)
+    format = manifest["format"]
+
+    def read(name: str) -> "pd.DataFrame":
+        return _read_table(os.path.join(directory, f"delta_{name}.{format}"), format)
+
+    nodes = read("nodes")
+    edges = read("edges")
+    hyper_edges = read("hyper_edges")
+    members = read("hyper_edge_members")
+    member_sets = members.groupby("hyper_edge_id")["name"].agg(frozenset)
+    hyper_edges = hyper_edges.join(member_sets, on="id", how="inner")
+
+    changes = {
+        "nodes": {Node(name): op == "add" for name, op in zip(nodes["name"], nodes["op"])},
+        "edges": {Edge(start_name, end_name, relationship_type): op == "add" for start_name, end_name,
+                  relationship_type, op in zip(edges["start_name"], edges["end_name"], edges["type"], edges["op"])},
+        "hyper_edges": {HyperEdge(node_names, relationship_type): op == "add" for relationship_type, node_names, op
+                        in zip(hyper_edges["relationship_type"], hyper_edges["name"], hyper_edges["op"])},
+    }
+    return Delta(manifest["first_sequence"], manifest["last_sequence"], manifest["cleared"], changes)
@@ -0,0 +1,40 @@
+from collections.abc import MutableSet
+from typing import Iterable, Iterator
+
+from graph_data.Edge import Edge
+from graph_data.GraphMirror import GraphMirror
+
+
+class EdgeSet(MutableSet):
+    def __init__(self, mirror: GraphMirror):
+        """Set of Edge objects backed by the edge columns of a GraphMirror."""
+        self._mirror = mirror
+
+    def __contains__(self, edge: Edge) -> bool:
+        return self._mirror.has_edge(edge.start_node_name, edge.end_node_name, edge.relationship_type)
+
+    def __iter__(self) -> Iterator[Edge]:
+        return (Edge(*edge) for edge in self._mirror.edges())
+
+    def __len__(self) -> int:
+        return self._mirror.edge_count
+
+    def add(self, edge: Edge):
+        self._mirror.add_edge(edge.start_node_name, edge.end_node_name, edge.relationship_type)
+
+    def discard(self, edge: Edge):
+        self._mirror.remove_edge(edge.start_node_name, edge.end_node_name, edge.relationship_type)
+
+    def update(self, edges: Iterable[Edge]):
+        for edge in edges:
+            self.add(edge)
+
+    def difference_update(self, edges: Iterable[Edge]):
+        for edge in edges:
+            self.discard(edge)
+
+    def clear(self):
+        self._mirror.clear_edges()
+
+    def __repr__(self):
+        return repr(set(self))
@@ -0,0 +1,170 @@
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+
+# PageRank stops once the L1 change of the ranks between two iterations falls below this.
+PAGERANK_TOLERANCE = 1e-6
+PAGERANK_MAX_ITERATIONS = 100
+
+
+class GraphAnalytics:
+    def __init__(self, storage, relationship_type: Optional[str] = None):
+        """
+        Snapshot of the nodes and edges of a GraphStorage, optionally of one relationship type, as a sparse
+        adjacency matrix for in-process analytics. Node i of the snapshot is `node_names[i]`; per-node results
+        are NumPy arrays in that order. Parallel edges count once and edges to deleted nodes are left out.
+        The whole graph is loaded from the database first. Later changes to the storage are not seen;
+        take a new snapshot for them.
+        """
+        storage.warm_up(background=False)
+        self._mirror = storage.mirror
+        node_names, node_ids, start_ids, end_ids = self._mirror.arrays(relationship_type)
+        self.node_names: np.ndarray = node_names[node_ids]
+
+        # Snapshot position of every interned node id, -1 for deleted nodes.
+        self._position = np.full(len(node_names), -1, dtype=np.int64)
+        self._position[node_ids] = np.arange(len(node_ids))
+        starts, ends = self._position[start_ids], self._position[end_ids]
+        kept = (starts >= 0) & (ends >= 0)
+
+        size = len(node_ids)
+        adjacency = sp.csr_matrix((np.ones(np.count_nonzero(kept), dtype=np.float64), (starts[kept], ends[kept])),
+                                  shape=(size, size))
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1.0
+        self.adjacency: sp.csr_matrix = adjacency
+        self._transposed: Optional[sp.csr_matrix] = None
+        self._undirected: Optional[sp.csr_matrix] = None
+
+    @property
+    def node_count(self) -> int:
+        return self.adjacency.shape[0]
+
+    @property
+    def edge_count(self) -> int:
+        return self.adjacency.nnz
+
+    def index(self, node_name: str) -> int:
+        """Return the position of a node in the snapshot."""
+        node_id = self._mirror.node_id(node_name)
+        if node_id is None or node_id >= len(self._position) or self._position[node_id] < 0:
+            raise KeyError(f"Node '{node_name}' is not in the graph!")
+        return int(self._position[node_id])
+
+    def _adjacency(self, direction: str) -> sp.csr_matrix:
+        """Return the adjacency matrix whose row i holds the neighbors of node i in the given direction."""
+        if direction == "out":
+            return self.adjacency
+        if direction == "in":
+            if self._transposed is None:
+                self._transposed = self.adjacency.T.tocsr()
+            return self._transposed
+        if direction == "both":
+            if self._undirected is None:
+                undirected = (self.adjacency + self.adjacency.T).tocsr()
+                undirected.data[:] = 1.0
+                self._undirected = undirected
+            return self._undirected
+        raise ValueError(f"Unknown direction '{direction}', expected 'out', 'in' or 'both'!")
+
+    def _bfs(self, sources: np.ndarray, direction: str, max_depth: Optional[int] = None,
+             target: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Breadth-first search expanding the whole frontier per level with array operations.
+        Return the hop distance (-1 if unreached) and the BFS-tree predecessor (-1 for sources) of every node.
+        """
+        adjacency = self._adjacency(direction)
+        indptr, indices = adjacency.indptr, adjacency.indices
+        distances = np.full(self.node_count, -1, dtype=np.int64)
+        predecessors = np.full(self.node_count, -1, dtype=np.int64)
+        frontier = np.unique(sources)
+        distances[frontier] = 0
+
+        depth = 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            if target is not None and distances[target] >= 0:
+                break
+            depth += 1
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            # Positions in `indices` of every neighbor of every frontier node, and the frontier node reaching it.
+            offsets = np.arange(total) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+            parents = np.repeat(frontier, counts)
+            neighbors = indices[offsets]
+            unseen = distances[neighbors] < 0
+            neighbors, parents = neighbors[unseen], parents[unseen]
+
+            # One parent wins per neighbor reached several times, which also deduplicates the next frontier.
+            predecessors[neighbors] = parents
+            frontier = neighbors[predecessors[neighbors] == parents]
+            distances[frontier] = depth
+        return distances, predecessors
+
+    def bfs(self, source: str, direction: str = "out", max_depth: Optional[int] = None) -> np.ndarray:
+        """Return the hop distance from a node to every node, -1 where unreachable (within `max_depth`)."""
+        distances, _ = self._bfs(np.array([self.index(source)]), direction, max_depth)
+        return distances
+
+    def multi_source_bfs(self, sources: Sequence[str], direction: str = "out",
+                         max_depth: Optional[int] = None) -> np.ndarray:
+        """Return the hop distance from the nearest of several nodes to every node, -1 where unreachable."""
+        distances, _ = self._bfs(np.array([self.index(source) for source in sources], dtype=np.int64),
+                                 direction, max_depth)
+        return distances
+
+    def shortest_path(self, source: str, target: str, direction: str = "out") -> List[str]:
+        """Return the node names along an unweighted shortest path, or an empty list if there is none."""
+        source_index, target_index = self.index(source), self.index(target)
+        distances, predecessors = self._bfs(np.array([source_index]), direction, target=target_index)
+        if distances[target_index] < 0:
+            return []
+        path = [target_index]
+        while path[-1] != source_index:
+            path.append(int(predecessors[path[-1]]))
+        return [self.node_names[index] for index in reversed(path)]
+
+    def connected_components(self) -> Tuple[int, np.ndarray]:
+        """Return the number of weakly connected components and the component label of every node."""
+        return csgraph.connected_components(self.adjacency, directed=True, connection="weak")
+
+    def strongly_connected_components(self) -> Tuple[int, np.ndarray]:
+        """Return the number of strongly connected components and the component label of every node."""
+        return csgraph.connected_components(self.adjacency, directed=True, connection="strong")
+
+    def pagerank(self, damping: float = 0.85, tolerance: float = PAGERANK_TOLERANCE,
+                 max_iterations: int = PAGERANK_MAX_ITERATIONS) -> np.ndarray:
+        """
+        Return the PageRank of every node by power iteration with one sparse matrix-vector product per step.
+        Dangling nodes spread their rank uniformly; ranks sum to one.
+        """
+        size = self.node_count
+        if not size:
+            return np.zeros(0)
+        out_degrees = np.asarray(self.adjacency.sum(axis=1)).ravel()
+        dangling = out_degrees == 0
+        inverse_degrees = np.divide(1.0, out_degrees, out=np.zeros(size), where=~dangling)
+        transposed = self._adjacency("in")
+
+        ranks = np.full(size, 1.0 / size)
+        for _ in range(max_iterations):
+            spread = transposed @ (ranks * inverse_degrees)
+            updated = damping * (spread + ranks[dangling].sum() / size) + (1.0 - damping) / size
+            change = np.abs(updated - ranks).sum()
+            ranks = updated
+            if change < tolerance:
+                break
+        return ranks
+
+    def degrees(self, direction: str = "out") -> np.ndarray:
+        """Return the degree of every node; 'both' counts neighbors in either direction once."""
+        return np.diff(self._adjacency(direction).indptr)
+
+    def degree_distribution(self, direction: str = "out") -> Tuple[np.ndarray, np.ndarray]:
+        """Return the distinct degrees and how many nodes have each of them."""
+        counts = np.bincount(self.degrees(direction))
+        degrees = np.flatnonzero(counts)
+        return degrees, counts[degrees]
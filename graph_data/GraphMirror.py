@@ -0,0 +1,531 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from functools import wraps
+import threading
+import numpy as np
+
+# The CSR/CSC index is rebuilt once the edges appended or deleted since the last rebuild exceed
+# this share of the indexed edges, so rebuilding stays amortized O(1) per write.
+REBUILD_RATIO = 0.25
+REBUILD_MIN_CHANGES = 1024
+
+INITIAL_CAPACITY = 1024
+
+
+def _grow(array: np.ndarray, size: int) -> np.ndarray:
+    """Return the array with room for at least `size` entries, doubling its capacity when needed."""
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array)), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _distinct_edges(src: np.ndarray, dst: np.ndarray, types: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return edge id columns sorted by start, end and type, with duplicate edges dropped."""
+    order = np.lexsort((types, dst, src))
+    src, dst, types = src[order], dst[order], types[order]
+    if len(src) > 1:
+        distinct = np.ones(len(src), dtype=bool)
+        distinct[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1]) | (types[1:] != types[:-1])
+        src, dst, types = src[distinct], dst[distinct], types[distinct]
+    return src, dst, types
+
+
+def _synchronized(method):
+    """Run a GraphMirror method while holding the mirror lock."""
+
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return locked
+
+
+class GraphMirror:
+    def __init__(self):
+        """
+        Compact in-memory copy of the graph.
+        Node names and relationship types are interned to integer ids and edges are stored as NumPy columns
+        indexed by CSR (outgoing) and CSC (incoming) adjacency, so each edge costs tens of bytes.
+        Public methods hold a re-entrant lock, as even reads may rebuild the index, so threads can share a mirror.
+        """
+        self.lock = threading.RLock()
+        # Incremented by every change, so results computed from the mirror can be cached per generation.
+        self.generation = 0
+        self._node_ids: Dict[str, int] = {}
+        self._node_names: List[str] = []
+        self._node_alive = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._node_count = 0
+
+        self._type_ids: Dict[str, int] = {}
+        self._type_names: List[str] = []
+
+        self._clear_edge_columns()
+
+    def _clear_edge_columns(self):
+        """Drop every edge and reset the adjacency index."""
+        self._src = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._dst = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._type = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._edge_alive = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._edge_slots = 0
+        self._edge_count = 0
+
+        # Adjacency over the slots [0, _indexed_slots), which a rebuild sorts by start node so that the
+        # outgoing edges of node i are exactly the slots [_out_indptr[i], _out_indptr[i + 1]).
+        # Later slots live in the pending lists, or nowhere yet while the index is stale after a bulk append.
+        self._indexed_slots = 0
+        self._index_stale = False
+        self._out_indptr = np.zeros(1, dtype=np.int64)
+        self._in_indptr = np.zeros(1, dtype=np.int64)
+        self._in_slots = np.zeros(0, dtype=np.int32)
+        self._out_pending: Dict[int, List[int]] = {}
+        self._in_pending: Dict[int, List[int]] = {}
+        self._deleted_since_rebuild = 0
+
+    @_synchronized
+    def intern(self, name: str) -> int:
+        """Return the integer id of a node name, assigning a new one on first use."""
+        return self._intern(name)
+
+    def _intern(self, name: str) -> int:
+        node_id = self._node_ids.get(name)
+        if node_id is None:
+            node_id = len(self._node_names)
+            self._node_ids[name] = node_id
+            self._node_names.append(name)
+            self._node_alive = _grow(self._node_alive, node_id + 1)
+        return node_id
+
+    @_synchronized
+    def intern_many(self, names: Sequence[str]) -> np.ndarray:
+        """Return the integer ids of many node names, hashing each distinct name only once."""
+        import pandas as pd
+        codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+        uniques = uniques.tolist()
+        get = self._node_ids.get
+        ids = [get(name) for name in uniques]
+        missing = [index for index, node_id in enumerate(ids) if node_id is None]
+        if missing:
+            first = len(self._node_names)
+            new_names = [uniques[index] for index in missing]
+            self._node_ids.update(zip(new_names, range(first, first + len(new_names))))
+            self._node_names.extend(new_names)
+            self._node_alive = _grow(self._node_alive, len(self._node_names))
+            for node_id, index in enumerate(missing, first):
+                ids[index] = node_id
+        return np.array(ids, dtype=np.int32)[codes]
+
+    def _intern_type(self, relationship_type: str) -> int:
+        """Return the integer id of a relationship type, assigning a new one on first use."""
+        type_id = self._type_ids.get(relationship_type)
+        if type_id is None:
+            type_id = len(self._type_names)
+            self._type_ids[relationship_type] = type_id
+            self._type_names.append(relationship_type)
+        return type_id
+
+    def node_id(self, name: str) -> Optional[int]:
+        """Return the interned id of a node name, or None if it was never seen. Ids are never reused."""
+        return self._node_ids.get(name)
+
+    @_synchronized
+    def node_name(self, node_id: int) -> str:
+        """Return the node name behind an interned id."""
+        return self._node_names[node_id]
+
+    @_synchronized
+    def node_names_of(self, node_ids: np.ndarray) -> np.ndarray:
+        """Return the node names behind many interned ids as an object array."""
+        node_names = self._node_names
+        return np.array([node_names[node_id] for node_id in node_ids.tolist()], dtype=object)
+
+    @property
+    @_synchronized
+    def node_count(self) -> int:
+        """Number of nodes in the mirror."""
+        return self._node_count
+
+    @property
+    @_synchronized
+    def edge_count(self) -> int:
+        """Number of edges in the mirror."""
+        self._ensure_index()
+        return self._edge_count
+
+    @property
+    @_synchronized
+    def nbytes(self) -> int:
+        """Bytes held by the edge columns and the adjacency index."""
+        return sum(array.nbytes for array in (self._src, self._dst, self._type, self._edge_alive,
+                                              self._out_indptr, self._in_indptr, self._in_slots))
+
+    @_synchronized
+    def has_node(self, name: str) -> bool:
+        """Return whether the node is in the mirror."""
+        node_id = self._node_ids.get(name)
+        return node_id is not None and bool(self._node_alive[node_id])
+
+    @_synchronized
+    def add_node(self, name: str) -> bool:
+        """Add a node, returning False if it was already present."""
+        node_id = self._intern(name)
+        if self._node_alive[node_id]:
+            return False
+        self._node_alive[node_id] = True
+        self._node_count += 1
+        self.generation += 1
+        return True
+
+    @_synchronized
+    def remove_node(self, name: str) -> bool:
+        """
+        Remove a node together with the edges leaving or entering it, as the databases detach-delete it.
+        Return False if the node was not present, even if edges referring to it were removed.
+        """
+        node_id = self._node_ids.get(name)
+        if node_id is None:
+            return False
+        slots = np.union1d(self._out_edge_slots(node_id), self._in_edge_slots(node_id))
+        present = bool(self._node_alive[node_id])
+        if not present and not len(slots):
+            return False
+        if present:
+            self._node_alive[node_id] = False
+            self._node_count -= 1
+        self._remove_edge_slots(slots)
+        self.generation += 1
+        return present
+
+    @_synchronized
+    def incident_edges(self, name: str) -> List[Tuple[str, str, str]]:
+        """Return the edges leaving or entering a node as (start_name, end_name, relationship_type) tuples."""
+        node_id = self._node_ids.get(name)
+        if node_id is None:
+            return []
+        slots = np.union1d(self._out_edge_slots(node_id), self._in_edge_slots(node_id))
+        return [(self._node_names[start_id], self._node_names[end_id], self._type_names[type_id]) for
+                start_id, end_id, type_id in zip(self._src[slots], self._dst[slots], self._type[slots])]
+
+    @_synchronized
+    def add_nodes_from_array(self, names: Sequence[str]):
+        """Add many nodes at once, interning each distinct name once and marking them with one vectorized write."""
+        if not len(names):
+            return
+        node_ids = self.intern_many(names)
+        self._node_alive[node_ids] = True
+        self._node_count = int(np.count_nonzero(self._node_alive))
+        self.generation += 1
+
+    @_synchronized
+    def clear_nodes(self):
+        """Remove every node."""
+        self._node_alive[:] = False
+        self._node_count = 0
+        self.generation += 1
+
+    def node_names(self) -> Iterator[str]:
+        """Iterate over the names of the nodes in the mirror, as they were when iteration started."""
+        with self.lock:
+            node_ids = np.flatnonzero(self._node_alive[:len(self._node_names)])
+        # Interned names are never removed, so the snapshot of ids can be resolved outside the lock.
+        for node_id in node_ids:
+            yield self._node_names[node_id]
+
+    def _out_edge_slots(self, node_id: int) -> np.ndarray:
+        """Return the live edge slots leaving a node in O(out-degree)."""
+        self._ensure_index()
+        if node_id < len(self._out_indptr) - 1:
+            slots = np.arange(self._out_indptr[node_id], self._out_indptr[node_id + 1])
+        else:
+            slots = np.zeros(0, dtype=np.int64)
+        return self._with_pending(slots, self._out_pending.get(node_id))
+
+    def _in_edge_slots(self, node_id: int) -> np.ndarray:
+        """Return the live edge slots entering a node in O(in-degree)."""
+        self._ensure_index()
+        if node_id < len(self._in_indptr) - 1:
+            slots = self._in_slots[self._in_indptr[node_id]:self._in_indptr[node_id + 1]]
+        else:
+            slots = self._in_slots[:0]
+        return self._with_pending(slots, self._in_pending.get(node_id))
+
+    def _with_pending(self, slots: np.ndarray, pending_slots: Optional[List[int]]) -> np.ndarray:
+        """Merge the indexed slots of an adjacency row with its pending ones and drop deleted edges."""
+        if pending_slots:
+            slots = np.concatenate([slots, pending_slots])
+        return slots[self._edge_alive[slots]]
+
+    def _find_edge_slot(self, start_name: str, end_name: str, relationship_type: str) -> Optional[int]:
+        """Return the slot holding the edge, scanning only the outgoing edges of its start node."""
+        start_id = self._node_ids.get(start_name)
+        end_id = self._node_ids.get(end_name)
+        type_id = self._type_ids.get(relationship_type)
+        if start_id is None or end_id is None or type_id is None:
+            return None
+        return self._find_edge_slot_by_ids(start_id, end_id, type_id)
+
+    def _find_edge_slot_by_ids(self, start_id: int, end_id: int, type_id: int) -> Optional[int]:
+        """Return the slot holding the edge between interned ids."""
+        self._ensure_index()
+        for slot in self._out_pending.get(start_id, ()):
+            if self._dst[slot] == end_id and self._type[slot] == type_id and self._edge_alive[slot]:
+                return slot
+
+        if start_id >= len(self._out_indptr) - 1:
+            return None
+        start, end = self._out_indptr[start_id], self._out_indptr[start_id + 1]
+        if start == end:
+            return None
+        matches = np.flatnonzero((self._dst[start:end] == end_id) & (self._type[start:end] == type_id)
+                                 & self._edge_alive[start:end])
+        return int(start + matches[0]) if len(matches) else None
+
+    @_synchronized
+    def has_edge(self, start_name: str, end_name: str, relationship_type: str) -> bool:
+        """Return whether the edge is in the mirror."""
+        return self._find_edge_slot(start_name, end_name, relationship_type) is not None
+
+    @_synchronized
+    def add_edge(self, start_name: str, end_name: str, relationship_type: str) -> bool:
+        """Add an edge, returning False if it was already present."""
+        if self.has_edge(start_name, end_name, relationship_type):
+            return False
+
+        slot = self._edge_slots
+        self._src = _grow(self._src, slot + 1)
+        self._dst = _grow(self._dst, slot + 1)
+        self._type = _grow(self._type, slot + 1)
+        self._edge_alive = _grow(self._edge_alive, slot + 1)
+
+        start_id = self._intern(start_name)
+        end_id = self._intern(end_name)
+        self._src[slot] = start_id
+        self._dst[slot] = end_id
+        self._type[slot] = self._intern_type(relationship_type)
+        self._edge_alive[slot] = True
+        self._edge_slots += 1
+        self._edge_count += 1
+        self.generation += 1
+
+        self._out_pending.setdefault(start_id, []).append(slot)
+        self._in_pending.setdefault(end_id, []).append(slot)
+        self._maybe_rebuild()
+        return True
+
+    @_synchronized
+    def append_edges(self, start_names: Sequence[str], end_names: Sequence[str],
+                     relationship_types: Sequence[str]):
+        """
+        Append many edges at once from whole columns.
+        The adjacency index is left stale and rebuilt, with duplicates dropped, on the next read,
+        so loading a file chunk by chunk pays for a single rebuild.
+        """
+        if not len(start_names):
+            return
+        self._append_edge_ids(*self._intern_edges(start_names, end_names, relationship_types))
+        self._index_stale = True
+        self.generation += 1
+
+    @_synchronized
+    def merge_edges(self, start_names: Sequence[str], end_names: Sequence[str],
+                    relationship_types: Sequence[str]):
+        """
+        Add many edges, some of which may already be present, keeping the adjacency index fresh.
+        Only edges leaving nodes that already have outgoing edges are looked up one by one. New edges join
+        the pending lists, or are indexed by a rebuild right away once they outgrow them, so readers
+        interleaved with a long series of merges never wait for more than an amortized rebuild.
+        """
+        if not len(start_names):
+            return
+        start_ids, end_ids, type_ids = _distinct_edges(*self._intern_edges(start_names, end_names, relationship_types))
+        self._ensure_index()
+
+        out_degrees = np.diff(self._out_indptr)
+        indexed = start_ids < len(out_degrees)
+        known = np.zeros(len(start_ids), dtype=bool)
+        known[indexed] = out_degrees[start_ids[indexed]] > 0
+        if self._out_pending:
+            known |= np.isin(start_ids, np.fromiter(self._out_pending, dtype=np.int64))
+        for index in np.flatnonzero(known).tolist():
+            if self._find_edge_slot_by_ids(int(start_ids[index]), int(end_ids[index]), int(type_ids[index])) is None:
+                known[index] = False
+        start_ids, end_ids, type_ids = start_ids[~known], end_ids[~known], type_ids[~known]
+
+        count = len(start_ids)
+        if not count:
+            return
+        slot = self._append_edge_ids(start_ids, end_ids, type_ids)
+        self._edge_count += count
+        self.generation += 1
+        if count >= max(REBUILD_MIN_CHANGES, REBUILD_RATIO * self._indexed_slots):
+            self.rebuild()
+            return
+        for edge_slot, start_id, end_id in zip(range(slot, slot + count), start_ids.tolist(), end_ids.tolist()):
+            self._out_pending.setdefault(start_id, []).append(edge_slot)
+            self._in_pending.setdefault(end_id, []).append(edge_slot)
+        self._maybe_rebuild()
+
+    def _intern_edges(self, start_names: Sequence[str], end_names: Sequence[str],
+                      relationship_types: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return the start, end and type ids of whole edge columns."""
+        import pandas as pd
+        start_ids = self.intern_many(start_names)
+        end_ids = self.intern_many(end_names)
+        type_codes, type_uniques = pd.factorize(np.asarray(relationship_types, dtype=object))
+        type_ids = np.array([self._intern_type(relationship_type) for relationship_type in type_uniques],
+                            dtype=np.int32)[type_codes]
+        return start_ids, end_ids, type_ids
+
+    def _append_edge_ids(self, start_ids: np.ndarray, end_ids: np.ndarray, type_ids: np.ndarray) -> int:
+        """Write edges into the slots after the last one, returning the first slot written, without indexing them."""
+        count = len(start_ids)
+        slot = self._edge_slots
+        self._src = _grow(self._src, slot + count)
+        self._dst = _grow(self._dst, slot + count)
+        self._type = _grow(self._type, slot + count)
+        self._edge_alive = _grow(self._edge_alive, slot + count)
+        self._src[slot:slot + count] = start_ids
+        self._dst[slot:slot + count] = end_ids
+        self._type[slot:slot + count] = type_ids
+        self._edge_alive[slot:slot + count] = True
+        self._edge_slots += count
+        return slot
+
+    @_synchronized
+    def remove_edge(self, start_name: str, end_name: str, relationship_type: str) -> bool:
+        """Remove an edge, returning False if it was not present."""
+        slot = self._find_edge_slot(start_name, end_name, relationship_type)
+        if slot is None:
+            return False
+
+        self._remove_edge_slots(np.array([slot]))
+        self.generation += 1
+        return True
+
+    def _remove_edge_slots(self, slots: np.ndarray):
+        """Mark live edge slots deleted, leaving them to the next rebuild."""
+        if not len(slots):
+            return
+        self._edge_alive[slots] = False
+        self._edge_count -= len(slots)
+        self._deleted_since_rebuild += len(slots)
+        self._maybe_rebuild()
+
+    @_synchronized
+    def clear_edges(self):
+        """Remove every edge."""
+        self._clear_edge_columns()
+        self.generation += 1
+
+    @_synchronized
+    def touch(self):
+        """Start a new generation for a change to data kept next to the mirror, such as the hyper edges."""
+        self.generation += 1
+
+    def edges(self) -> Iterator[Tuple[str, str, str]]:
+        """Iterate over the edges as (start_name, end_name, relationship_type) tuples."""
+        # Snapshot the id columns under the lock, then resolve names lazily outside it.
+        with self.lock:
+            self._ensure_index()
+            alive = np.flatnonzero(self._edge_alive[:self._edge_slots])
+            start_ids, end_ids, type_ids = self._src[alive], self._dst[alive], self._type[alive]
+        for start_id, end_id, type_id in zip(start_ids, end_ids, type_ids):
+            yield self._node_names[start_id], self._node_names[end_id], self._type_names[type_id]
+
+    @_synchronized
+    def arrays(self, relationship_type: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Return a consistent copy of the graph as NumPy arrays: the node names (object array), the ids of the
+        live nodes, and the start and end ids of the live edges, optionally only those of one relationship type.
+        """
+        self._ensure_index()
+        node_names = np.array(self._node_names, dtype=object)
+        node_ids = np.flatnonzero(self._node_alive[:len(self._node_names)])
+        alive = np.flatnonzero(self._edge_alive[:self._edge_slots])
+        if relationship_type is not None:
+            type_id = self._type_ids.get(relationship_type)
+            alive = alive[self._type[alive] == type_id] if type_id is not None else alive[:0]
+        return node_names, node_ids, self._src[alive], self._dst[alive]
+
+    def _maybe_rebuild(self):
+        """Rebuild the adjacency index once enough edges were appended or deleted since the last rebuild."""
+        changes = self._edge_slots - self._indexed_slots + self._deleted_since_rebuild
+        if changes >= max(REBUILD_MIN_CHANGES, REBUILD_RATIO * self._indexed_slots):
+            self.rebuild()
+
+    def _ensure_index(self):
+        """Rebuild the adjacency index if a bulk append left it stale."""
+        if self._index_stale:
+            self.rebuild()
+
+    @_synchronized
+    def rebuild(self):
+        """
+        Compact deleted and duplicate edges away, sort the edge columns by start node (CSR)
+        and rebuild the incoming adjacency (CSC) from them.
+        """
+        alive = np.flatnonzero(self._edge_alive[:self._edge_slots])
+        src, dst, types = _distinct_edges(self._src[alive], self._dst[alive], self._type[alive])
+
+        count = len(src)
+        self._src[:count] = src
+        self._dst[:count] = dst
+        self._type[:count] = types
+        self._edge_alive[:count] = True
+        self._edge_alive[count:] = False
+        self._edge_slots = count
+        self._edge_count = count
+
+        node_count = len(self._node_names)
+        self._out_indptr = np.concatenate([[0], np.cumsum(np.bincount(src, minlength=node_count))])
+        self._in_slots = np.argsort(dst, kind="stable").astype(np.int32 if count < 2 ** 31 else np.int64)
+        self._in_indptr = np.concatenate([[0], np.cumsum(np.bincount(dst, minlength=node_count))])
+
+        self._indexed_slots = count
+        self._index_stale = False
+        self._out_pending.clear()
+        self._in_pending.clear()
+        self._deleted_since_rebuild = 0
+
+    def _type_filter(self, slots: np.ndarray, relationship_type: Optional[str]) -> np.ndarray:
+        """Keep only the slots of the given relationship type, if one is given."""
+        if relationship_type is None:
+            return slots
+        type_id = self._type_ids.get(relationship_type)
+        if type_id is None:
+            return slots[:0]
+        return slots[self._type[slots] == type_id]
+
+    @_synchronized
+    def neighbors(self, name: str, direction: str = "out", relationship_type: Optional[str] = None) -> List[str]:
+        """Return the names of the nodes adjacent to a node in O(degree); `direction` is 'out', 'in' or 'both'."""
+        node_id = self._node_ids.get(name)
+        if node_id is None:
+            return []
+
+        neighbor_ids = []
+        if direction in ("out", "both"):
+            neighbor_ids.append(self._dst[self._type_filter(self._out_edge_slots(node_id), relationship_type)])
+        if direction in ("in", "both"):
+            neighbor_ids.append(self._src[self._type_filter(self._in_edge_slots(node_id), relationship_type)])
+        if not neighbor_ids:
+            raise ValueError(f"Unknown direction '{direction}', expected 'out', 'in' or 'both'!")
+        return [self._node_names[neighbor_id] for neighbor_id in np.concatenate(neighbor_ids)]
+
+    @_synchronized
+    def out_degree(self, name: str, relationship_type: Optional[str] = None) -> int:
+        """Return the number of edges leaving a node."""
+        node_id = self._node_ids.get(name)
+        if node_id is None:
+            return 0
+        return len(self._type_filter(self._out_edge_slots(node_id), relationship_type))
+
+    @_synchronized
+    def in_degree(self, name: str, relationship_type: Optional[str] = None) -> int:
+        """Return the number of edges entering a node."""
+        node_id = self._node_ids.get(name)
+        if node_id is None:
+            return 0
+        return len(self._type_filter(self._in_edge_slots(node_id), relationship_type))
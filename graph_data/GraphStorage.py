@@ -1,37 +1,431 @@
 from graph_data.Node import Node
 from graph_data.Edge import Edge
 from graph_data.HyperEdge import HyperEdge
-import pandas as pd
-import ast
+from graph_data.GraphMirror import GraphMirror
+from graph_data.NodeSet import NodeSet
+from graph_data.EdgeSet import EdgeSet
+from graph_data.HyperEdgeIncidence import HyperEdgeIncidence
+from graph_data.HyperEdgeSet import HyperEdgeSet
+from graph_data.MirrorSync import MirrorSync, WARM_UP_PAGE_SIZE
+from graph_data.ChangeLog import ChangeLog, Delta, write_delta, read_delta
+from graph_data.WriteBuffer import WriteBuffer, WriteBehindError, DEFAULT_MAX_PENDING, DEFAULT_FLUSH_INTERVAL
+from utils.batching import chunked, DEFAULT_BATCH_SIZE
+from utils.metrics import Metrics, MetricsExporter, Tracer, DEFAULT_SLOW_QUERY_THRESHOLD, operation_name
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from contextlib import contextmanager, ExitStack
+from collections import OrderedDict
+from collections.abc import MutableSet
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import os
-from dotenv import load_dotenv
+import tempfile
+import threading
+import time
 
-# Load environment variables from the .env file
-load_dotenv()
+# Pandas and pyarrow are imported by the imports and exports that need them, keeping startup fast.
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+    from utils.generator import GeneratedGraph
+
+# Rows read per chunk when loading exported files into the in-memory mirror.
+IMPORT_CHUNK_SIZE = 1_000_000
+
+# File formats supported by `export_graph` and `import_graph`.
+EXPORT_FORMATS = ("csv", "parquet")
+
+# Maximum number of read results kept in the LRU cache.
+READ_CACHE_SIZE = 4096
+
+# Rows per batch yielded by `query`.
+QUERY_BATCH_SIZE = 100_000
+
+# Batch types `query` can yield.
+QUERY_FORMATS = ("arrow", "pandas")
 
 
 class GraphStorage:
     def __init__(self, db):
-        """Initialize GraphStorage with a database connection."""
-        self.nodes = set()
-        self.edges = set()
-        self.hyper_edges = set()
+        """
+        Initialize GraphStorage with a database connection.
+        A storage can be shared between threads: session and transaction scopes belong to the thread that
+        opened them, and the in-memory nodes, edges and hyper edges are guarded by the mirror lock.
+        The in-memory graph starts empty and holds what has been read from the database: reads load the
+        nodes they touch, and `warm_up` loads the whole graph, by default in the background.
+        Every write that reaches the database is appended to the `changes` log, which `export_delta` hands over.
+        """
+        self.mirror = GraphMirror()
+        self.nodes = NodeSet(self.mirror)
+        self.edges = EdgeSet(self.mirror)
+        self.incidence = HyperEdgeIncidence(self.mirror)
+        self.hyper_edges = HyperEdgeSet(self.incidence)
         self.db = db
+        self.sync = MirrorSync(self)
+        self.changes = ChangeLog()
+        self._local = threading.local()
+        self._write_buffer: Optional[WriteBuffer] = None
+        self._read_cache = OrderedDict()
+        self._read_cache_lock = threading.Lock()
+        self.metrics: Optional[Metrics] = None
+        self.tracer: Optional[Tracer] = None
+        self.import_timings = {}
+        self.export_timings = {}
+
+    @property
+    def _session(self):
+        """Session shared by the operations of the current thread, if it opened a session scope."""
+        return getattr(self._local, "session", None)
+
+    @_session.setter
+    def _session(self, session):
+        self._local.session = session
+
+    @property
+    def _journal(self):
+        """In-memory changes made by the transaction of the current thread, if it opened one."""
+        return getattr(self._local, "journal", None)
+
+    @_journal.setter
+    def _journal(self, journal):
+        self._local.journal = journal
+
+    @property
+    def _transaction_changes(self):
+        """Change log entries of the transaction of the current thread, appended to the log once it commits."""
+        return getattr(self._local, "changes", None)
+
+    @_transaction_changes.setter
+    def _transaction_changes(self, changes):
+        self._local.changes = changes
+
+    def _log_changes(self, items: Iterable, present: bool):
+        """Log the addition (`present`) or deletion of items written to the database, or of the open transaction."""
+        changes = self._transaction_changes
+        if changes is None:
+            self.changes.record(items, present)
+        else:
+            changes.append((list(items), present))
+
+    @contextmanager
+    def _open_session(self, fetch_size: Optional[int] = None):
+        """Open a database session and end it once the scope ends; `fetch_size` sets the records per round trip."""
+        session = self.db.start_session(fetch_size)
+        try:
+            yield session
+        finally:
+            self.db.end_session(session)
 
     def _with_session(self, operation):
         """Context manager for database session handling."""
 
-        if os.getenv("DATABASE_PROVIDER") == "NEO4J":
-            with self.db.start_session() as session:
-                operation(session)
-        elif os.getenv("DATABASE_PROVIDER") == "KUZU":
-            operation(self.db.start_session())
+        if self.metrics is None and self.tracer is None:
+            self._run_in_session(operation)
+            return
+
+        with self._instrumented(operation_name(operation)):
+            self._run_in_session(operation)
+
+    def _run_in_session(self, operation):
+        if self._session is not None:
+            operation(self._session)
+            return
+
+        with self._open_session() as session:
+            operation(session)
+
+    @contextmanager
+    def _instrumented(self, name: str):
+        """Trace the scope and record it as a run of the named operation, as far as either is enabled."""
+        with ExitStack() as stack:
+            if self.tracer is not None:
+                stack.enter_context(self.tracer(name))
+            if self.metrics is not None:
+                stack.enter_context(self.metrics.timed_operation(name))
+            yield
+
+    def enable_metrics(self, slow_query_threshold: Optional[float] = DEFAULT_SLOW_QUERY_THRESHOLD,
+                       exporters: Optional[List[MetricsExporter]] = None, export_interval: Optional[float] = None):
+        """
+        Record the count, latency histogram, rows and errors of every storage operation and database query
+        shape, reported by `stats`. Queries slower than `slow_query_threshold` seconds are logged to the
+        'hogdb.slow_queries' logger, and `exporters` receive the statistics every `export_interval` seconds
+        and on `close`. Operations are named after the method running them, e.g. 'GraphStorage.add_nodes'.
+        """
+        if self.metrics is None:
+            self.metrics = Metrics(slow_query_threshold, exporters, export_interval)
+            self.db.metrics = self.metrics
+
+    def disable_metrics(self):
+        """Stop recording, exporting what was recorded one last time."""
+        metrics, self.metrics = self.metrics, None
+        if metrics is not None:
+            self.db.metrics = None
+            metrics.close()
+
+    def set_tracer(self, tracer: Optional[Tracer]):
+        """
+        Wrap every database operation in `tracer(name)`, e.g. `start_as_current_span` of an OpenTelemetry
+        tracer, with the same operation names as the metrics. None stops tracing.
+        """
+        self.tracer = tracer
+
+    def stats(self) -> Dict:
+        """
+        Return the statistics per operation and per query shape recorded since metrics were enabled,
+        together with the current size of the write-behind buffer, the change log and the read cache.
+        """
+        stats = self.metrics.snapshot() if self.metrics is not None else {"operations": {}, "queries": {}}
+        stats["gauges"] = {
+            "write_behind_pending": len(self._write_buffer) if self._write_buffer is not None else 0,
+            "change_log_entries": len(self.changes),
+            "read_cache_entries": len(self._read_cache),
+            "mirror_complete": self.sync.complete,
+        }
+        return stats
+
+    @contextmanager
+    def session(self):
+        """Share one database session across all operations inside the scope."""
+        if self._session is not None:
+            yield self
+            return
+
+        with self._open_session() as session:
+            self._session = session
+            try:
+                yield self
+            finally:
+                self._session = None
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run all operations inside the scope in one explicit database transaction.
+        The in-memory nodes, edges and hyper edges are committed or rolled back together with it.
+        Nested scopes join the outermost transaction.
+        """
+        if self._journal is not None:
+            yield self
+            return
+
+        self.flush()
+        with self.session():
+            session = self._session
+            transaction = self.db.begin_transaction(session)
+            self._session = transaction
+            self._journal = []
+            self._transaction_changes = []
+            try:
+                yield self
+                self.db.commit_transaction(transaction)
+                self.changes.extend(self._transaction_changes)
+            except BaseException:
+                self._undo_journal()
+                self.db.rollback_transaction(transaction)
+                raise
+            finally:
+                self._journal = None
+                self._transaction_changes = None
+                self._session = session
+
+    def _undo_journal(self):
+        """Revert the in-memory changes recorded since the transaction began."""
+        with self.mirror.lock:
+            for undo, item in reversed(self._journal):
+                undo(item)
+        self._journal.clear()
+
+    def _mirror_add(self, collection: MutableSet, items: Iterable):
+        """Add items to an in-memory set, journaling the new ones while a transaction is open."""
+        journal = self._journal
+        with self.mirror.lock:
+            if journal is None:
+                collection.update(items)
+                return
+            for item in items:
+                if item not in collection:
+                    collection.add(item)
+                    journal.append((collection.discard, item))
+
+    def _mirror_discard(self, collection: MutableSet, items: Iterable):
+        """
+        Remove items from an in-memory set, journaling the removed ones while a transaction is open.
+        Nodes take their edges and hyper edges with them, which are discarded first so that they are journaled too.
+        """
+        journal = self._journal
+        with self.mirror.lock:
+            if collection is self.nodes:
+                items = list(items)
+                for kind, detached in self._detached(items).items():
+                    self._mirror_discard(getattr(self, kind), detached)
+            if not self.sync.complete:
+                items = list(items)
+                self.sync.record_deletions(items)
+            if journal is None:
+                collection.difference_update(items)
+                return
+            for item in items:
+                if item in collection:
+                    collection.discard(item)
+                    journal.append((collection.add, item))
+
+    def _detached(self, nodes: Iterable[Node]) -> Dict[str, list]:
+        """
+        Return the in-memory edges leaving or entering the nodes and the hyper edges they are members of,
+        by collection, which the databases delete together with the nodes.
+        """
+        with self.mirror.lock:
+            nodes = list(nodes)
+            return {
+                "edges": list(dict.fromkeys(Edge(*edge) for node in nodes
+                                            for edge in self.mirror.incident_edges(node.name))),
+                "hyper_edges": list(dict.fromkeys(hyper_edge for node in nodes
+                                                  for hyper_edge in self.incidence.hyper_edges_of(node.name))),
+            }
+
+    def _mirror_clear(self, collection: MutableSet):
+        """Empty an in-memory set, journaling its content while a transaction is open."""
+        with self.mirror.lock:
+            if self._journal is None:
+                collection.clear()
+                return
+            self._mirror_discard(collection, list(collection))
+
+    def enable_write_behind(self, max_pending: int = DEFAULT_MAX_PENDING,
+                            flush_interval: Optional[float] = DEFAULT_FLUSH_INTERVAL):
+        """
+        Buffer additions and deletions and write only their net effect, in batches.
+        The in-memory graph changes at once, while the database catches up once `max_pending` items are
+        pending, every `flush_interval` seconds and on `flush`. Transactions, queries, exports and imports
+        flush first. A failed batch is reverted in memory and raised as WriteBehindError, from a background
+        flush on the next write or flush.
+        """
+        if self._write_buffer is None:
+            self._write_buffer = WriteBuffer(self._write_batch, max_pending, flush_interval)
+
+    def flush(self):
+        """Write the buffered operations to the database."""
+        if self._write_buffer is not None:
+            self._write_buffer.flush()
+
+    def close(self):
+        """
+        Stop a running warm-up, drain the write-behind buffer and go back to writing every operation at once,
+        then export the metrics one last time and stop recording them.
+        """
+        self.sync.close()
+        write_buffer, self._write_buffer = self._write_buffer, None
+        try:
+            if write_buffer is not None:
+                write_buffer.close()
+        finally:
+            self.disable_metrics()
+
+    def _buffer(self, kind: str, items: Iterable, present: bool, batch_size: int = DEFAULT_BATCH_SIZE) -> bool:
+        """
+        Apply additions (`present`) or deletions to an in-memory collection and buffer them for the database.
+        Deleting nodes also buffers the deletion of their in-memory edges and hyper edges, so that a buffered
+        addition of one cannot bring a node back once the batch is written.
+        Return False, without doing anything, when write-behind is off or a transaction is open on this thread.
+        """
+        write_buffer = self._write_buffer
+        if write_buffer is None or self._journal is not None:
+            return False
+
+        write_buffer.raise_error()
+        collection = getattr(self, kind)
+        for chunk in chunked(items, batch_size):
+            with write_buffer.lock, self.mirror.lock:
+                if kind == "nodes" and not present:
+                    for detached_kind, detached in self._detached(chunk).items():
+                        self.sync.record_deletions(detached)
+                        for item in detached:
+                            write_buffer.record(detached_kind, item, True, False)
+                            getattr(self, detached_kind).discard(item)
+                if not present:
+                    self.sync.record_deletions(chunk)
+                for item in chunk:
+                    # Items the mirror may be missing are written whatever it holds.
+                    before = item in collection if self.sync.covers(item) else not present
+                    write_buffer.record(kind, item, before, present)
+                    if before != present:
+                        (collection.add if present else collection.discard)(item)
+            write_buffer.flush_if_full()
+        return True
+
+    def _write_changes(self, session, batch: dict, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Write the additions and deletions of a {collection: {item: present}} batch to the database in bulk,
+        and log them. Deletions run first, hyper edges and edges before the nodes they refer to, and additions
+        in reverse.
+        """
+
+        def split(kind: str, present: bool) -> list:
+            return [item for item, item_present in batch.get(kind, {}).items() if item_present == present]
+
+        def edge_rows(edges) -> list:
+            return self._edge_rows((edge.start_node_name, edge.end_node_name, edge.relationship_type)
+                                   for edge in edges)
+
+        steps = [
+            (split("hyper_edges", False), False, lambda chunk: self.db.delete_hyper_edges(
+                session, rows=self._hyper_edge_rows(chunk))),
+            (split("edges", False), False, lambda chunk: self.db.delete_edges(
+                session, node_labels=["GNode"], rows=edge_rows(chunk))),
+            (split("nodes", False), False, lambda chunk: self.db.delete_nodes(
+                session, labels=["GNode"], rows=[{"name": node.name} for node in chunk])),
+            (split("nodes", True), True, lambda chunk: self.db.add_nodes(
+                session, labels=["GNode"], rows=[{"name": node.name} for node in chunk])),
+            (split("edges", True), True, lambda chunk: self.db.add_edges(
+                session, node_labels=["GNode"], rows=edge_rows(chunk))),
+            (split("hyper_edges", True), True, lambda chunk: self.db.add_hyper_edges(
+                session, rows=self._hyper_edge_rows(chunk))),
+        ]
+
+        for items, present, write_chunk in steps:
+            for chunk in chunked(items, batch_size):
+                write_chunk(chunk)
+                self._log_changes(chunk, present)
+
+    def _write_batch(self, batch: dict):
+        """Write a batch of the write-behind buffer in one transaction, reverting it in memory if that fails."""
+
+        def operation(session):
+            # An explicit flush inside a transaction joins it.
+            if self._journal is not None:
+                self._write_changes(session, batch)
+                return
+            transaction = self.db.begin_transaction(session)
+            changes = []
+            self._transaction_changes = changes
+            try:
+                self._write_changes(transaction, batch)
+                self.db.commit_transaction(transaction)
+            except BaseException:
+                self.db.rollback_transaction(transaction)
+                raise
+            finally:
+                self._transaction_changes = None
+            self.changes.extend(changes)
+
+        try:
+            self._with_session(operation)
+        except Exception as error:
+            with self.mirror.lock:
+                for kind, items in batch.items():
+                    collection = getattr(self, kind)
+                    for item, present in items.items():
+                        (collection.discard if present else collection.add)(item)
+            raise WriteBehindError(batch) from error
 
     def add_node(self, node_name: str):
         """Create a Node instance and add it to both the graph and the database."""
+        if self._buffer("nodes", [Node(node_name)], True):
+            return
         self._add_node_to_database(node_name)
         node = Node(node_name)
-        self.nodes.add(node)
+        self._log_changes([node], True)
+        self._mirror_add(self.nodes, [node])
 
     def _add_node_to_database(self, node_name: str):
         """Add a node to the database."""
@@ -42,13 +436,16 @@ class GraphStorage:
         self._with_session(operation)
 
     def delete_node(self, node_name: str):
-        """Delete a Node by its name from the graph and the database."""
+        """Delete a Node by its name, together with its edges and hyper edges, from the graph and the database."""
         node = Node(node_name)
-
-        if node in self.nodes:
-            self.nodes.remove(node)
-
+        if self._buffer("nodes", [node], False):
+            return
+        detached = self._detached([node])
         self._delete_node_from_database(node_name)
+        for items in detached.values():
+            self._log_changes(items, False)
+        self._log_changes([node], False)
+        self._mirror_discard(self.nodes, [node])
 
     def _delete_node_from_database(self, node_name: str):
         """Remove a node from the database."""
@@ -61,8 +458,11 @@ class GraphStorage:
     def add_edge(self, start_node_name: str, end_node_name: str, relationship_name: str = "Connects"):
         """Create an Edge instance and add it to both the graph and the database."""
         edge = Edge(start_node_name, end_node_name, relationship_name)
-        self.edges.add(edge)
+        if self._buffer("edges", [edge], True):
+            return
         self._add_edge_to_database(start_node_name, end_node_name, relationship_name)
+        self._log_changes([edge], True)
+        self._mirror_add(self.edges, [edge])
 
     def _add_edge_to_database(self, start_node_name: str, end_node_name: str, relationship_name: str):
         """Add an edge to the database."""
@@ -82,10 +482,11 @@ class GraphStorage:
     def delete_edge(self, start_node_name: str, end_node_name: str, relationship_name: str = "Connects"):
         """Remove an Edge instance from the graph and the database."""
         edge = Edge(start_node_name, end_node_name, relationship_name)
-        if edge in self.edges:
-            self.edges.remove(edge)
-
+        if self._buffer("edges", [edge], False):
+            return
         self._delete_edge_from_database(start_node_name, end_node_name, relationship_name)
+        self._log_changes([edge], False)
+        self._mirror_discard(self.edges, [edge])
 
     def _delete_edge_from_database(self, start_node_name: str, end_node_name: str, relationship_name: str):
         """Remove an edge from the database."""
@@ -102,94 +503,518 @@ class GraphStorage:
 
         self._with_session(operation)
 
+    def add_nodes(self, node_names: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Add many nodes to the graph and the database, sending one bulk write per chunk."""
+        if self._buffer("nodes", (Node(name) for name in node_names), True, batch_size):
+            return
+
+        def operation(session):
+            for chunk in chunked(node_names, batch_size):
+                self.db.add_nodes(session, labels=["GNode"], rows=[{"name": name} for name in chunk])
+                nodes = [Node(name) for name in chunk]
+                self._log_changes(nodes, True)
+                self._mirror_add(self.nodes, nodes)
+
+        self._with_session(operation)
+
+    def delete_nodes(self, node_names: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Delete many nodes, together with their edges and hyper edges, from the graph and the database,
+        sending one bulk write per chunk.
+        """
+        if self._buffer("nodes", (Node(name) for name in node_names), False, batch_size):
+            return
+
+        def operation(session):
+            for chunk in chunked(node_names, batch_size):
+                nodes = [Node(name) for name in chunk]
+                detached = self._detached(nodes)
+                self.db.delete_nodes(session, labels=["GNode"], rows=[{"name": name} for name in chunk])
+                for items in detached.values():
+                    self._log_changes(items, False)
+                self._log_changes(nodes, False)
+                self._mirror_discard(self.nodes, nodes)
+
+        self._with_session(operation)
+
+    def add_edges(self, edges: Iterable[Tuple[str, str, str]], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Add many (start_node, end_node, relationship_name) edges, sending one bulk write per chunk."""
+        if self._buffer("edges", (Edge(*edge) for edge in edges), True, batch_size):
+            return
+
+        def operation(session):
+            for chunk in chunked(edges, batch_size):
+                self.db.add_edges(session, node_labels=["GNode"], rows=self._edge_rows(chunk))
+                chunk_edges = [Edge(*edge) for edge in chunk]
+                self._log_changes(chunk_edges, True)
+                self._mirror_add(self.edges, chunk_edges)
+
+        self._with_session(operation)
+
+    def delete_edges(self, edges: Iterable[Tuple[str, str, str]], batch_size: int = DEFAULT_BATCH_SIZE):
+        """Delete many (start_node, end_node, relationship_name) edges, sending one bulk write per chunk."""
+        if self._buffer("edges", (Edge(*edge) for edge in edges), False, batch_size):
+            return
+
+        def operation(session):
+            for chunk in chunked(edges, batch_size):
+                self.db.delete_edges(session, node_labels=["GNode"], rows=self._edge_rows(chunk))
+                chunk_edges = [Edge(*edge) for edge in chunk]
+                self._log_changes(chunk_edges, False)
+                self._mirror_discard(self.edges, chunk_edges)
+
+        self._with_session(operation)
+
+    @staticmethod
+    def _edge_rows(edges: Iterable[Tuple[str, str, str]]) -> list:
+        """Convert edge tuples to the row format expected by the bulk database methods."""
+        return [{"start_name": start_node_name, "end_name": end_node_name, "type": relationship_name}
+                for start_node_name, end_node_name, relationship_name in edges]
+
     def add_hyper_edge(self, node_names: frozenset, relationship_type: str = "CONNECTED"):
-        """Create an Edge instance and add it to both the graph and the database."""
+        """Create a HyperEdge instance and add it to both the graph and the database."""
         hyper_edge = HyperEdge(node_names, relationship_type)
-        self.hyper_edges.add(hyper_edge)
+        if self._buffer("hyper_edges", [hyper_edge], True):
+            return
+
+        def operation(session):
+            self.db.add_hyper_edges(session, rows=self._hyper_edge_rows([hyper_edge]))
+
+        self._with_session(operation)
+        self._log_changes([hyper_edge], True)
+        self._mirror_add(self.hyper_edges, [hyper_edge])
 
     def delete_hyper_edge(self, node_names: frozenset, relationship_type: str = "CONNECTED"):
-        """Remove a HyperEdge instance from the graph."""
+        """Remove a HyperEdge instance from the graph and the database."""
         hyper_edge = HyperEdge(node_names, relationship_type)
-        self.hyper_edges.discard(hyper_edge)
+        if self._buffer("hyper_edges", [hyper_edge], False):
+            return
 
-    def export_graph(self):
-        export_dir = "exported"
-        os.makedirs(export_dir, exist_ok=True)
+        def operation(session):
+            self.db.delete_hyper_edges(session, rows=self._hyper_edge_rows([hyper_edge]))
+
+        self._with_session(operation)
+        self._log_changes([hyper_edge], False)
+        self._mirror_discard(self.hyper_edges, [hyper_edge])
+
+    def add_hyper_edges(self, node_name_sets: Iterable[frozenset], relationship_type: str = "CONNECTED",
+                        batch_size: int = DEFAULT_BATCH_SIZE):
+        """Add many hyper edges of one type, sending one bulk write per chunk."""
+        if self._buffer("hyper_edges", (HyperEdge(node_names, relationship_type) for node_names in node_name_sets),
+                        True, batch_size):
+            return
 
         def operation(session):
-            self.db.export_nodes_to_csv(session, os.path.join(export_dir, 'nodes.csv'))
-            self.db.export_edges_to_csv(session, os.path.join(export_dir, 'edges.csv'))
+            for chunk in chunked(node_name_sets, batch_size):
+                hyper_edges = [HyperEdge(node_names, relationship_type) for node_names in chunk]
+                self.db.add_hyper_edges(session, rows=self._hyper_edge_rows(hyper_edges))
+                self._log_changes(hyper_edges, True)
+                self._mirror_add(self.hyper_edges, hyper_edges)
 
         self._with_session(operation)
 
-    def import_graph(self):
-        import_dir = "exported"
-        self._import_nodes_from_csv(os.path.join(import_dir, 'nodes.csv'))
-        self._import_edges_from_csv(os.path.join(import_dir, 'edges.csv'))
+    def delete_hyper_edges(self, node_name_sets: Iterable[frozenset], relationship_type: str = "CONNECTED",
+                           batch_size: int = DEFAULT_BATCH_SIZE):
+        """Delete many hyper edges of one type, sending one bulk write per chunk."""
+        if self._buffer("hyper_edges", (HyperEdge(node_names, relationship_type) for node_names in node_name_sets),
+                        False, batch_size):
+            return
 
-    def _import_nodes_from_csv(self, file_path: str, clear: bool = True):
-        """Import nodes from a CSV file."""
-        if clear:
-            self.nodes.clear()
+        def operation(session):
+            for chunk in chunked(node_name_sets, batch_size):
+                hyper_edges = [HyperEdge(node_names, relationship_type) for node_names in chunk]
+                self.db.delete_hyper_edges(session, rows=self._hyper_edge_rows(hyper_edges))
+                self._log_changes(hyper_edges, False)
+                self._mirror_discard(self.hyper_edges, hyper_edges)
+
+        self._with_session(operation)
+
+    @staticmethod
+    def _hyper_edge_rows(hyper_edges: Iterable[HyperEdge]) -> list:
+        """Convert hyper edges to the row format expected by the bulk database methods."""
+        return [{"id": hyper_edge.id, "type": hyper_edge.relationship_type, "members": hyper_edge.node_names}
+                for hyper_edge in hyper_edges]
 
-        df = pd.read_csv(file_path, delimiter='|')
+    def find_hyper_edges(self, node_name: Optional[str] = None, relationship_type: Optional[str] = None) -> set:
+        """Query the database for hyper edges containing a node and/or of a given type."""
+        self.flush()
+        result = set()
+
+        def operation(session):
+            rows = self.db.find_hyper_edges(session, node_name=node_name, relationship_type=relationship_type)
+            result.update(HyperEdge(frozenset(row["members"]), row["type"]) for row in rows)
 
-        for _, row in df.iterrows():
-            print(row)
-            node = None
-            if os.getenv("DATABASE_PROVIDER") == "NEO4J":
-                properties = ast.literal_eval(row['properties'])
-                node = Node(properties['name'])
-            elif os.getenv("DATABASE_PROVIDER") == "KUZU":
-                node = Node(row['name'])
+        self._with_session(operation)
+        return result
+
+    def query(self, cypher: str, parameters: Optional[Dict] = None, batch_size: int = QUERY_BATCH_SIZE,
+              format: str = "arrow") -> Iterator[Union["pa.RecordBatch", "pd.DataFrame"]]:
+        """
+        Run a read-only Cypher query and return an iterator over its result as Arrow record batches or,
+        with format 'pandas', DataFrames of at most `batch_size` rows. A result without rows yields one
+        empty batch with its columns. Neo4j streams the records in batches, so memory stays bounded by one;
+        Kuzu results are converted to Arrow columns in one pass. The query runs once iteration starts,
+        in the session or transaction of the current thread if one is open, and otherwise in its own
+        session, held until the iterator is exhausted or closed.
+        """
+        if format not in QUERY_FORMATS:
+            raise ValueError(f"Unsupported format {format!r}, expected one of {', '.join(QUERY_FORMATS)}")
+        if batch_size < 1:
+            raise ValueError("Batch size must be a positive number!")
+
+        def batches(session):
+            for batch in self.db.stream_query(session, cypher, parameters, batch_size):
+                yield batch if format == "arrow" else batch.to_pandas()
+
+        def run():
+            self.flush()
+            if self._session is not None:
+                yield from batches(self._session)
+                return
+            with self._open_session(fetch_size=batch_size) as session:
+                yield from batches(session)
+
+        return run()
+
+    def load_hyper_edges(self):
+        """Replace the in-memory hyper edges with every hyper edge stored in the database."""
+        hyper_edges = self.find_hyper_edges()
+        self._mirror_clear(self.hyper_edges)
+        self._mirror_add(self.hyper_edges, hyper_edges)
+
+    def warm_up(self, page_size: int = WARM_UP_PAGE_SIZE, background: bool = True):
+        """
+        Load the whole graph from the database into memory, `page_size` nodes and the edges leaving them at a time.
+        Reads keep working meanwhile and load what they touch on demand. Without `background`, return once the
+        graph is loaded, joining a warm-up already running.
+        """
+        self.sync.warm_up(page_size, background)
+
+    def _cached(self, key: tuple, compute):
+        """
+        Return the result of a read from the LRU cache, computing it on a miss.
+        Keys include the mirror generation, so a write leaves earlier results unreachable until they age out.
+        """
+        key = (self.mirror.generation, *key)
+        with self._read_cache_lock:
+            result = self._read_cache.get(key)
+            if result is not None:
+                self._read_cache.move_to_end(key)
+                return result
+
+        result = compute()
+        with self._read_cache_lock:
+            self._read_cache[key] = result
+            if len(self._read_cache) > READ_CACHE_SIZE:
+                self._read_cache.popitem(last=False)
+        return result
+
+    def neighbors(self, node_name: str, relationship_type: Optional[str] = None, direction: str = "out") -> tuple:
+        """Return the names of the nodes adjacent to a node; `direction` is 'out', 'in' or 'both'."""
+        self.sync.ensure([node_name])
+        return self._cached(("neighbors", node_name, relationship_type, direction),
+                            lambda: tuple(self.mirror.neighbors(node_name, direction, relationship_type)))
+
+    def degree(self, node_name: str, relationship_type: Optional[str] = None, direction: str = "out") -> int:
+        """Return the number of edges leaving ('out'), entering ('in') or touching ('both') a node."""
+        if direction not in ("out", "in", "both"):
+            raise ValueError(f"Unknown direction '{direction}', expected 'out', 'in' or 'both'!")
+        self.sync.ensure([node_name])
+
+        def compute():
+            with self.mirror.lock:
+                degree = 0
+                if direction in ("out", "both"):
+                    degree += self.mirror.out_degree(node_name, relationship_type)
+                if direction in ("in", "both"):
+                    degree += self.mirror.in_degree(node_name, relationship_type)
+                return degree
+
+        return self._cached(("degree", node_name, relationship_type, direction), compute)
+
+    def k_hop(self, node_name: str, k: int, relationship_type: Optional[str] = None,
+              direction: str = "out") -> frozenset:
+        """Return the names of the nodes reachable from a node in 1 to `k` hops, without the node itself."""
+
+        def compute():
+            visited = {node_name}
+            frontier = [node_name]
+            for _ in range(k):
+                # Load the whole frontier at once, outside the lock, before expanding it.
+                self.sync.ensure(frontier)
+                next_frontier = []
+                with self.mirror.lock:
+                    for name in frontier:
+                        for neighbor in self.mirror.neighbors(name, direction, relationship_type):
+                            if neighbor not in visited:
+                                visited.add(neighbor)
+                                next_frontier.append(neighbor)
+                if not next_frontier:
+                    break
+                frontier = next_frontier
+            visited.discard(node_name)
+            return frozenset(visited)
+
+        return self._cached(("k_hop", node_name, k, relationship_type, direction), compute)
+
+    def hyperedges_of(self, node_name: str) -> frozenset:
+        """Return the hyper edges containing a node, looked up in the incidence index of the in-memory hyper edges."""
+        self.sync.ensure([node_name])
+        return self._cached(("hyperedges_of", node_name),
+                            lambda: frozenset(self.incidence.hyper_edges_of(node_name)))
+
+    def edge_exists(self, start_node_name: str, end_node_name: str, relationship_type: str = "Connects") -> bool:
+        """Return whether the edge is in the graph."""
+        self.sync.ensure([start_node_name])
+        return self._cached(("edge_exists", start_node_name, end_node_name, relationship_type),
+                            lambda: self.mirror.has_edge(start_node_name, end_node_name, relationship_type))
+
+    @staticmethod
+    def _check_format(format: str):
+        """Raise ValueError for an unsupported export file format."""
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format {format!r}, expected one of {', '.join(EXPORT_FORMATS)}")
+
+    def export_graph(self, format: str = "csv"):
+        """
+        Export the graph to the `exported` directory as pipe-delimited CSV or Parquet files.
+        The export is a checkpoint of the change log, so the next delta holds the changes made after it.
+        The seconds spent per file are left in `export_timings`.
+        """
+        self._check_format(format)
+        self.flush()
+        sequence = self.changes.sequence
+        export_dir = "exported"
+        os.makedirs(export_dir, exist_ok=True)
+        self.export_timings = {}
+        export_nodes = getattr(self.db, f"export_nodes_to_{format}")
+        export_edges = getattr(self.db, f"export_edges_to_{format}")
+        export_hyper_edges = getattr(self.db, f"export_hyper_edges_to_{format}")
 
-            self.nodes.add(node)
+        def timed(phase: str, export):
+            start = time.perf_counter()
+            export()
+            self.export_timings[phase] = time.perf_counter() - start
 
         def operation(session):
-            self.db.import_nodes_from_csv(session, file_path)
+            timed("nodes", lambda: export_nodes(session, os.path.join(export_dir, f'nodes.{format}')))
+            timed("edges", lambda: export_edges(session, os.path.join(export_dir, f'edges.{format}')))
+            timed("hyper_edges", lambda: export_hyper_edges(
+                session, os.path.join(export_dir, f'hyper_edges.{format}'),
+                os.path.join(export_dir, f'hyper_edge_members.{format}')))
 
         self._with_session(operation)
+        self.changes.checkpoint(sequence)
+
+    def export_delta(self, directory: str = "exported", format: str = "csv") -> Delta:
+        """
+        Write the net changes logged since the last checkpoint to the `delta_*` files of `directory`
+        and make them the new checkpoint. Returns the exported delta.
+        """
+        self._check_format(format)
+        self.flush()
+        start = time.perf_counter()
+        delta = self.changes.delta()
+        write_delta(delta, directory, format)
+        self.changes.checkpoint(delta.last_sequence)
+        self.export_timings = {"delta": time.perf_counter() - start}
+        return delta
+
+    def apply_delta(self, directory: str = "exported", batch_size: int = DEFAULT_BATCH_SIZE) -> Delta:
+        """
+        Replay the delta files of `directory` with bulk writes in one transaction, after clearing the graph if
+        the delta spans a clear. The graph must be at the checkpoint the delta starts from, e.g. imported from
+        the export made then. Replayed changes are logged like any other write, so deltas can be passed on.
+        """
+        start = time.perf_counter()
+        delta = read_delta(directory)
+        if delta.cleared:
+            self.clear_graph()
+
+        with self.transaction():
+            self._with_session(lambda session: self._write_changes(session, delta.changes, batch_size))
+            for kind in ("hyper_edges", "edges", "nodes"):
+                self._mirror_discard(getattr(self, kind),
+                                     [item for item, present in delta.changes[kind].items() if not present])
+            for kind in ("nodes", "edges", "hyper_edges"):
+                self._mirror_add(getattr(self, kind),
+                                 [item for item, present in delta.changes[kind].items() if present])
+        self.import_timings = {"delta": time.perf_counter() - start}
+        return delta
+
+    def import_graph(self, concurrent: bool = True, format: str = "csv", directory: str = "exported"):
+        """
+        Import the CSV or Parquet graph exported to `directory` into the in-memory mirror and the database.
+        The imported graph becomes the checkpoint of the change log, like the export it came from.
+        With `concurrent`, each file is loaded into the mirror while the database loads it in a worker thread.
+        The seconds spent per phase are left in `import_timings`.
+        """
+        self._check_format(format)
+        self.flush()
+        # The mirror is rebuilt from the imported files, so nothing is left to load from the database.
+        self.sync.reset()
+        import_dir = directory
+        self.import_timings = {}
+        self._import_nodes(os.path.join(import_dir, f'nodes.{format}'), format, concurrent=concurrent)
+        self._import_edges(os.path.join(import_dir, f'edges.{format}'), format, concurrent=concurrent)
+
+        # Exports made before hyper edges were persisted have no hyper edge files.
+        hyper_edges_path = os.path.join(import_dir, f'hyper_edges.{format}')
+        if os.path.exists(hyper_edges_path):
+            self._import_hyper_edges(hyper_edges_path, os.path.join(import_dir, f'hyper_edge_members.{format}'),
+                                     format, concurrent=concurrent)
+        self.changes.checkpoint()
+
+    def load_generated_graph(self, graph: "GeneratedGraph", format: str = "csv"):
+        """
+        Replace the graph with a generated one by writing it to bulk-load files in a temporary directory and
+        importing them, which leaves the exports in `exported` alone. The graph is only cleared once the files
+        are written.
+        """
+        from utils.generator import write_bulk_files
+        self._check_format(format)
+        with tempfile.TemporaryDirectory(prefix="ho-gdb-generated-") as directory:
+            write_bulk_files(graph, directory, format=format)
+            self.clear_graph()
+            self.import_graph(format=format, directory=directory)
+
+    @staticmethod
+    def _read_chunks(file_path: str, format: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+        """
+        Yield an exported file as DataFrames of at most `chunk_size` rows.
+        Struct columns of Parquet files are flattened, so their fields appear as `column.field` columns.
+        """
+        if format == "csv":
+            import pandas as pd
+            yield from pd.read_csv(file_path, delimiter='|', dtype=str, chunksize=chunk_size)
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(file_path).iter_batches(batch_size=chunk_size):
+            yield pa.Table.from_batches([batch]).flatten().to_pandas()
+
+    @staticmethod
+    def _read_table(file_path: str, format: str) -> "pd.DataFrame":
+        """Read a whole exported file into one DataFrame."""
+        if format == "csv":
+            import pandas as pd
+            return pd.read_csv(file_path, delimiter='|', dtype=str)
+        import pyarrow.parquet as pq
+        return pq.read_table(file_path).flatten().to_pandas()
+
+    def _run_import_phase(self, phase: str, load_mirror, operation, concurrent: bool):
+        """Run the mirror load and the database operation of one import phase and record their timings."""
+
+        def timed(part: str, load):
+            start = time.perf_counter()
+            load()
+            self.import_timings[f"{phase}.{part}"] = time.perf_counter() - start
+
+        # An open session or transaction cannot be shared with a worker thread.
+        if not concurrent or self._session is not None:
+            timed("mirror", load_mirror)
+            timed("database", lambda: self._with_session(operation))
+            return
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            database_load = executor.submit(timed, "database", lambda: self._with_session(operation))
+            timed("mirror", load_mirror)
+            database_load.result()
+
+    def _import_nodes(self, file_path: str, format: str, clear: bool = True, concurrent: bool = False):
+        """Import nodes from an exported file, building the mirror from whole columns read in bounded chunks."""
+        if clear:
+            self._mirror_clear(self.nodes)
+
+        def load_mirror():
+            for chunk in self._read_chunks(file_path, format):
+                if 'name' in chunk:
+                    names = chunk['name']
+                elif 'properties.name' in chunk:
+                    names = chunk['properties.name']
+                elif 'properties' in chunk:
+                    names = self.db.parse_property_names(chunk['properties'])
+                else:
+                    continue
+                names = names.dropna().to_numpy(dtype=object)
+
+                if self._journal is None:
+                    self.mirror.add_nodes_from_array(names)
+                else:
+                    self._mirror_add(self.nodes, (Node(name) for name in names))
 
-    def _import_edges_from_csv(self, file_path: str, clear: bool = True):
-        """Import edges from a CSV file."""
+        def operation(session):
+            getattr(self.db, f"import_nodes_from_{format}")(session, file_path)
+
+        self._run_import_phase("nodes", load_mirror, operation, concurrent)
+
+    def _import_edges(self, file_path: str, format: str, clear: bool = True, concurrent: bool = False):
+        """Import edges from an exported file, building the mirror from whole columns read in bounded chunks."""
         if clear:
-            self.edges.clear()
+            self._mirror_clear(self.edges)
+
+        def load_mirror():
+            for chunk in self._read_chunks(file_path, format):
+                start_names = chunk['start_name'].to_numpy(dtype=object)
+                end_names = chunk['end_name'].to_numpy(dtype=object)
+                if 'type' in chunk:
+                    relationship_types = chunk['type'].to_numpy(dtype=object)
+                else:
+                    relationship_types = np.full(len(chunk), 'Connects', dtype=object)
+
+                if self._journal is None:
+                    self.mirror.append_edges(start_names, end_names, relationship_types)
+                else:
+                    self._mirror_add(self.edges, (Edge(*edge) for edge
+                                                  in zip(start_names, end_names, relationship_types)))
 
-        df = pd.read_csv(file_path, delimiter='|')
+        def operation(session):
+            getattr(self.db, f"import_edges_from_{format}")(session, file_path)
 
-        for _, row in df.iterrows():
-            start_node_name: str = row['start_name']
-            end_node_name: str = row['end_name']
-            relationship_type: str = ''
+        self._run_import_phase("edges", load_mirror, operation, concurrent)
 
-            if os.getenv("DATABASE_PROVIDER") == "NEO4J":
-                relationship_type: str = row['type']
-            elif os.getenv("DATABASE_PROVIDER") == "KUZU":
-                relationship_type: str = 'Connects'
+    def _import_hyper_edges(self, file_path: str, members_file_path: str, format: str, clear: bool = True,
+                            concurrent: bool = False):
+        """Import hyper edges and their memberships from exported files."""
+        if clear:
+            self._mirror_clear(self.hyper_edges)
 
-            edge = Edge(start_node_name, end_node_name, relationship_type)
-            self.edges.add(edge)
+        def load_mirror():
+            hyper_edges = self._read_table(file_path, format)
+            members = self._read_table(members_file_path, format)
+            member_sets = members.groupby('hyper_edge_id')['name'].agg(frozenset)
+            hyper_edges = hyper_edges.join(member_sets, on='id', how='inner')
+            self._mirror_add(self.hyper_edges, (HyperEdge(node_names, relationship_type)
+                                                for relationship_type, node_names
+                                                in zip(hyper_edges['relationship_type'], hyper_edges['name'])))
 
         def operation(session):
-            self.db.import_edges_from_csv(session, file_path)
+            getattr(self.db, f"import_hyper_edges_from_{format}")(session, file_path, members_file_path)
 
-        self._with_session(operation)
+        self._run_import_phase("hyper_edges", load_mirror, operation, concurrent)
 
     def clear_graph(self):
-        """Clear the graph storage."""
-        self.nodes.clear()
-        self.edges.clear()
-        self.hyper_edges.clear()
+        """Clear the graph storage, dropping buffered operations and loads that clearing makes moot."""
+        self.sync.reset()
+        if self._write_buffer is not None:
+            self._write_buffer.raise_error()
+            self._write_buffer.discard()
+        self._mirror_clear(self.nodes)
+        self._mirror_clear(self.edges)
+        self._mirror_clear(self.hyper_edges)
 
         def operation(session):
             self.db.clear_data(session)
 
         self._with_session(operation)
+        self.changes.record_clear()
 
     def __str__(self):
-        """Return a string representation of the graph storage."""
-        return (
-            f"Nodes: {self.nodes}\n"
-            f"Edges: {self.edges}\n"
-            f"HyperEdges: {self.hyper_edges}"
-        )
+        """Return a string representation of the whole graph, loading it first."""
+        self.warm_up(background=False)
+        with self.mirror.lock:
+            return (
+                f"Nodes: {self.nodes}\n"
+                f"Edges: {self.edges}\n"
+                f"HyperEdges: {self.hyper_edges}"
+            )
@@ -1,11 +1,26 @@
+import hashlib
+
 from graph_data.Node import Node
 
 
 class HyperEdge:
+    __slots__ = ("nodes", "relationship_type")
+
     def __init__(self, nodes: frozenset[Node], relationship_type: str):
         self.nodes: frozenset[Node] = nodes
         self.relationship_type: str = relationship_type
 
+    @property
+    def node_names(self) -> list:
+        """Sorted names of the member nodes."""
+        return sorted(getattr(node, "name", node) for node in self.nodes)
+
+    @property
+    def id(self) -> str:
+        """Stable identifier of the hyper edge in the database, derived from its type and member names."""
+        key = "\x1f".join([self.relationship_type, *self.node_names])
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
     def __repr__(self):
         return f"""({', '.join(f"'{item}'" for item in self.nodes)})->[{self.relationship_type}]"""
 
@@ -0,0 +1,282 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+import gc
+import numpy as np
+
+from graph_data.Edge import Edge
+from graph_data.HyperEdge import HyperEdge
+from graph_data.GraphMirror import GraphMirror, REBUILD_RATIO, REBUILD_MIN_CHANGES, INITIAL_CAPACITY, _grow
+
+# SciPy is imported by the sparse analytics that need it, keeping startup fast.
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+
+
+def _member_names(hyper_edge: HyperEdge) -> list:
+    """Return the member names of a hyper edge, whose members may be names or Node objects."""
+    return [getattr(node, "name", node) for node in hyper_edge.nodes]
+
+
+class HyperEdgeIncidence:
+    def __init__(self, mirror: GraphMirror):
+        """
+        Sparse node x hyper edge incidence of the in-memory hyper edges, kept up to date incrementally.
+        Every hyper edge owns a column and every membership is one (node id, column) entry, with node ids
+        interned by the mirror, whose lock and generation counter it shares. Memberships are indexed by node
+        in CSR form like the mirror's edges: later additions wait in pending lists, removed hyper edges are
+        masked, and both are compacted away once they exceed a share of the index.
+        """
+        self.mirror = mirror
+        self.lock = mirror.lock
+        self._clear()
+
+    def _clear(self):
+        self._columns: Dict[HyperEdge, int] = {}
+        self._hyper_edges: List[Optional[HyperEdge]] = []
+        self._column_alive = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._removed_since_rebuild = 0
+
+        self._member_nodes = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._member_columns = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self._member_count = 0
+
+        # Columns of the memberships [0, _indexed_members) sorted by node: those of node i are
+        # _node_columns[_node_indptr[i]:_node_indptr[i + 1]]. Later memberships live in _pending.
+        self._indexed_members = 0
+        self._index_stale = False
+        self._node_indptr = np.zeros(1, dtype=np.int64)
+        self._node_columns = np.zeros(0, dtype=np.int32)
+        self._pending: Dict[int, List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def __contains__(self, hyper_edge: HyperEdge) -> bool:
+        return hyper_edge in self._columns
+
+    def hyper_edges(self) -> List[HyperEdge]:
+        """Return the hyper edges, as they are now."""
+        with self.lock:
+            return list(self._columns)
+
+    def add(self, hyper_edge: HyperEdge) -> bool:
+        """Add a hyper edge, returning False if it was already present."""
+        with self.lock:
+            if hyper_edge in self._columns:
+                return False
+            column = self._append([hyper_edge], [self.mirror.intern(name) for name in _member_names(hyper_edge)])
+            for node_id in self._member_nodes[self._member_count - len(hyper_edge.nodes):self._member_count]:
+                self._pending.setdefault(int(node_id), []).append(column)
+            self._maybe_rebuild()
+            return True
+
+    def add_many(self, hyper_edges: Iterable[HyperEdge]):
+        """
+        Add many hyper edges at once, interning their members with one vectorized call.
+        The node index is left stale and rebuilt on the next lookup, so bulk loads pay for one rebuild.
+        """
+        with self.lock:
+            new = [hyper_edge for hyper_edge in dict.fromkeys(hyper_edges) if hyper_edge not in self._columns]
+            if not new:
+                return
+            names = [name for hyper_edge in new for name in _member_names(hyper_edge)]
+            self._append(new, self.mirror.intern_many(names) if names else np.zeros(0, dtype=np.int32))
+            self._index_stale = True
+
+    def _append(self, hyper_edges: List[HyperEdge], node_ids) -> int:
+        """Append hyper edges and their memberships to the columns, returning the first new column."""
+        first = len(self._hyper_edges)
+        count = len(hyper_edges)
+        for offset, hyper_edge in enumerate(hyper_edges):
+            self._columns[hyper_edge] = first + offset
+        self._hyper_edges.extend(hyper_edges)
+        self._column_alive = _grow(self._column_alive, first + count)
+        self._column_alive[first:first + count] = True
+
+        sizes = [len(hyper_edge.nodes) for hyper_edge in hyper_edges]
+        start = self._member_count
+        end = start + len(node_ids)
+        self._member_nodes = _grow(self._member_nodes, end)
+        self._member_columns = _grow(self._member_columns, end)
+        self._member_nodes[start:end] = node_ids
+        self._member_columns[start:end] = np.repeat(np.arange(first, first + count, dtype=np.int32), sizes)
+        self._member_count = end
+        self.mirror.touch()
+        return first
+
+    def remove(self, hyper_edge: HyperEdge) -> bool:
+        """Remove a hyper edge, returning False if it was not present."""
+        with self.lock:
+            column = self._columns.pop(hyper_edge, None)
+            if column is None:
+                return False
+            self._column_alive[column] = False
+            self._hyper_edges[column] = None
+            self._removed_since_rebuild += 1
+            self.mirror.touch()
+            self._maybe_rebuild()
+            return True
+
+    def clear(self):
+        """Remove every hyper edge."""
+        with self.lock:
+            self._clear()
+            self.mirror.touch()
+
+    def _maybe_rebuild(self):
+        """Rebuild the node index once enough memberships were added or hyper edges removed since the last one."""
+        changes = self._member_count - self._indexed_members + self._removed_since_rebuild
+        if changes >= max(REBUILD_MIN_CHANGES, REBUILD_RATIO * self._indexed_members):
+            self.rebuild()
+
+    def _ensure_index(self):
+        """Rebuild the node index if a bulk addition left it stale."""
+        if self._index_stale:
+            self.rebuild()
+
+    def rebuild(self):
+        """Compact removed hyper edges away, renumbering the columns, and rebuild the node index."""
+        with self.lock:
+            alive_columns = np.flatnonzero(self._column_alive[:len(self._hyper_edges)])
+            renumber = np.full(len(self._hyper_edges), -1, dtype=np.int32)
+            renumber[alive_columns] = np.arange(len(alive_columns), dtype=np.int32)
+
+            member_columns = renumber[self._member_columns[:self._member_count]]
+            kept = member_columns >= 0
+            member_nodes = self._member_nodes[:self._member_count][kept]
+            member_columns = member_columns[kept]
+
+            self._hyper_edges = [self._hyper_edges[column] for column in alive_columns]
+            self._columns = {hyper_edge: column for column, hyper_edge in enumerate(self._hyper_edges)}
+            self._column_alive[:len(alive_columns)] = True
+            self._column_alive[len(alive_columns):] = False
+
+            count = len(member_nodes)
+            self._member_nodes[:count] = member_nodes
+            self._member_columns[:count] = member_columns
+            self._member_count = count
+
+            order = np.argsort(member_nodes, kind="stable")
+            self._node_columns = member_columns[order]
+            node_count = int(member_nodes.max()) + 1 if count else 0
+            self._node_indptr = np.concatenate([[0], np.cumsum(np.bincount(member_nodes, minlength=node_count))])
+
+            self._indexed_members = count
+            self._index_stale = False
+            self._pending.clear()
+            self._removed_since_rebuild = 0
+
+    def hyper_edges_of(self, node_name: str) -> List[HyperEdge]:
+        """Return the hyper edges containing a node in O(number of its hyper edges)."""
+        with self.lock:
+            node_id = self.mirror.node_id(node_name)
+            if node_id is None:
+                return []
+            self._ensure_index()
+            if node_id < len(self._node_indptr) - 1:
+                columns = self._node_columns[self._node_indptr[node_id]:self._node_indptr[node_id + 1]]
+            else:
+                columns = self._node_columns[:0]
+            pending = self._pending.get(node_id)
+            if pending:
+                columns = np.concatenate([columns, pending])
+            columns = columns[self._column_alive[columns]]
+            return [self._hyper_edges[column] for column in columns]
+
+    def matrix(self) -> Tuple["sp.csr_matrix", np.ndarray, List[HyperEdge]]:
+        """
+        Return the incidence matrix with one row per member node and one column per hyper edge, together with
+        the node names of the rows and the hyper edges of the columns.
+        """
+        import scipy.sparse as sp
+        with self.lock:
+            # The matrix covers indexed memberships only, so pending and removed ones are compacted first.
+            if self._index_stale or self._pending or self._removed_since_rebuild:
+                self.rebuild()
+            node_ids = np.flatnonzero(np.diff(self._node_indptr))
+            position = np.full(len(self._node_indptr), -1, dtype=np.int64)
+            position[node_ids] = np.arange(len(node_ids))
+            rows = position[self._member_nodes[:self._member_count]]
+            columns = self._member_columns[:self._member_count]
+            node_names = self.mirror.node_names_of(node_ids)
+            hyper_edges = list(self._hyper_edges)
+
+        incidence = sp.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, columns)),
+                                  shape=(len(node_ids), len(hyper_edges)))
+        return incidence, node_names, hyper_edges
+
+    def co_membership(self, node_name: str) -> Dict[str, int]:
+        """Return, for every node sharing a hyper edge with the given one, the number of hyper edges they share."""
+        with self.lock:
+            members = [name for hyper_edge in self.hyper_edges_of(node_name) for name in _member_names(hyper_edge)]
+        names, counts = np.unique(np.array(members, dtype=object), return_counts=True)
+        return {name: int(count) for name, count in zip(names, counts) if name != node_name}
+
+    def co_membership_matrix(self) -> Tuple["sp.csr_matrix", np.ndarray]:
+        """
+        Return the symmetric node x node matrix counting the hyper edges every pair of nodes shares,
+        computed as B B^T from the incidence matrix B with the diagonal removed, and the node names.
+        """
+        incidence, node_names, _ = self.matrix()
+        counts = (incidence @ incidence.T).tocsr()
+        counts.setdiag(0)
+        counts.eliminate_zeros()
+        return counts, node_names
+
+    def s_line_graph(self, s: int = 1) -> Tuple["sp.csr_matrix", List[HyperEdge]]:
+        """
+        Return the s-line graph: hyper edges are adjacent when they share at least `s` nodes.
+        The symmetric adjacency matrix is computed as B^T B from the incidence matrix B, thresholded at `s`.
+        """
+        incidence, _, hyper_edges = self.matrix()
+        overlaps = (incidence.T @ incidence).tocsr()
+        overlaps.setdiag(0)
+        overlaps.data[overlaps.data < s] = 0
+        overlaps.eliminate_zeros()
+        overlaps.data[:] = 1
+        return overlaps, hyper_edges
+
+    def clique_expansion(self) -> List[Edge]:
+        """
+        Expand every hyper edge into edges between each pair of its members, typed with its relationship type.
+        Each pair is expanded once per type, from the member named first to the other.
+        """
+        import scipy.sparse as sp
+        incidence, node_names, hyper_edges = self.matrix()
+        types = np.array([hyper_edge.relationship_type for hyper_edge in hyper_edges], dtype=object)
+        edges = []
+        # Creating millions of Edge objects would otherwise trigger one garbage collection after another.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for relationship_type in dict.fromkeys(types):
+                typed = incidence[:, np.flatnonzero(types == relationship_type)]
+                pairs = sp.triu((typed @ typed.T).tocoo(), k=1).tocoo()
+                starts, ends = node_names[pairs.row], node_names[pairs.col]
+                swap = starts > ends
+                starts[swap], ends[swap] = ends[swap], starts[swap]
+                edges.extend(Edge(start, end, relationship_type)
+                             for start, end in zip(starts.tolist(), ends.tolist()))
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return edges
+
+    def degree_statistics(self) -> Dict:
+        """
+        Return the node degrees (hyper edges per node) and hyper edge sizes (members per hyper edge)
+        as summary statistics and as (value, count) distributions.
+        """
+        incidence, _, _ = self.matrix()
+        node_degrees = np.diff(incidence.indptr)
+        sizes = np.asarray(incidence.sum(axis=0)).ravel().astype(np.int64)
+
+        def summary(values: np.ndarray) -> Dict:
+            if not len(values):
+                return {"count": 0, "min": 0, "max": 0, "mean": 0.0, "median": 0.0, "distribution": ([], [])}
+            counts = np.bincount(values)
+            distinct = np.flatnonzero(counts)
+            return {"count": len(values), "min": int(values.min()), "max": int(values.max()),
+                    "mean": float(values.mean()), "median": float(np.median(values)),
+                    "distribution": (distinct.tolist(), counts[distinct].tolist())}
+
+        return {"node_degrees": summary(node_degrees), "hyper_edge_sizes": summary(sizes)}
@@ -0,0 +1,39 @@
+from collections.abc import MutableSet
+from typing import Iterable, Iterator
+
+from graph_data.HyperEdge import HyperEdge
+from graph_data.HyperEdgeIncidence import HyperEdgeIncidence
+
+
+class HyperEdgeSet(MutableSet):
+    def __init__(self, incidence: HyperEdgeIncidence):
+        """Set of HyperEdge objects backed by a HyperEdgeIncidence."""
+        self._incidence = incidence
+
+    def __contains__(self, hyper_edge: HyperEdge) -> bool:
+        return hyper_edge in self._incidence
+
+    def __iter__(self) -> Iterator[HyperEdge]:
+        return iter(self._incidence.hyper_edges())
+
+    def __len__(self) -> int:
+        return len(self._incidence)
+
+    def add(self, hyper_edge: HyperEdge):
+        self._incidence.add(hyper_edge)
+
+    def discard(self, hyper_edge: HyperEdge):
+        self._incidence.remove(hyper_edge)
+
+    def update(self, hyper_edges: Iterable[HyperEdge]):
+        self._incidence.add_many(hyper_edges)
+
+    def difference_update(self, hyper_edges: Iterable[HyperEdge]):
+        for hyper_edge in hyper_edges:
+            self.discard(hyper_edge)
+
+    def clear(self):
+        self._incidence.clear()
+
+    def __repr__(self):
+        return repr(set(self))
@@ -0,0 +1,206 @@
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+import threading
+import numpy as np
+
+from graph_data.Node import Node
+from graph_data.Edge import Edge
+from graph_data.HyperEdge import HyperEdge
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Nodes read per page of a warm-up, together with the edges leaving them.
+WARM_UP_PAGE_SIZE = 100_000
+
+# Edges of a page added to the mirror per hold of its lock.
+APPLY_CHUNK_SIZE = 20_000
+
+# Hyper edges read per page of a warm-up.
+HYPER_EDGE_PAGE_SIZE = 10_000
+
+
+class MirrorSync:
+    def __init__(self, storage):
+        """
+        Loads the in-memory mirror of a GraphStorage from its database on demand.
+        Until the whole graph has been read, a read first loads the nodes it touches together with their edges
+        and hyper edges, and a warm-up pages through the nodes in name order, with the edges leaving them, and
+        then through the hyper edges in id order. Items deleted meanwhile are remembered, so that a page read
+        before the deletion reached the database cannot bring them back.
+        """
+        self._storage = storage
+        self._mirror = storage.mirror
+        self.lock = storage.mirror.lock
+        # Whether the mirror holds the whole graph, so nothing is loaded on demand any more.
+        self.complete = False
+        # Incremented when the graph is cleared or replaced, so loads started before are dropped.
+        self._epoch = 0
+        self._loaded = set()
+        self._deleted: Dict[type, set] = {Node: set(), Edge: set(), HyperEdge: set()}
+        self._warm_up: Optional[threading.Thread] = None
+        self._warm_up_error: Optional[BaseException] = None
+        self._stop = threading.Event()
+
+    def covers(self, item) -> bool:
+        """Return whether a node, edge or hyper edge is in the mirror if it is in the database."""
+        if self.complete:
+            return True
+        if isinstance(item, Node):
+            return item.name in self._loaded
+        if isinstance(item, Edge):
+            return item.start_node_name in self._loaded or item.end_node_name in self._loaded
+        return any(getattr(node, "name", node) in self._loaded for node in item.nodes)
+
+    def record_deletions(self, items: Iterable):
+        """Remember nodes, edges or hyper edges deleted while the mirror is incomplete, so loads skip them."""
+        with self.lock:
+            if self.complete:
+                return
+            for item in items:
+                self._deleted[type(item)].add(item)
+
+    def _kept(self, items: List) -> List:
+        """Drop the items deleted since loading began."""
+        if not items:
+            return items
+        deleted = self._deleted[type(items[0])]
+        return [item for item in items if item not in deleted] if deleted else items
+
+    def ensure(self, node_names: Iterable[str]):
+        """Load the nodes, with the edges leaving or entering them and their hyper edges, unless already loaded."""
+        if self.complete:
+            return
+        names = [name for name in dict.fromkeys(node_names) if name not in self._loaded]
+        if not names:
+            return
+
+        epoch = self._epoch
+        found = {}
+
+        def operation(session):
+            db = self._storage.db
+            found["nodes"] = db.find_nodes(session, names)
+            found["edges"] = db.find_node_edges(session, names)
+            found["hyper_edges"] = db.find_member_hyper_edges(session, names)
+
+        self._storage._with_session(operation)
+
+        with self.lock:
+            if epoch != self._epoch or self.complete:
+                return
+            for node in self._kept([Node(name) for name in found["nodes"]]):
+                self._mirror.add_node(node.name)
+            for edge in self._kept([Edge(row["start_name"], row["end_name"], row["type"]) for row in found["edges"]]):
+                self._mirror.add_edge(edge.start_node_name, edge.end_node_name, edge.relationship_type)
+            self._storage.incidence.add_many(self._kept(self._hyper_edges(found["hyper_edges"])))
+            self._loaded.update(names)
+
+    @staticmethod
+    def _hyper_edges(rows: List[Dict]) -> List[HyperEdge]:
+        return [HyperEdge(frozenset(row["members"]), row["type"]) for row in rows]
+
+    def warm_up(self, page_size: int = WARM_UP_PAGE_SIZE, background: bool = True):
+        """
+        Load the whole graph page by page, in a background thread or, without `background`, before returning.
+        A warm-up already running is joined rather than started again; its error is raised by `wait`.
+        """
+        with self.lock:
+            if not self.complete and (self._warm_up is None or not self._warm_up.is_alive()):
+                self._stop.clear()
+                self._warm_up_error = None
+                self._warm_up = threading.Thread(target=self._run_warm_up, args=(self._epoch, page_size),
+                                                 name="mirror-warm-up", daemon=True)
+                self._warm_up.start()
+        if not background:
+            self.wait()
+
+    def wait(self):
+        """Wait for a running warm-up to finish, raising its error if it failed."""
+        warm_up = self._warm_up
+        if warm_up is not None and warm_up is not threading.current_thread():
+            warm_up.join()
+        error, self._warm_up_error = self._warm_up_error, None
+        if error is not None:
+            raise error
+
+    def _run_warm_up(self, epoch: int, page_size: int):
+        try:
+            self._storage._with_session(lambda session: self._load_pages(session, epoch, page_size))
+        except Exception as error:
+            # Kept for `wait`, which runs in a thread that can handle it.
+            self._warm_up_error = error
+
+    def _load_pages(self, session, epoch: int, page_size: int):
+        """Page through the nodes with their edges and then the hyper edges, stopping if the graph is replaced."""
+        db = self._storage.db
+        after = None
+        while not self._stop.is_set():
+            names = db.scan_nodes(session, after, page_size)
+            if not names:
+                break
+            if not self._apply_page(epoch, names, db.scan_edges(session, names[0], names[-1])):
+                return
+            after = names[-1]
+
+        after = None
+        while not self._stop.is_set():
+            rows = db.scan_hyper_edges(session, after, HYPER_EDGE_PAGE_SIZE)
+            if not rows:
+                break
+            with self.lock:
+                if epoch != self._epoch:
+                    return
+                self._storage.incidence.add_many(self._kept(self._hyper_edges(rows)))
+            after = rows[-1]["id"]
+
+        with self.lock:
+            if epoch == self._epoch and not self._stop.is_set():
+                self._mark_complete()
+
+    def _apply_page(self, epoch: int, names: List[str], edges: "pd.DataFrame") -> bool:
+        """
+        Add a page of nodes and the edges leaving them, returning False if the graph was replaced meanwhile.
+        The edges are merged APPLY_CHUNK_SIZE at a time, releasing the mirror lock in between for readers.
+        """
+        with self.lock:
+            if epoch != self._epoch:
+                return False
+            if self._deleted[Node]:
+                names = [node.name for node in self._kept([Node(name) for name in names])]
+            self._mirror.add_nodes_from_array(np.asarray(names, dtype=object))
+
+        columns = [edges[column].to_numpy(dtype=object) for column in ("start_name", "end_name", "type")]
+        for start in range(0, len(edges), APPLY_CHUNK_SIZE):
+            start_names, end_names, relationship_types = (column[start:start + APPLY_CHUNK_SIZE] for column in columns)
+            with self.lock:
+                if epoch != self._epoch:
+                    return False
+                if self._deleted[Edge]:
+                    kept = np.array([Edge(*edge) not in self._deleted[Edge] for edge
+                                     in zip(start_names, end_names, relationship_types)])
+                    start_names, end_names = start_names[kept], end_names[kept]
+                    relationship_types = relationship_types[kept]
+                self._mirror.merge_edges(start_names, end_names, relationship_types)
+        return True
+
+    def _mark_complete(self):
+        self.complete = True
+        self._loaded = set()
+        self._deleted = {kind: set() for kind in self._deleted}
+
+    def reset(self):
+        """
+        Stop loading because the mirror and the database are about to be cleared or replaced together,
+        which leaves the mirror complete.
+        """
+        self.close()
+        with self.lock:
+            self._epoch += 1
+            self._mark_complete()
+
+    def close(self):
+        """Stop a running warm-up and wait for it to end."""
+        self._stop.set()
+        warm_up = self._warm_up
+        if warm_up is not None and warm_up is not threading.current_thread():
+            warm_up.join()
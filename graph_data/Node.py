@@ -1,4 +1,6 @@
 class Node:
+    __slots__ = ("name",)
+
     def __init__(self, name: str):
         self.name = name
 
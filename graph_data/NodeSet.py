@@ -0,0 +1,40 @@
+from collections.abc import MutableSet
+from typing import Iterable, Iterator
+
+from graph_data.GraphMirror import GraphMirror
+from graph_data.Node import Node
+
+
+class NodeSet(MutableSet):
+    def __init__(self, mirror: GraphMirror):
+        """Set of Node objects backed by the interned node table of a GraphMirror."""
+        self._mirror = mirror
+
+    def __contains__(self, node: Node) -> bool:
+        return self._mirror.has_node(node.name)
+
+    def __iter__(self) -> Iterator[Node]:
+        return (Node(name) for name in self._mirror.node_names())
+
+    def __len__(self) -> int:
+        return self._mirror.node_count
+
+    def add(self, node: Node):
+        self._mirror.add_node(node.name)
+
+    def discard(self, node: Node):
+        self._mirror.remove_node(node.name)
+
+    def update(self, nodes: Iterable[Node]):
+        for node in nodes:
+            self._mirror.add_node(node.name)
+
+    def difference_update(self, nodes: Iterable[Node]):
+        for node in nodes:
+            self._mirror.remove_node(node.name)
+
+    def clear(self):
+        self._mirror.clear_nodes()
+
+    def __repr__(self):
+        return repr(set(self))
@@ -0,0 +1,109 @@
+from typing import Callable, Dict, Hashable, Optional
+import threading
+
+# Pending operations that trigger a flush in the writing thread.
+DEFAULT_MAX_PENDING = 10_000
+
+# Seconds between flushes of the background thread.
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+# Collections of GraphStorage a buffered operation can target.
+BUFFERED_KINDS = ("nodes", "edges", "hyper_edges")
+
+
+class WriteBehindError(RuntimeError):
+    def __init__(self, batch: Dict[str, Dict[Hashable, bool]]):
+        """
+        Raised when a buffered batch could not be written to the database.
+        `batch` maps each collection to the items whose presence the batch tried to change.
+        """
+        count = sum(len(items) for items in batch.values())
+        super().__init__(f"Failed to write {count} buffered operation(s) to the database!")
+        self.batch = batch
+
+
+class WriteBuffer:
+    def __init__(self, write: Callable[[Dict[str, Dict[Hashable, bool]]], None],
+                 max_pending: int = DEFAULT_MAX_PENDING, flush_interval: Optional[float] = DEFAULT_FLUSH_INTERVAL):
+        """
+        Buffer of pending additions and deletions, coalesced per item and handed to `write` in batches.
+        Only the net change of an item is kept: an add followed by a delete of an item that was absent
+        cancels out, and repeated adds collapse into one. A batch is written once `max_pending` items are
+        pending, every `flush_interval` seconds by a background thread (None disables it), or on `flush`.
+        """
+        self.lock = threading.RLock()
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self._write = write
+        # kind -> item -> [present before buffering, present after the latest operation]
+        self._pending: Dict[str, Dict[Hashable, list]] = {kind: {} for kind in BUFFERED_KINDS}
+        self._error: Optional[BaseException] = None
+        self._closed = threading.Event()
+        self._thread = None
+        if flush_interval is not None:
+            self._thread = threading.Thread(target=self._flush_periodically, name="write-behind", daemon=True)
+            self._thread.start()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return sum(len(items) for items in self._pending.values())
+
+    def record(self, kind: str, item: Hashable, before: bool, after: bool):
+        """Record that an item of a collection went from present `before` to present `after`, holding `lock`."""
+        pending = self._pending[kind]
+        state = pending.get(item)
+        if state is None:
+            if before != after:
+                pending[item] = [before, after]
+        elif state[0] == after:
+            del pending[item]
+        else:
+            state[1] = after
+
+    def raise_error(self):
+        """Raise, once, the error of a background flush that failed since the last call."""
+        with self.lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def flush_if_full(self):
+        """Flush in the calling thread once `max_pending` items are pending."""
+        if len(self) >= self.max_pending:
+            self.flush()
+
+    def flush(self):
+        """Write every pending item, raising the error of a failed background flush first."""
+        self.raise_error()
+        self._flush_pending()
+
+    def _flush_pending(self):
+        with self.lock:
+            batch = {kind: {item: state[1] for item, state in items.items()}
+                     for kind, items in self._pending.items() if items}
+            if not batch:
+                return
+            self.discard()
+            self._write(batch)
+
+    def discard(self):
+        """Drop every pending item without writing it."""
+        with self.lock:
+            for items in self._pending.values():
+                items.clear()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval):
+            try:
+                self._flush_pending()
+            except Exception as error:
+                # Kept for the next write or flush of the owner, which runs in a thread that can handle it.
+                with self.lock:
+                    self._error = error
+
+    def close(self):
+        """Stop the background thread and flush what is still pending."""
+        self._closed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.flush()
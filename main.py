@@ -1,14 +1,50 @@
+import logging
 import os
 
-from database import Database
-from database.KuzuDatabase import KuzuDatabase
-from database.Neo4jDatabase import Neo4jDatabase
-from utils import parse_number, parse_and_validate_edges, parse_and_validate_hyper_edges, parse_and_validate_nodes
-from graph_data.GraphStorage import GraphStorage
-from dotenv import load_dotenv
+from database.registry import create_database
+from utils import parse_number, parse_choice, parse_and_validate_edges, parse_and_validate_hyper_edges, parse_and_validate_nodes
+from utils.environment import load_environment
+from graph_data.GraphStorage import GraphStorage, EXPORT_FORMATS
+from graph_data.WriteBuffer import WriteBehindError
 
 # Load environment variables from the .env file
-load_dotenv()
+load_environment()
+
+
+def create_graph_storage() -> GraphStorage:
+    """Open the DATABASE_PROVIDER database and set up storage on it with the options enabled in the environment."""
+    # Only the backend named by DATABASE_PROVIDER, and so only its driver, is imported.
+    storage = GraphStorage(create_database())
+    if os.getenv("WRITE_BEHIND", "false").lower() == "true":
+        storage.enable_write_behind()
+    if os.getenv("METRICS", "false").lower() == "true":
+        # Slow queries are logged as warnings.
+        logging.basicConfig(format="%(asctime)s %(name)s: %(message)s")
+        storage.enable_metrics(slow_query_threshold=float(os.getenv("SLOW_QUERY_THRESHOLD", "1.0")))
+    if os.getenv("WARM_UP", "false").lower() == "true":
+        storage.warm_up()
+    return storage
+
+
+def close_graph_storage(storage: GraphStorage):
+    """Stop the warm-up and drain the write-behind buffer before the connections go away."""
+    try:
+        storage.close()
+    finally:
+        storage.db.end_session()
+
+
+def print_statistics(storage: GraphStorage):
+    """Print the recorded statistics, slowest in total first, and the gauges."""
+    stats = storage.stats()
+    if storage.metrics is None:
+        print("Metrics are disabled; set METRICS=true in .env to record them.")
+    for section in ("operations", "queries"):
+        for name, statistics in sorted(stats[section].items(), key=lambda item: -item[1]["total_ms"]):
+            print(f"{statistics['count']:>8} x {statistics['p50_ms']:9.3f}ms p50 {statistics['p99_ms']:9.3f}ms p99 "
+                  f"{statistics['errors']:>4} errors  {name[:100]}")
+    for name, value in stats["gauges"].items():
+        print(f"{name}: {value}")
 
 
 def modify_graph_gui():
@@ -17,45 +53,41 @@ def modify_graph_gui():
     def add_nodes():
         node_names = input("Enter node name(s) separated by semi-colon: ")
         valid_node_names = parse_and_validate_nodes(node_names)
-        for node_name in valid_node_names:
-            graph_storage.add_node(node_name)
+        graph_storage.add_nodes(valid_node_names)
         print("Node(s) added successfully.")
 
     def delete_nodes():
         node_names = input("Enter node name(s) to delete separated by semi-colon: ")
         valid_node_names = parse_and_validate_nodes(node_names)
-        for node_name in valid_node_names:
-            graph_storage.delete_node(node_name)
+        graph_storage.delete_nodes(valid_node_names)
         print("Node(s) deleted successfully.")
 
     def add_edges():
         edges_input = input("Enter edge(s) in format (relationship_name,start_node,end_node) separated by semi-colon: ")
         edges = parse_and_validate_edges(edges_input)
-        for relationship_name, start_node_name, end_node_name in edges:
-            graph_storage.add_edge(start_node_name.strip(), end_node_name.strip(), relationship_name.strip())
+        graph_storage.add_edges((start_node_name.strip(), end_node_name.strip(), relationship_name.strip())
+                                for relationship_name, start_node_name, end_node_name in edges)
         print("Edges added successfully.")
 
     def delete_edges():
         edges_input = input(
             "Enter edge(s) to delete in format (relationship_name,start_node,end_node) separated by semi-colon: ")
         edges = parse_and_validate_edges(edges_input)
-        for relationship_name, start_node_name, end_node_name in edges:
-            graph_storage.delete_edge(start_node_name.strip(), end_node_name.strip(), relationship_name.strip())
+        graph_storage.delete_edges((start_node_name.strip(), end_node_name.strip(), relationship_name.strip())
+                                   for relationship_name, start_node_name, end_node_name in edges)
         print("Edges deleted successfully.")
 
     def add_hyper_edges():
         hyper_edges_input = input("Enter hyper edge(s) in format (node_1,node_2,...,node_n) separated by semi-colon: ")
         hyper_edges = parse_and_validate_hyper_edges(hyper_edges_input)
-        for hyper_edge in hyper_edges:
-            graph_storage.add_hyper_edge(hyper_edge)
+        graph_storage.add_hyper_edges(hyper_edges)
         print("Hyper edges added successfully.")
 
     def delete_hyper_edges():
         hyper_edges_input = input(
             "Enter hyper edge(s) to delete in format (node_1,node_2,...,node_n) separated by semi-colon: ")
         hyper_edges = parse_and_validate_hyper_edges(hyper_edges_input)
-        for hyper_edge in hyper_edges:
-            graph_storage.delete_hyper_edge(hyper_edge)
+        graph_storage.delete_hyper_edges(hyper_edges)
         print("Hyper edges deleted successfully.")
 
     options = {
@@ -92,24 +124,64 @@ def gui():
         graph_storage.clear_graph()
         print("Graph cleared successfully.")
 
+    def parse_format():
+        return parse_choice("Enter file format (csv/parquet) [csv]: ", EXPORT_FORMATS, "csv")
+
     def import_graph():
-        graph_storage.import_graph()
+        graph_storage.import_graph(format=parse_format())
         print("Graph imported successfully.")
+        for phase, seconds in graph_storage.import_timings.items():
+            print(f"  {phase}: {seconds:.3f}s")
 
     def export_graph():
-        graph_storage.export_graph()
+        graph_storage.export_graph(format=parse_format())
         print("Graph exported successfully.")
+        for phase, seconds in graph_storage.export_timings.items():
+            print(f"  {phase}: {seconds:.3f}s")
+
+    def export_delta():
+        delta = graph_storage.export_delta(format=parse_format())
+        print(f"Delta with {delta.size} changes exported successfully.")
+
+    def apply_delta():
+        delta = graph_storage.apply_delta()
+        print(f"Delta with {delta.size} changes applied successfully.")
+        for phase, seconds in graph_storage.import_timings.items():
+            print(f"  {phase}: {seconds:.3f}s")
+
+    def show_statistics():
+        print_statistics(graph_storage)
 
     def display_higher_order_graph():
         print(graph_storage)
 
+    def generate_graph():
+        from utils.generator import generate_heterogeneous_graph
+
+        if parse_choice("The generated graph replaces the current one. Continue? (y/n) [n]: ", ("y", "n"), "n") != "y":
+            print("Graph generation cancelled.")
+            return
+        graph = generate_heterogeneous_graph(
+            num_nodes=parse_number("Enter number of nodes: "),
+            num_edges=parse_number("Enter number of edges: "),
+            num_hyper_edges=parse_number("Enter number of hyper edges: "),
+            seed=parse_number("Enter random seed: "))
+        graph_storage.load_generated_graph(graph, format=parse_format())
+        print(f"Generated graph with {graph.node_count} nodes, {len(graph.edge_starts)} edges "
+              f"and {len(graph.hyper_edge_type_ids)} hyper edges.")
+        for phase, seconds in graph_storage.import_timings.items():
+            print(f"  {phase}: {seconds:.3f}s")
+
     options = {
         1: import_graph,
         2: lambda: modify_graph_gui(),
         3: export_graph,
         4: clear_graph,
         5: display_higher_order_graph,
-        6: lambda: None,
+        6: generate_graph,
+        7: export_delta,
+        8: apply_delta,
+        9: show_statistics,
     }
 
     while True:
@@ -120,24 +192,25 @@ def gui():
               "4 - Clear Graph\n"
               "5 - Display Higher-Order Graph (Only for Kuzu)\n"
               "6 - Generate Heterogeneous Graph\n"
-              "7 - Exit")
+              "7 - Export Delta\n"
+              "8 - Apply Delta\n"
+              "9 - Show Statistics\n"
+              "10 - Exit")
         choice = parse_number("Enter a number: ")
         print()
-        if choice == 7:
+        if choice == 10:
             break
         option_function = options.get(choice)
         if option_function:
-            option_function()
+            try:
+                option_function()
+            except WriteBehindError as error:
+                print(f"{error} The in-memory graph was reverted to match the database.")
 
 
 if __name__ == "__main__":
-    db: Database
-    if os.getenv("DATABASE_PROVIDER") == "NEO4J":
-        db = Neo4jDatabase()
-    elif os.getenv("DATABASE_PROVIDER") == "KUZU":
-        db = KuzuDatabase()
-    graph_storage = GraphStorage(db)
+    graph_storage = create_graph_storage()
     try:
         gui()
     finally:
-        db.end_session()
+        close_graph_storage(graph_storage)
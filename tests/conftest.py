@@ -0,0 +1,39 @@
+import os
+import sys
+
+import pytest
+
+# The packages live at the repository root, which is not a package itself.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.KuzuDatabase import KuzuDatabase
+from graph_data.GraphStorage import GraphStorage
+
+
+@pytest.fixture
+def kuzu_db(tmp_path, monkeypatch):
+    """A KuzuDatabase of its own, in a temporary working directory that also receives the exported files."""
+    monkeypatch.chdir(tmp_path)
+    return KuzuDatabase()
+
+
+@pytest.fixture
+def storage(kuzu_db):
+    """A GraphStorage on a fresh Kuzu database."""
+    storage = GraphStorage(kuzu_db)
+    yield storage
+    storage.close()
+
+
+def _count(storage: GraphStorage, query: str) -> int:
+    return next(storage.query(query)).column(0)[0].as_py()
+
+
+def node_count(storage: GraphStorage) -> int:
+    """Return the number of nodes stored in the database."""
+    return _count(storage, "MATCH (n:GNode) RETURN count(n) AS count")
+
+
+def edge_count(storage: GraphStorage) -> int:
+    """Return the number of edges stored in the database, leaving out the Member edges of hyper edges."""
+    return _count(storage, "MATCH (:GNode)-[r]->() RETURN count(r) AS count")
@@ -0,0 +1,114 @@
+import asyncio
+
+import pytest
+
+from benchmarks.StandInNeo4jDriver import StandInNeo4jDriver
+from database.Neo4jDatabase import Neo4jDatabase
+from graph_data.AsyncGraphStorage import AsyncGraphStorage
+
+
+class RecordingResult:
+    async def consume(self):
+        pass
+
+    async def data(self) -> list:
+        return []
+
+
+class RecordingAsyncDriver:
+    """Asynchronous driver stand-in recording the statements of every write and how many were in flight at once."""
+
+    def __init__(self, delay: float = 0.01, fail_on: str = None):
+        self.statements = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.transactions = 0
+        self.delay = delay
+        self.fail_on = fail_on
+
+    def session(self, **config):
+        return RecordingSession(self)
+
+    async def close(self):
+        pass
+
+
+class RecordingSession:
+    def __init__(self, driver: RecordingAsyncDriver):
+        self._driver = driver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        pass
+
+    async def run(self, query: str, parameters=None, **kwargs) -> RecordingResult:
+        if self._driver.fail_on is not None and self._driver.fail_on in str(parameters):
+            raise RuntimeError("write failed")
+        self._driver.statements.append((query, parameters))
+        return RecordingResult()
+
+    async def execute_write(self, work):
+        driver = self._driver
+        driver.transactions += 1
+        driver.in_flight += 1
+        driver.max_in_flight = max(driver.max_in_flight, driver.in_flight)
+        try:
+            await asyncio.sleep(driver.delay)
+            return await work(self)
+        finally:
+            driver.in_flight -= 1
+
+    execute_read = execute_write
+
+
+@pytest.fixture
+def neo4j_db(monkeypatch):
+    monkeypatch.setenv("DATABASE_PROVIDER", "NEO4J")
+    return Neo4jDatabase(driver=StandInNeo4jDriver())
+
+
+def test_bulk_writes_keep_at_most_max_concurrency_chunks_in_flight(neo4j_db):
+    driver = RecordingAsyncDriver()
+
+    async def run():
+        async with AsyncGraphStorage(neo4j_db, max_concurrency=2, driver=driver) as storage:
+            await storage.add_nodes((f"n{index}" for index in range(10)), batch_size=2)
+            return len(storage.nodes)
+
+    assert asyncio.run(run()) == 10
+    assert driver.transactions == 5
+    assert driver.max_in_flight == 2
+
+
+def test_failed_chunk_stops_later_chunks(neo4j_db):
+    driver = RecordingAsyncDriver(fail_on="n2")
+
+    async def run():
+        async with AsyncGraphStorage(neo4j_db, max_concurrency=1, driver=driver) as storage:
+            with pytest.raises(RuntimeError):
+                await storage.add_nodes((f"n{index}" for index in range(10)), batch_size=2)
+            return {node.name for node in storage.nodes}
+
+    assert asyncio.run(run()) == {"n0", "n1"}
+    assert driver.transactions == 2
+
+
+def test_deleting_nodes_detach_deletes_their_hyper_edges(neo4j_db):
+    driver = RecordingAsyncDriver()
+
+    async def run():
+        async with AsyncGraphStorage(neo4j_db, driver=driver) as storage:
+            await storage.delete_nodes(["a"])
+
+    asyncio.run(run())
+    (query, parameters), = driver.statements
+    assert "DETACH DELETE h, n" in query
+    assert parameters == {"rows": [{"name": "a"}]}
+
+
+def test_unknown_provider_is_rejected(neo4j_db, monkeypatch):
+    monkeypatch.setenv("DATABASE_PROVIDER", "MEMGRAPH")
+    with pytest.raises(ValueError, match="MEMGRAPH"):
+        AsyncGraphStorage(neo4j_db, driver=RecordingAsyncDriver())
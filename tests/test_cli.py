@@ -0,0 +1,18 @@
+import argparse
+
+import cli
+
+
+def load_args(kind: str, path, **options) -> argparse.Namespace:
+    return argparse.Namespace(kind=kind, file=str(path), batch_size=2, type="CONNECTED", quiet=True, **options)
+
+
+def test_reloading_an_edge_file_adds_nothing(storage, tmp_path, capsys):
+    path = tmp_path / "edges.txt"
+    path.write_text("(KNOWS,a,b);(LIKES,a,c)\n(b,c)\n", encoding="utf-8")
+
+    cli.load(storage, load_args("edges", path))
+    assert "the database now holds 3 more" in capsys.readouterr().out
+    cli.load(storage, load_args("edges", path))
+    assert "the database now holds 0 more" in capsys.readouterr().out
+    assert cli.count_stored(storage, "edges") == 3
@@ -0,0 +1,28 @@
+from graph_data.GraphMirror import GraphMirror
+
+
+def test_remove_node_removes_its_edges():
+    mirror = GraphMirror()
+    for name in ("a", "b", "c"):
+        mirror.add_node(name)
+    mirror.add_edge("a", "b", "KNOWS")
+    mirror.add_edge("a", "c", "LIKES")
+    mirror.add_edge("c", "b", "KNOWS")
+    mirror.add_edge("c", "c", "SELF")
+    generation = mirror.generation
+
+    assert mirror.remove_node("c")
+    assert mirror.generation > generation
+    assert list(mirror.edges()) == [("a", "b", "KNOWS")]
+    assert mirror.edge_count == 1
+    assert mirror.neighbors("b", "in") == ["a"]
+
+
+def test_remove_node_removes_the_edges_of_a_node_known_only_from_them():
+    mirror = GraphMirror()
+    mirror.add_edge("a", "b", "KNOWS")
+    mirror.add_edge("a", "c", "LIKES")
+
+    assert not mirror.remove_node("c")
+    assert not mirror.has_edge("a", "c", "LIKES")
+    assert mirror.out_degree("a") == 1
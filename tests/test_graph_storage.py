@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from conftest import node_count
+from graph_data.AsyncGraphStorage import AsyncGraphStorage
+from graph_data.Edge import Edge
+from graph_data.GraphStorage import GraphStorage
+from graph_data.HyperEdge import HyperEdge
+
+EDGES = [("a", "b", "KNOWS"), ("a", "c", "LIKES")]
+
+MEMBERS = frozenset({"a", "b", "c"})
+
+
+def reads(storage: GraphStorage) -> dict:
+    """Answer the cached reads that depend on the edges around the nodes a, b and c."""
+    return {
+        "neighbors": {name: storage.neighbors(name, direction="both") for name in "abc"},
+        "degree": {name: storage.degree(name, direction="both") for name in "abc"},
+        "k_hop": storage.k_hop("a", 2),
+        "edge_exists": [storage.edge_exists(*edge) for edge in EDGES],
+        "hyperedges_of": {name: storage.hyperedges_of(name) for name in "abc"},
+    }
+
+
+def assert_matches_database(storage: GraphStorage):
+    """Check that the reads of a storage agree with those of a fresh one loading the same database."""
+    assert reads(storage) == reads(GraphStorage(storage.db))
+
+
+@pytest.mark.parametrize("delete", [
+    lambda storage: storage.delete_node("c"),
+    lambda storage: storage.delete_nodes(["c"]),
+])
+def test_deleting_a_node_deletes_its_edges(storage, delete):
+    storage.add_edges(EDGES)
+    # Cache the reads before the deletion.
+    reads(storage)
+    delete(storage)
+
+    assert storage.neighbors("a") == ("b",)
+    assert storage.degree("a") == 1
+    assert not storage.edge_exists("a", "c", "LIKES")
+    assert "c" not in storage.k_hop("a", 2)
+    assert_matches_database(storage)
+    assert storage.changes.delta().changes["edges"][Edge("a", "c", "LIKES")] is False
+
+
+def test_rolled_back_node_deletion_restores_its_edges(storage):
+    storage.add_edges(EDGES)
+    # Load the nodes first, so that only the journal can bring the edges back into the mirror.
+    reads(storage)
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.delete_node("c")
+            raise RuntimeError("roll back")
+
+    assert storage.edge_exists("a", "c", "LIKES")
+    assert storage.degree("a") == 2
+    assert_matches_database(storage)
+
+
+def test_buffered_node_deletion_drops_buffered_edges_to_it(storage):
+    storage.add_edges(EDGES[:1])
+    storage.enable_write_behind(flush_interval=None)
+    storage.add_edge("a", "c", "LIKES")
+    storage.delete_node("c")
+    storage.flush()
+
+    assert not storage.edge_exists("a", "c", "LIKES")
+    assert_matches_database(storage)
+
+
+def test_async_node_deletion_deletes_its_edges(kuzu_db):
+    async def run():
+        storage = AsyncGraphStorage(kuzu_db)
+        try:
+            await storage.add_edges(EDGES)
+            await storage.delete_nodes(["c"])
+            assert await storage.neighbors("a") == ("b",)
+            assert await storage.degree("a") == 1
+            assert_matches_database(storage.storage)
+        finally:
+            await storage.close()
+
+    asyncio.run(run())
+
+
+def test_deleting_a_member_deletes_its_hyper_edges(storage):
+    storage.add_hyper_edge(MEMBERS)
+    storage.add_hyper_edge(frozenset({"a", "b"}))
+    reads(storage)
+    storage.delete_node("c")
+
+    assert storage.hyperedges_of("a") == frozenset({HyperEdge(frozenset({"a", "b"}), "CONNECTED")})
+    assert storage.find_hyper_edges() == {HyperEdge(frozenset({"a", "b"}), "CONNECTED")}
+    assert_matches_database(storage)
+    assert storage.changes.delta().changes["hyper_edges"][HyperEdge(MEMBERS, "CONNECTED")] is False
+
+    # The remaining hyper edge keeps the id of its members, so it can still be deleted by them once re-imported.
+    storage.export_graph()
+    storage.clear_graph()
+    storage.import_graph()
+    storage.delete_hyper_edge(frozenset({"a", "b"}))
+    assert storage.find_hyper_edges() == set()
+    assert_matches_database(storage)
+
+
+def test_rolled_back_member_deletion_restores_its_hyper_edges(storage):
+    storage.add_hyper_edge(MEMBERS)
+    reads(storage)
+    with pytest.raises(RuntimeError):
+        with storage.transaction():
+            storage.delete_nodes(["c"])
+            raise RuntimeError("roll back")
+
+    assert storage.hyperedges_of("a") == frozenset({HyperEdge(MEMBERS, "CONNECTED")})
+    assert_matches_database(storage)
+
+
+def test_buffered_member_deletion_drops_buffered_hyper_edges(storage):
+    storage.enable_write_behind(flush_interval=None)
+    storage.add_hyper_edge(MEMBERS)
+    storage.delete_node("c")
+    storage.flush()
+
+    assert storage.hyperedges_of("a") == frozenset()
+    assert storage.find_hyper_edges() == set()
+    assert_matches_database(storage)
+
+
+def test_clearing_keeps_the_database_usable(storage):
+    storage.add_edges(EDGES)
+    storage.add_hyper_edge(MEMBERS)
+    storage.clear_graph()
+    assert_matches_database(storage)
+    assert storage.find_hyper_edges() == set()
+
+    # The rel tables of the relationship types are created again on their first write.
+    storage.add_edges(EDGES)
+    storage.add_hyper_edge(MEMBERS)
+    assert storage.neighbors("a") == ("b", "c")
+    assert_matches_database(storage)
+
+
+def test_loading_a_generated_graph_keeps_the_exports(storage, tmp_path, monkeypatch):
+    from utils.generator import generate_heterogeneous_graph
+    monkeypatch.setenv("DATABASE_PROVIDER", "KUZU")
+    storage.add_edges(EDGES)
+    storage.export_graph()
+    exported = {path.name: path.read_bytes() for path in (tmp_path / "exported").iterdir()}
+
+    graph = generate_heterogeneous_graph(num_nodes=100, num_edges=300, num_hyper_edges=10, seed=0)
+    storage.load_generated_graph(graph)
+
+    assert {path.name: path.read_bytes() for path in (tmp_path / "exported").iterdir()} == exported
+    assert len(storage.nodes) == graph.node_count
+    assert node_count(storage) == graph.node_count
@@ -0,0 +1,21 @@
+from conftest import edge_count
+
+EDGES = [("a", "b", "KNOWS"), ("a", "c", "LIKES"), ("b", "c", "KNOWS")]
+
+
+def test_add_edges_twice_stores_each_edge_once(storage):
+    storage.add_edges(EDGES)
+    storage.add_edges(EDGES)
+    assert edge_count(storage) == 3
+
+
+def test_add_edges_with_duplicate_rows_stores_each_edge_once(storage):
+    storage.add_edges(EDGES + EDGES)
+    assert edge_count(storage) == 3
+
+
+def test_add_edge_twice_stores_the_edge_once(storage):
+    storage.add_edge("a", "b", "KNOWS")
+    storage.add_edge("a", "b", "KNOWS")
+    storage.add_edges([("a", "b", "KNOWS")])
+    assert edge_count(storage) == 1
@@ -0,0 +1,28 @@
+from conftest import edge_count
+from graph_data.GraphStorage import GraphStorage
+
+EDGES = [("a", "b", "KNOWS"), ("a", "c", "LIKES"), ("b", "c", "KNOWS")]
+
+
+def test_flushing_re_added_edges_keeps_the_edge_count(storage):
+    storage.add_edges(EDGES)
+    # A fresh storage has not loaded these edges, so its buffer writes them again whatever they are.
+    fresh = GraphStorage(storage.db)
+    fresh.enable_write_behind(flush_interval=None)
+    try:
+        fresh.add_edges(EDGES)
+        fresh.add_edge(*EDGES[0])
+        fresh.flush()
+        assert edge_count(fresh) == 3
+    finally:
+        fresh.close()
+
+
+def test_flushing_re_added_loaded_edges_writes_nothing(storage):
+    storage.add_edges(EDGES)
+    storage.enable_write_behind(flush_interval=None)
+    storage.warm_up(background=False)
+    storage.add_edges(EDGES)
+    assert storage.stats()["gauges"]["write_behind_pending"] == 0
+    storage.flush()
+    assert edge_count(storage) == 3
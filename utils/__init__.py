@@ -1 +1,15 @@
-from .parsers import parse_number, parse_and_validate_edges, parse_and_validate_hyper_edges, parse_and_validate_nodes
\ No newline at end of file
+from .parsers import parse_number, parse_choice, parse_and_validate_edges, parse_and_validate_hyper_edges, parse_and_validate_nodes
+from .parsers import stream_nodes, stream_edges, stream_hyper_edges
+from .batching import chunked, DEFAULT_BATCH_SIZE
+from .progress import ProgressCallback, ThroughputMeter
+from .metrics import Metrics, MetricsExporter, Tracer
+
+# The generator needs pyarrow, so its names are imported from it on first access.
+_GENERATOR_NAMES = ("generate_heterogeneous_graph", "write_bulk_files", "GeneratedGraph")
+
+
+def __getattr__(name):
+    if name in _GENERATOR_NAMES:
+        from . import generator
+        return getattr(generator, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
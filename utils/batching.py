@@ -0,0 +1,19 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar("T")
+
+# Number of rows sent to the database in a single bulk statement.
+DEFAULT_BATCH_SIZE = 10_000
+
+
+def chunked(iterable: Iterable[T], size: int = DEFAULT_BATCH_SIZE) -> Iterator[List[T]]:
+    """Yield successive lists of at most `size` items from an iterable without materializing it."""
+    if size < 1:
+        raise ValueError("Batch size must be a positive number!")
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
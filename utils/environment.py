@@ -0,0 +1,16 @@
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_environment():
+    """Load environment variables from the .env file, once per process; variables already set are kept."""
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _loaded = True
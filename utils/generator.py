@@ -0,0 +1,263 @@
+import os
+from contextlib import contextmanager
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from graph_data.HyperEdge import HyperEdge
+
+DEFAULT_LABELS = ("Person", "Company", "City", "Product")
+
+# (relationship_type, start_label, end_label) of the generated edges.
+DEFAULT_EDGE_TYPES = (
+    ("KNOWS", "Person", "Person"),
+    ("WORKS_AT", "Person", "Company"),
+    ("LOCATED_IN", "Company", "City"),
+    ("BOUGHT", "Person", "Product"),
+)
+
+# Distributions of the number of members beyond two of a generated hyper edge.
+HYPER_EDGE_SIZE_DISTRIBUTIONS = ("geometric", "poisson", "zipf")
+
+# Rows written per chunk to the bulk-load files.
+WRITE_CHUNK_SIZE = 1_000_000
+
+
+class GeneratedGraph(NamedTuple):
+    """
+    A generated graph held in NumPy arrays.
+    Nodes are numbered per label: the nodes of `labels[i]` are `label_offsets[i]` to `label_offsets[i + 1] - 1`
+    and are named `<label>_<number within the label>`. The members of hyper edge `i` are
+    `hyper_edge_members[hyper_edge_indptr[i]:hyper_edge_indptr[i + 1]]`.
+    """
+    labels: List[str]
+    label_offsets: np.ndarray
+    edge_types: List[str]
+    edge_starts: np.ndarray
+    edge_ends: np.ndarray
+    edge_type_ids: np.ndarray
+    hyper_edge_types: List[str]
+    hyper_edge_type_ids: np.ndarray
+    hyper_edge_indptr: np.ndarray
+    hyper_edge_members: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return int(self.label_offsets[-1])
+
+    def node_labels(self, node_ids: np.ndarray) -> np.ndarray:
+        """Return the label index of each node id."""
+        return np.searchsorted(self.label_offsets, node_ids, side="right") - 1
+
+    def node_names(self, node_ids: np.ndarray) -> np.ndarray:
+        """Return the names of the given node ids as an array of strings."""
+        label_ids = self.node_labels(node_ids)
+        prefixes = np.array([f"{label}_" for label in self.labels])[label_ids]
+        return np.char.add(prefixes, (node_ids - self.label_offsets[label_ids]).astype(str))
+
+
+def _power_law_sample(rng: np.random.Generator, count: int, size: int, exponent: float) -> np.ndarray:
+    """
+    Draw `size` node indexes below `count` so that their frequencies follow a power law with `exponent`.
+    Weights decay with the Chung-Lu rank formula over a random permutation, so hubs are spread over the id range.
+    """
+    weights = np.arange(1, count + 1, dtype=np.float64) ** (-1.0 / (exponent - 1.0))
+    cumulative = np.cumsum(weights[rng.permutation(count)])
+    # Sorted draws make the binary searches cache friendly; shuffling the result restores independent samples.
+    draws = np.sort(rng.random(size)) * cumulative[-1]
+    return rng.permutation(np.searchsorted(cumulative, draws, side="right"))
+
+
+def _unique(values: np.ndarray) -> np.ndarray:
+    """Return the sorted distinct values, by sorting in place, which beats the hash-based `np.unique` here."""
+    values.sort()
+    return values[np.concatenate([[True], values[1:] != values[:-1]])] if len(values) else values
+
+
+def _hyper_edge_sizes(rng: np.random.Generator, count: int, distribution: str, mean_size: float,
+                      max_size: int, exponent: float) -> np.ndarray:
+    """Draw hyper edge sizes of at least two members from the named distribution."""
+    if distribution == "geometric":
+        extra = rng.geometric(1.0 / max(mean_size - 1.0, 1.0), size=count) - 1
+    elif distribution == "poisson":
+        extra = rng.poisson(max(mean_size - 2.0, 0.0), size=count)
+    elif distribution == "zipf":
+        extra = rng.zipf(exponent, size=count) - 1
+    else:
+        raise ValueError(f"Unknown hyper edge size distribution {distribution!r}, "
+                         f"expected one of {', '.join(HYPER_EDGE_SIZE_DISTRIBUTIONS)}")
+    return np.minimum(extra + 2, max_size)
+
+
+def generate_heterogeneous_graph(num_nodes: int, num_edges: int, num_hyper_edges: int = 0,
+                                 labels: Sequence[str] = DEFAULT_LABELS,
+                                 edge_types: Sequence[Tuple[str, str, str]] = DEFAULT_EDGE_TYPES,
+                                 exponent: float = 2.5, hyper_edge_types: Sequence[str] = ("CONNECTED",),
+                                 hyper_edge_size_distribution: str = "geometric", mean_hyper_edge_size: float = 4.0,
+                                 max_hyper_edge_size: int = 64, seed: Optional[int] = None) -> GeneratedGraph:
+    """
+    Generate a reproducible heterogeneous graph.
+    Nodes are split evenly over `labels` and edges evenly over `edge_types`; the end points of each edge type
+    are drawn with power-law degree distributions of `exponent`. Self-loops and duplicate edges are dropped,
+    so slightly fewer than `num_edges` edges may be returned. Hyper edge sizes follow
+    `hyper_edge_size_distribution` and their members are drawn with the same power law over all nodes.
+    """
+    if num_nodes < 1:
+        raise ValueError("A generated graph needs at least one node")
+    # Power-law weights use 1 / (exponent - 1) and Zipf sizes need an exponent above 1.
+    if not exponent > 1:
+        raise ValueError(f"The power-law exponent must be greater than 1, got {exponent}!")
+    rng = np.random.default_rng(seed)
+    labels = list(labels)
+    label_offsets = np.linspace(0, num_nodes, len(labels) + 1).astype(np.int64)
+    label_index = {label: i for i, label in enumerate(labels)}
+
+    starts, ends, type_ids = [], [], []
+    edge_counts = np.diff(np.linspace(0, num_edges, len(edge_types) + 1).astype(np.int64))
+    for type_id, ((_, start_label, end_label), count) in enumerate(zip(edge_types, edge_counts)):
+        start_offset, start_end = label_offsets[label_index[start_label]:label_index[start_label] + 2]
+        end_offset, end_end = label_offsets[label_index[end_label]:label_index[end_label] + 2]
+        if count == 0 or start_end == start_offset or end_end == end_offset:
+            continue
+        type_starts = start_offset + _power_law_sample(rng, start_end - start_offset, count, exponent)
+        type_ends = end_offset + _power_law_sample(rng, end_end - end_offset, count, exponent)
+        pairs = _unique(type_starts * num_nodes + type_ends)
+        pairs = pairs[pairs // num_nodes != pairs % num_nodes]
+        starts.append(pairs // num_nodes)
+        ends.append(pairs % num_nodes)
+        type_ids.append(np.full(len(pairs), type_id, dtype=np.int16))
+
+    sizes = _hyper_edge_sizes(rng, num_hyper_edges, hyper_edge_size_distribution, mean_hyper_edge_size,
+                              min(max_hyper_edge_size, max(num_nodes, 2)), exponent)
+    owners = np.repeat(np.arange(num_hyper_edges, dtype=np.int64), sizes)
+    memberships = _unique(owners * num_nodes + _power_law_sample(rng, num_nodes, len(owners), exponent))
+    owners, members = np.divmod(memberships, num_nodes)
+    # Duplicate draws shrink some hyper edges; those left with a single member are dropped.
+    member_counts = np.bincount(owners, minlength=num_hyper_edges)
+    kept = member_counts >= 2
+    members = members[kept[owners]]
+    hyper_edge_indptr = np.concatenate([[0], np.cumsum(member_counts[kept])])
+
+    def concatenate(arrays, dtype):
+        return np.concatenate(arrays) if arrays else np.empty(0, dtype=dtype)
+
+    return GeneratedGraph(
+        labels=labels,
+        label_offsets=label_offsets,
+        edge_types=[relationship_type for relationship_type, _, _ in edge_types],
+        edge_starts=concatenate(starts, np.int64),
+        edge_ends=concatenate(ends, np.int64),
+        edge_type_ids=concatenate(type_ids, np.int16),
+        hyper_edge_types=list(hyper_edge_types),
+        hyper_edge_type_ids=rng.integers(0, len(hyper_edge_types), size=int(kept.sum()), dtype=np.int16),
+        hyper_edge_indptr=hyper_edge_indptr,
+        hyper_edge_members=members,
+    )
+
+
+@contextmanager
+def _open_table_writer(file_path: str, format: str):
+    """
+    Yield a function appending pyarrow tables to a pipe-delimited CSV or a Parquet file.
+    Generated names never contain the delimiter, quotes or line breaks, so CSV values are written unquoted.
+    """
+    writer = None
+    file = open(file_path, "wb") if format == "csv" else None
+
+    def write(table: pa.Table):
+        nonlocal writer
+        if writer is None and format == "csv":
+            file.write(("|".join(table.column_names) + "\n").encode("utf-8"))
+            options = pa_csv.WriteOptions(include_header=False, delimiter="|", quoting_style="none")
+            writer = pa_csv.CSVWriter(file, table.schema, write_options=options)
+        elif writer is None:
+            writer = pq.ParquetWriter(file_path, table.schema)
+        writer.write_table(table)
+
+    try:
+        yield write
+    finally:
+        if writer is not None:
+            writer.close()
+        if file is not None:
+            file.close()
+
+
+def _node_table(names: np.ndarray, labels: np.ndarray, provider: str, format: str) -> pa.Table:
+    """Build a chunk of the nodes file in the layout exported by `provider`."""
+    if provider == "KUZU":
+        return pa.table({"name": names})
+    if format == "csv":
+        return pa.table({
+            "labels": np.char.add(np.char.add("['GNode', '", labels), "']"),
+            "properties": np.char.add(np.char.add("{'name': '", names), "'}"),
+        })
+    values = np.empty(2 * len(labels), dtype=object)
+    values[0::2] = "GNode"
+    values[1::2] = labels
+    offsets = pa.array(np.arange(0, len(values) + 1, 2, dtype=np.int32))
+    return pa.table({
+        "labels": pa.ListArray.from_arrays(offsets, pa.array(values, pa.string())),
+        "properties": pa.StructArray.from_arrays([pa.array(names, pa.string())], ["name"]),
+    })
+
+
+def _edge_table(start_names: np.ndarray, end_names: np.ndarray, types: np.ndarray, provider: str,
+                format: str) -> pa.Table:
+    """Build a chunk of the edges file in the layout exported by `provider`."""
+    columns = {"start_name": start_names, "end_name": end_names, "type": types}
+    # Kuzu edges have no properties, as every relationship type is a rel table of its own.
+    if provider != "KUZU" and format == "csv":
+        columns["properties"] = np.full(len(types), "{}")
+    return pa.table(columns)
+
+
+def write_bulk_files(graph: GeneratedGraph, directory: str = "exported", provider: Optional[str] = None,
+                     format: str = "csv", chunk_size: int = WRITE_CHUNK_SIZE):
+    """
+    Write a generated graph as the node, edge and hyper edge files `GraphStorage.import_graph` loads,
+    in the layout the `provider` backend exports (DATABASE_PROVIDER by default). Files are written chunk by chunk.
+    """
+    provider = provider or os.getenv("DATABASE_PROVIDER")
+    os.makedirs(directory, exist_ok=True)
+    labels = np.array(graph.labels)
+    edge_types = np.array(graph.edge_types)
+    hyper_edge_types = np.array(graph.hyper_edge_types)
+
+    with _open_table_writer(os.path.join(directory, f"nodes.{format}"), format) as write:
+        for offset in range(0, graph.node_count, chunk_size):
+            node_ids = np.arange(offset, min(offset + chunk_size, graph.node_count))
+            write(_node_table(graph.node_names(node_ids), labels[graph.node_labels(node_ids)], provider, format))
+
+    with _open_table_writer(os.path.join(directory, f"edges.{format}"), format) as write:
+        for offset in range(0, max(len(graph.edge_starts), 1), chunk_size):
+            chunk = slice(offset, offset + chunk_size)
+            write(_edge_table(graph.node_names(graph.edge_starts[chunk]), graph.node_names(graph.edge_ends[chunk]),
+                              edge_types[graph.edge_type_ids[chunk]], provider, format))
+
+    # Hyper edge ids hash the sorted member names, so they are built per hyper edge; equal hyper edges are skipped.
+    seen_ids = set()
+    with _open_table_writer(os.path.join(directory, f"hyper_edges.{format}"), format) as write_hyper_edges, \
+            _open_table_writer(os.path.join(directory, f"hyper_edge_members.{format}"), format) as write_members:
+        count = len(graph.hyper_edge_type_ids)
+        for offset in range(0, max(count, 1), chunk_size):
+            end = min(offset + chunk_size, count)
+            indptr = graph.hyper_edge_indptr[offset:end + 1]
+            names = graph.node_names(graph.hyper_edge_members[indptr[0]:indptr[-1]]).tolist() if end > offset else []
+            ids, types, member_ids, member_names = [], [], [], []
+            for i, relationship_type in enumerate(hyper_edge_types[graph.hyper_edge_type_ids[offset:end]].tolist()):
+                node_names = names[indptr[i] - indptr[0]:indptr[i + 1] - indptr[0]]
+                hyper_edge_id = HyperEdge(frozenset(node_names), relationship_type).id
+                if hyper_edge_id in seen_ids:
+                    continue
+                seen_ids.add(hyper_edge_id)
+                ids.append(hyper_edge_id)
+                types.append(relationship_type)
+                member_ids.extend([hyper_edge_id] * len(node_names))
+                member_names.extend(node_names)
+            write_hyper_edges(pa.table({"id": pa.array(ids, pa.string()),
+                                        "relationship_type": pa.array(types, pa.string())}))
+            write_members(pa.table({"hyper_edge_id": pa.array(member_ids, pa.string()),
+                                    "name": pa.array(member_names, pa.string())}))
@@ -0,0 +1,173 @@
+import bisect
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Callable, ContextManager, Dict, List, Optional
+
+# Upper bounds in seconds of the latency histogram buckets; the last bucket takes everything slower.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Queries taking at least this many seconds are written to the slow query log.
+DEFAULT_SLOW_QUERY_THRESHOLD = 1.0
+
+# Distinct query texts whose shape is remembered instead of normalized again.
+QUERY_SHAPE_CACHE_SIZE = 1024
+
+# Called with a `Metrics.snapshot` whenever metrics are exported.
+MetricsExporter = Callable[[Dict], None]
+
+# Called with the name of an operation and returning a context manager that spans it,
+# e.g. `tracer.start_as_current_span` of an OpenTelemetry tracer.
+Tracer = Callable[[str], ContextManager]
+
+slow_query_log = logging.getLogger("hogdb.slow_queries")
+
+
+@lru_cache(maxsize=QUERY_SHAPE_CACHE_SIZE)
+def query_shape(query: str) -> str:
+    """Return the query with string and number literals replaced by '?' and whitespace collapsed."""
+    query = re.sub(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"", "?", query)
+    query = re.sub(r"(?<![\w$])\d+(?:\.\d+)?", "?", query)
+    return " ".join(query.split())
+
+
+def operation_name(operation: Callable) -> str:
+    """Name an operation closure after the method defining it, e.g. 'GraphStorage.add_node'."""
+    name = getattr(operation, "__qualname__", None) or type(operation).__name__
+    return name.split(".<locals>")[0]
+
+
+class _Statistics:
+    __slots__ = ("count", "errors", "rows", "seconds", "max_seconds", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def percentile(self, fraction: float) -> float:
+        """Estimate a latency percentile in seconds as the upper bound of the bucket holding it."""
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max_seconds)
+        return self.max_seconds
+
+    def summary(self) -> Dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "rows": self.rows,
+            "total_ms": self.seconds * 1000,
+            "mean_ms": self.seconds / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max_seconds * 1000,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p95_ms": self.percentile(0.95) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "histogram": {"le_ms": [bound * 1000 for bound in LATENCY_BUCKETS] + [float("inf")],
+                          "counts": list(self.buckets)},
+        }
+
+
+class Metrics:
+    def __init__(self, slow_query_threshold: Optional[float] = DEFAULT_SLOW_QUERY_THRESHOLD,
+                 exporters: Optional[List[MetricsExporter]] = None, export_interval: Optional[float] = None):
+        """
+        Count, latency histogram, rows and errors per operation and per query shape.
+        Queries slower than `slow_query_threshold` seconds (None disables it) are logged to the
+        'hogdb.slow_queries' logger. Snapshots go to the `exporters` on `export` and, with an
+        `export_interval`, every that many seconds from a background thread.
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.exporters: List[MetricsExporter] = list(exporters or [])
+        self._lock = threading.Lock()
+        self._operations: Dict[str, _Statistics] = {}
+        self._queries: Dict[str, _Statistics] = {}
+        self._closed = threading.Event()
+        self._thread = None
+        if export_interval is not None:
+            self._thread = threading.Thread(target=self._export_periodically, args=(export_interval,),
+                                            name="metrics-export", daemon=True)
+            self._thread.start()
+
+    @staticmethod
+    def _record(table: Dict[str, _Statistics], key: str, seconds: float, rows: int, failed: bool):
+        statistics = table.get(key)
+        if statistics is None:
+            statistics = table[key] = _Statistics()
+        statistics.count += 1
+        statistics.errors += failed
+        statistics.rows += rows
+        statistics.seconds += seconds
+        if seconds > statistics.max_seconds:
+            statistics.max_seconds = seconds
+        statistics.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def record_operation(self, name: str, seconds: float, failed: bool = False):
+        """Record one run of a storage operation."""
+        with self._lock:
+            self._record(self._operations, name, seconds, 0, failed)
+
+    def record_query(self, query: str, seconds: float, rows: int = 0, failed: bool = False):
+        """Record one run of a database query under its shape, logging it if it was slow."""
+        shape = query_shape(query)
+        with self._lock:
+            self._record(self._queries, shape, seconds, rows, failed)
+        if self.slow_query_threshold is not None and seconds >= self.slow_query_threshold:
+            slow_query_log.warning("Slow query took %.3fs and returned %d rows%s: %s",
+                                   seconds, rows, " before failing" if failed else "", shape)
+
+    @contextmanager
+    def timed_operation(self, name: str):
+        """Record the duration of the scope as a run of an operation, failed if it raises."""
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            self.record_operation(name, time.perf_counter() - start, failed)
+
+    def snapshot(self) -> Dict:
+        """Return the statistics of every operation and query shape recorded so far."""
+        with self._lock:
+            return {
+                "operations": {name: statistics.summary() for name, statistics in self._operations.items()},
+                "queries": {shape: statistics.summary() for shape, statistics in self._queries.items()},
+            }
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._operations.clear()
+            self._queries.clear()
+
+    def export(self):
+        """Hand a snapshot to every exporter."""
+        if self.exporters:
+            snapshot = self.snapshot()
+            for exporter in self.exporters:
+                exporter(snapshot)
+
+    def _export_periodically(self, interval: float):
+        while not self._closed.wait(interval):
+            try:
+                self.export()
+            except Exception:
+                # An exporter failing must not stop later exports.
+                logging.getLogger(__name__).exception("Exporting metrics failed")
+
+    def close(self):
+        """Stop the background exports and export once more."""
+        self._closed.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self.export()
@@ -1,3 +1,6 @@
+from typing import Iterable, Iterator, Tuple
+
+
 def parse_number(prompt):
     while True:
         try:
@@ -6,6 +9,14 @@ def parse_number(prompt):
             print("Please enter a correct number!")
 
 
+def parse_choice(prompt, choices, default):
+    while True:
+        choice = input(prompt).strip().lower() or default
+        if choice in choices:
+            return choice
+        print(f"Please enter one of: {', '.join(choices)}!")
+
+
 def parse_and_validate_nodes(nodes_input: str) -> set:
     """Parse a semi-colon-separated string of node names and return a set of valid names."""
     return {name.strip() for name in nodes_input.split(';') if name.strip()}
@@ -19,3 +30,48 @@ def parse_and_validate_edges(edges_input: str) -> list:
 def parse_and_validate_hyper_edges(edges_input: str) -> list:
     """Parse a semi-colon-separated string of hyper_edges in the format (node_1,node_2,...,node_n) and return a list of sets."""
     return [frozenset(edge.strip('() ').split(',')) for edge in edges_input.split(';')]
+
+
+def _stream_items(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """Yield the line number and text of every semi-colon-separated item, skipping blank lines and # comments."""
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        for item in line.split(';'):
+            item = item.strip()
+            if item:
+                yield line_number, item
+
+
+def stream_nodes(lines: Iterable[str]) -> Iterator[str]:
+    """Lazily parse node names from lines in the format of `parse_and_validate_nodes`."""
+    for _, item in _stream_items(lines):
+        yield item
+
+
+def stream_edges(lines: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+    """
+    Lazily parse edges from lines of (relationship_name,start_node,end_node) items, or (start_node,end_node)
+    items of type Connects, and yield them as (start_node, end_node, relationship_name) tuples.
+    """
+    for line_number, item in _stream_items(lines):
+        fields = [field.strip() for field in item.strip('() ').split(',')]
+        if len(fields) == 2:
+            fields.insert(0, "Connects")
+        if len(fields) != 3 or not all(fields):
+            raise ValueError(f"Line {line_number}: expected (relationship_name,start_node,end_node), got {item!r}!")
+        relationship_name, start_node_name, end_node_name = fields
+        # The type is written into the query text, so it must be a plain identifier.
+        if not relationship_name.isidentifier():
+            raise ValueError(f"Line {line_number}: invalid relationship name {relationship_name!r}!")
+        yield start_node_name, end_node_name, relationship_name
+
+
+def stream_hyper_edges(lines: Iterable[str]) -> Iterator[frozenset]:
+    """Lazily parse hyper edges from lines of (node_1,node_2,...,node_n) items and yield their member sets."""
+    for line_number, item in _stream_items(lines):
+        node_names = frozenset(name.strip() for name in item.strip('() ').split(','))
+        if not all(node_names):
+            raise ValueError(f"Line {line_number}: expected (node_1,node_2,...,node_n), got {item!r}!")
+        yield node_names
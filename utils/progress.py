@@ -0,0 +1,33 @@
+import threading
+import time
+from typing import Callable, Optional
+
+# Called with the number of rows processed so far and the average rows per second.
+ProgressCallback = Callable[[int, float], None]
+
+
+class ThroughputMeter:
+    def __init__(self, callback: Optional[ProgressCallback] = None):
+        """Track processed rows and report the running throughput to an optional callback."""
+        self.callback = callback
+        self.rows = 0
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the meter was created."""
+        return time.perf_counter() - self._start
+
+    @property
+    def rate(self) -> float:
+        """Average rows per second since the meter was created."""
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def update(self, rows: int):
+        """Record another batch of processed rows and notify the callback; safe to call from several threads."""
+        with self._lock:
+            self.rows += rows
+            if self.callback:
+                self.callback(self.rows, self.rate)